@@ -152,7 +152,7 @@ const UploadForm = () => {
     try {
       const videoResponse = await uploadService.uploadFile(
         values.video_file,
-        "server"
+        "multipart"
       );
 
       const thumbnailResponse = await uploadService.uploadFile(
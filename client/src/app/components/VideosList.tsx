@@ -129,7 +129,10 @@ const VideosList = () => {
         >
           <div className="bg-gray-200 h-48 relative overflow-hidden">
             <img
-              src={`${SERVER_URL}/videos/${video.id}/thumbnail`}
+              src={`${SERVER_URL}/videos/${video.id}/thumbnail?width=320`}
+              srcSet={`${SERVER_URL}/videos/${video.id}/thumbnail?width=320 320w, ${SERVER_URL}/videos/${video.id}/thumbnail?width=640 640w`}
+              sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
+              loading="lazy"
               alt={video.title}
               className="w-full h-full object-cover"
               onError={(e) => {
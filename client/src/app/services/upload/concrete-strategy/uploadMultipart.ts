@@ -0,0 +1,135 @@
+import { SERVER_URL } from "@/app/config";
+import {
+  UploadedPart,
+  UploadPartUrl,
+  UploadSession,
+} from "@/app/types/api/upload";
+import { IUploadStrategy } from "../IUploadStrategy";
+
+// Parts uploaded at once, and attempts per part before the upload gives up
+const PART_CONCURRENCY = 4;
+const PART_ATTEMPTS = 3;
+// The server signs at most this many part URLs per request
+const URL_BATCH = 100;
+
+const SESSION_STORAGE_PREFIX = "upload-session:";
+
+class UploadMultipart implements IUploadStrategy {
+  // Lets a page reload resume the same file instead of starting over
+  private sessionStorageKey(file: File): string {
+    return `${SESSION_STORAGE_PREFIX}${file.name}:${file.size}:${file.lastModified}`;
+  }
+
+  private async request<T>(path: string, init?: RequestInit): Promise<T> {
+    const response = await fetch(`${SERVER_URL}/upload/sessions${path}`, {
+      ...init,
+      headers: { "Content-Type": "application/json", ...init?.headers },
+    });
+    if (!response.ok) {
+      throw new Error(`Upload session request failed with status ${response.status}`);
+    }
+    return response.json();
+  }
+
+  private startSession(file: File): Promise<UploadSession> {
+    return this.request<UploadSession>("", {
+      method: "POST",
+      body: JSON.stringify({ size: file.size, content_type: file.type || "video/mp4" }),
+    });
+  }
+
+  private async listParts(session: UploadSession): Promise<UploadedPart[]> {
+    const { parts } = await this.request<{ parts: UploadedPart[] }>(
+      `/${session.object_id}/parts?upload_id=${encodeURIComponent(session.upload_id)}`
+    );
+    return parts;
+  }
+
+  private async partUrls(session: UploadSession, partNumbers: number[]): Promise<UploadPartUrl[]> {
+    const urls: UploadPartUrl[] = [];
+    for (let i = 0; i < partNumbers.length; i += URL_BATCH) {
+      const { parts } = await this.request<{ parts: UploadPartUrl[] }>(
+        `/${session.object_id}/part-urls`,
+        {
+          method: "POST",
+          body: JSON.stringify({
+            upload_id: session.upload_id,
+            part_numbers: partNumbers.slice(i, i + URL_BATCH),
+          }),
+        }
+      );
+      urls.push(...parts);
+    }
+    return urls;
+  }
+
+  private async uploadPart(file: File, session: UploadSession, part: UploadPartUrl): Promise<void> {
+    const start = (part.part_number - 1) * session.part_size;
+    const body = file.slice(start, Math.min(start + session.part_size, file.size));
+    let url = part.url;
+
+    for (let attempt = 1; attempt <= PART_ATTEMPTS; attempt++) {
+      try {
+        const response = await fetch(url, { method: "PUT", body });
+        if (response.ok) {
+          return;
+        }
+        throw new Error(`Part ${part.part_number} failed with status ${response.status}`);
+      } catch (error) {
+        if (attempt === PART_ATTEMPTS) {
+          throw error;
+        }
+        // The URL may have expired; sign a fresh one before retrying
+        [{ url }] = await this.partUrls(session, [part.part_number]);
+      }
+    }
+  }
+
+  async uploadToS3(file: FileList): Promise<any> {
+    const fileToUpload = file[0];
+    if (!fileToUpload) {
+      throw new Error("No file provided for upload");
+    }
+
+    const storageKey = this.sessionStorageKey(fileToUpload);
+    const saved = localStorage.getItem(storageKey);
+    let session: UploadSession = saved ? JSON.parse(saved) : await this.startSession(fileToUpload);
+
+    let uploaded = new Set<number>();
+    if (saved) {
+      try {
+        uploaded = new Set((await this.listParts(session)).map((part) => part.part_number));
+      } catch {
+        // The session expired or was aborted; start over
+        session = await this.startSession(fileToUpload);
+      }
+    }
+    localStorage.setItem(storageKey, JSON.stringify({ ...session, parts: [] }));
+
+    const missing = Array.from({ length: session.part_count }, (_, i) => i + 1).filter(
+      (n) => !uploaded.has(n)
+    );
+    const signed = new Map(session.parts.map((part) => [part.part_number, part]));
+    const unsigned = missing.filter((n) => !signed.has(n));
+    for (const part of await this.partUrls(session, unsigned)) {
+      signed.set(part.part_number, part);
+    }
+
+    const queue = missing.map((n) => signed.get(n)!);
+    const worker = async () => {
+      for (let part = queue.shift(); part; part = queue.shift()) {
+        await this.uploadPart(fileToUpload, session, part);
+      }
+    };
+    await Promise.all(Array.from({ length: PART_CONCURRENCY }, worker));
+
+    const result = await this.request<{ object_id: string }>(`/${session.object_id}/complete`, {
+      method: "POST",
+      body: JSON.stringify({ upload_id: session.upload_id }),
+    });
+    localStorage.removeItem(storageKey);
+    return result;
+  }
+}
+
+export const uploadMultipart = new UploadMultipart();
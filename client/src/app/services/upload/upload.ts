@@ -2,6 +2,7 @@ import { Response } from "@/app/types/api/response";
 import { PresignedUrls, UploadMetadata } from "../../types/api/upload";
 import { uploadToMinIO } from "./concrete-strategy/uploadToMinio";
 import { uploadToServer } from "./concrete-strategy/uploadToServer";
+import { uploadMultipart } from "./concrete-strategy/uploadMultipart";
 import { UploadStrategyContext } from "./uploadStrategyContext";
 import { SERVER_URL } from "@/app/config";
 
@@ -47,6 +48,10 @@ class UploadService {
       case "server":
         uploadStrategyContext.setUpload(uploadToServer);
         return uploadStrategyContext.uploadToS3(file, thumbnail_id);
+      case "multipart":
+        // Parallel, resumable parts straight to storage; resolves to { object_id }
+        uploadStrategyContext.setUpload(uploadMultipart);
+        return uploadStrategyContext.uploadToS3(file);
       default:
         const response = await this.getPresignedUrls();
 
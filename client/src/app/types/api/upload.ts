@@ -10,3 +10,23 @@ export interface UploadMetadata {
   title: string;
   description: string;
 }
+
+export interface UploadPartUrl {
+  part_number: number;
+  url: string;
+}
+
+export interface UploadSession {
+  object_id: string;
+  object_key: string;
+  upload_id: string;
+  part_size: number;
+  part_count: number;
+  parts: UploadPartUrl[];
+}
+
+export interface UploadedPart {
+  part_number: number;
+  etag: string;
+  size: number;
+}
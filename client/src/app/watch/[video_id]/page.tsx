@@ -42,8 +42,11 @@ const WatchPage = () => {
         if (data.success && data.data) {
           setVideoData(data.data);
 
-          // Check if video is still processing
-          if (data.data.processing_status !== "COMPLETED") {
+          // PLAYABLE videos can be watched at reduced quality while higher renditions encode
+          if (
+            data.data.processing_status !== "COMPLETED" &&
+            data.data.processing_status !== "PLAYABLE"
+          ) {
             setError("Video is still processing. Please check back later.");
           }
         } else {
@@ -168,7 +171,8 @@ const WatchPage = () => {
                 className={`w-2 h-2 rounded-full ${
                   videoData.processing_status === "COMPLETED"
                     ? "bg-green-500"
-                    : videoData.processing_status === "IN_PROGRESS"
+                    : videoData.processing_status === "IN_PROGRESS" ||
+                        videoData.processing_status === "PLAYABLE"
                       ? "bg-yellow-500"
                       : "bg-red-500"
                 }`}
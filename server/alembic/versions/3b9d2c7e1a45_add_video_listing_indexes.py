@@ -0,0 +1,48 @@
+"""add video listing indexes
+
+Revision ID: 3b9d2c7e1a45
+Revises: f4c1b03f7972
+Create Date: 2026-10-18 09:12:40.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d2c7e1a45'
+down_revision: Union[str, Sequence[str], None] = 'f4c1b03f7972'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyset pagination over (created_at, id), newest first
+    op.create_index(
+        "ix_videos_created_at_id",
+        "videos",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    # Homepage listing only shows playable videos
+    op.create_index(
+        "ix_videos_completed_created_at_id",
+        "videos",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        postgresql_where=sa.text("processing_status = 'COMPLETED'"),
+    )
+    # Videos still being processed are a small, frequently queried subset
+    op.create_index(
+        "ix_videos_processing_status_pending",
+        "videos",
+        ["processing_status"],
+        postgresql_where=sa.text("processing_status <> 'COMPLETED'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_videos_processing_status_pending", table_name="videos")
+    op.drop_index("ix_videos_completed_created_at_id", table_name="videos")
+    op.drop_index("ix_videos_created_at_id", table_name="videos")
@@ -0,0 +1,30 @@
+"""add video transcode telemetry
+
+Revision ID: 8e2f6a4d9c13
+Revises: 3b9d2c7e1a45
+Create Date: 2026-10-18 14:03:11.504921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2f6a4d9c13'
+down_revision: Union[str, Sequence[str], None] = '3b9d2c7e1a45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('videos', sa.Column('progress', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('videos', sa.Column('stage_timings', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('videos', 'stage_timings')
+    op.drop_column('videos', 'progress')
@@ -0,0 +1,29 @@
+"""add video status event columns
+
+Revision ID: a4d83f1c6e27
+Revises: c71a5e0b2f86
+Create Date: 2026-10-18 18:12:37.690214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d83f1c6e27'
+down_revision: Union[str, Sequence[str], None] = 'c71a5e0b2f86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('videos', sa.Column('processing_error', sa.TEXT(), nullable=True))
+    op.add_column('videos', sa.Column('status_seq', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('videos', 'status_seq')
+    op.drop_column('videos', 'processing_error')
@@ -0,0 +1,30 @@
+"""add playable processing status
+
+Revision ID: c71a5e0b2f86
+Revises: 8e2f6a4d9c13
+Create Date: 2026-10-18 16:40:52.117384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71a5e0b2f86'
+down_revision: Union[str, Sequence[str], None] = '8e2f6a4d9c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # New enum values cannot be used in the transaction that adds them, so commit first
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE processingstatus ADD VALUE IF NOT EXISTS 'PLAYABLE'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Postgres cannot drop an enum value; fold PLAYABLE rows back into IN_PROGRESS
+    op.execute("UPDATE videos SET processing_status = 'IN_PROGRESS' WHERE processing_status = 'PLAYABLE'")
@@ -0,0 +1,105 @@
+"""
+Viewer-concurrency load test for the video API.
+
+Simulates N concurrent viewers that repeatedly fetch video metadata, the DASH
+manifest and a few segments, then reports requests/sec and latency
+percentiles per target. Pass several ``--target`` values to compare builds
+side by side, e.g. the async server against the previous sync one:
+
+    git worktree add /tmp/sync-server <sync-commit>
+    (cd /tmp/sync-server/server && uvicorn main:app --port 8001 --workers 1) &
+    uvicorn main:app --port 8000 --workers 1 &
+    python benchmarks/bench_load.py --video-id <uuid> \
+        --target async=http://localhost:8000 --target sync=http://localhost:8001 \
+        --viewers 500 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import aiohttp
+
+DEFAULT_PATHS = [
+    "/videos/{video_id}",
+    "/videos/{video_id}/manifest",
+    "/videos/{video_id}/init-stream0.m4s",
+    "/videos/{video_id}/chunk-stream0-00001.m4s",
+    "/videos/{video_id}/chunk-stream0-00002.m4s",
+]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+async def viewer(session: aiohttp.ClientSession, base_url: str, paths: list[str], deadline: float, latencies: list[float], errors: list[int]):
+    while time.perf_counter() < deadline:
+        for path in paths:
+            started = time.perf_counter()
+            try:
+                async with session.get(base_url + path, allow_redirects=False) as response:
+                    await response.read()
+                    if response.status >= 400:
+                        errors.append(response.status)
+            except aiohttp.ClientError:
+                errors.append(0)
+            latencies.append(time.perf_counter() - started)
+
+
+async def run_target(base_url: str, paths: list[str], viewers: int, duration: float) -> dict:
+    latencies: list[float] = []
+    errors: list[int] = []
+    connector = aiohttp.TCPConnector(limit=viewers)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            viewer(session, base_url, paths, deadline, latencies, errors)
+            for _ in range(viewers)
+        ))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", required=True, help="label=base_url, repeatable")
+    parser.add_argument("--video-id", required=True)
+    parser.add_argument("--path", action="append", help="Request path template, repeatable; {video_id} is substituted")
+    parser.add_argument("--viewers", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    paths = [p.format(video_id=args.video_id) for p in (args.path or DEFAULT_PATHS)]
+    results = {}
+    for target in args.target:
+        label, _, base_url = target.partition("=")
+        print(f"Running {label} ({base_url}) with {args.viewers} viewers for {args.duration}s...")
+        results[label] = await run_target(base_url.rstrip("/"), paths, args.viewers, args.duration)
+
+    print(f"{'target':<12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for label, result in results.items():
+        print(f"{label:<12}{result['requests_per_sec']:>10}{result['p50_ms']:>10}{result['p99_ms']:>10}{result['errors']:>8}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
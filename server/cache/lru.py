@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class ByteBudgetLRUCache:
+    """
+    Thread-safe LRU cache bounded by the total size of its values in bytes.
+
+    Entries may carry their own TTL; entries without one live until evicted.
+    Values larger than ``max_entry_bytes`` are never stored so a single big
+    object cannot flush the whole cache.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes or max_bytes
+        self._entries: "OrderedDict[Hashable, tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict[Hashable, threading.Lock] = {}
+        self._async_key_locks: dict[Hashable, asyncio.Lock] = {}
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _lookup(self, key: Hashable) -> Optional[Any]:
+        # Caller must hold self._lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, size, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.current_bytes -= size
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._lookup(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, size: int, ttl: Optional[float] = None) -> bool:
+        """Store a value; returns False if it is too large to be cached."""
+        if size > self.max_entry_bytes:
+            return False
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[key] = (value, size, expires_at)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+        return True
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.current_bytes -= entry[1]
+
+    def delete_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove every entry whose key matches the predicate."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self.current_bytes -= self._entries.pop(key)[1]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], tuple[Any, Optional[int]]],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """
+        Return the cached value or call ``loader`` to produce it.
+
+        ``loader`` returns ``(value, size)``; a size of None means the value
+        should be returned but not cached. Concurrent misses for the same key
+        wait for a single load instead of each hitting the backend.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                value = self._lookup(key)
+            if value is not None:
+                return value
+            try:
+                value, size = loader()
+                if size is not None:
+                    self.set(key, value, size, ttl)
+                return value
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+    async def aget_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[tuple[Any, Optional[int]]]],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Async counterpart of get_or_load for loaders that await storage I/O."""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        key_lock = self._async_key_locks.setdefault(key, asyncio.Lock())
+        async with key_lock:
+            with self._lock:
+                value = self._lookup(key)
+            if value is not None:
+                return value
+            try:
+                value, size = await loader()
+                if size is not None:
+                    self.set(key, value, size, ttl)
+                return value
+            finally:
+                self._async_key_locks.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "max_entry_bytes": self.max_entry_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
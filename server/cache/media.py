@@ -0,0 +1,21 @@
+from cache.lru import ByteBudgetLRUCache
+from settings import settings
+from utils.conditional import INDEX_EXTENSIONS
+
+# Objects under a transcode revision never change, so they are cached until
+# evicted. Everything else (the root manifests and indexes, and media published
+# before revisions existed) may be rewritten in place and expires after
+# MEDIA_CACHE_MANIFEST_TTL. That TTL is what bounds staleness in other workers
+# and replicas; invalidate_manifests only reaches the process applying the event.
+media_cache = ByteBudgetLRUCache(
+    max_bytes=settings.MEDIA_CACHE_MAX_BYTES,
+    max_entry_bytes=settings.MEDIA_CACHE_MAX_ENTRY_BYTES,
+)
+
+
+def invalidate_manifests(video_id: str) -> None:
+    """Drop cached manifests, playlists and image indexes of a video after the transcoder re-publishes them."""
+    media_cache.delete_where(
+        lambda key: key[0] == video_id and str(key[1]).split("#")[0].endswith(INDEX_EXTENSIONS)
+    )
+
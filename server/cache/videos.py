@@ -0,0 +1,142 @@
+import json
+from typing import Any, Awaitable, Callable, Optional
+from cache.lru import ByteBudgetLRUCache
+from settings import settings
+
+# Total counts per listing filter. Each entry is charged one "byte", so the
+# budget is simply the number of distinct filters kept.
+video_count_cache = ByteBudgetLRUCache(max_bytes=64)
+
+
+def invalidate_video_counts() -> None:
+    """Drop cached totals after videos are added or change status."""
+    video_count_cache.clear()
+
+
+class InProcessBackend:
+    """Per-worker metadata store backed by the byte-budgeted LRU cache."""
+
+    def __init__(self, max_bytes: int):
+        self._cache = ByteBudgetLRUCache(max_bytes=max_bytes)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._cache.set(key, value, len(value), ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class RedisBackend:
+    """
+    Metadata store shared by all workers.
+
+    Any client exposing async ``get``/``set(ex=)``/``delete`` works, so a
+    fake client can stand in for Redis during local development.
+    """
+
+    def __init__(self, client=None, url: str = ""):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self._client = client
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = await self._client.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(key, value, ex=max(int(ttl), 1))
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class VideoMetadataCache:
+    """
+    Read-through cache for video metadata, stored as JSON so every backend
+    holds the same representation. Writers call ``invalidate`` after commit.
+
+    A load that read the row before a write may finish after the write's
+    invalidation. Each key with loads in flight carries a generation that
+    ``invalidate`` bumps, and a load only stores its result if the generation
+    it started under is still current.
+    """
+
+    key_prefix = "video:metadata:"
+
+    def __init__(self, backend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        # Only keys with a load in flight are tracked, so both stay small
+        self._generations: dict[str, int] = {}
+        self._loads_in_flight: dict[str, int] = {}
+
+    def _key(self, video_id: str) -> str:
+        return f"{self.key_prefix}{video_id}"
+
+    def _begin_load(self, video_id: str) -> int:
+        self._loads_in_flight[video_id] = self._loads_in_flight.get(video_id, 0) + 1
+        return self._generations.setdefault(video_id, 0)
+
+    def _end_load(self, video_id: str) -> None:
+        remaining = self._loads_in_flight[video_id] - 1
+        if remaining:
+            self._loads_in_flight[video_id] = remaining
+        else:
+            del self._loads_in_flight[video_id]
+            del self._generations[video_id]
+
+    async def get_or_load(
+        self,
+        video_id: str,
+        loader: Callable[[], Awaitable[Optional[dict[str, Any]]]],
+    ) -> Optional[dict[str, Any]]:
+        """Return cached metadata, or load it and cache it. Missing videos are not cached."""
+        cached = await self.backend.get(self._key(video_id))
+        if cached is not None:
+            return json.loads(cached)
+
+        generation = self._begin_load(video_id)
+        try:
+            data = await loader()
+            # Skip the write if the row was invalidated while it loaded
+            if data is not None and self._generations[video_id] == generation:
+                await self.backend.set(self._key(video_id), json.dumps(data).encode("utf-8"), self.ttl)
+        finally:
+            self._end_load(video_id)
+        return data
+
+    async def invalidate(self, video_id: str) -> None:
+        if video_id in self._generations:
+            self._generations[video_id] += 1
+        await self.backend.delete(self._key(video_id))
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+
+def _create_backend():
+    if settings.VIDEO_METADATA_CACHE_BACKEND == "redis":
+        return RedisBackend(url=settings.VIDEO_METADATA_CACHE_URL)
+    return InProcessBackend(max_bytes=settings.VIDEO_METADATA_CACHE_MAX_BYTES)
+
+
+video_metadata_cache = VideoMetadataCache(
+    backend=_create_backend(),
+    ttl=settings.VIDEO_METADATA_CACHE_TTL,
+)
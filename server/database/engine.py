@@ -1,18 +1,62 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from database.metrics import InstrumentedAsyncQueuePool
 from settings import settings
 
-engine = create_engine(settings.POSTGRES_DB_URL)
+def _async_database_url(url: str) -> str:
+    """Point the configured Postgres URL at the asyncpg driver."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+def _pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+# Sync engine, kept for migrations and scripts
+engine = create_engine(
+    settings.POSTGRES_DB_URL,
+    connect_args={"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"},
+    **_pool_options(),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the request path
+async_engine = create_async_engine(
+    _async_database_url(settings.POSTGRES_DB_URL),
+    poolclass=InstrumentedAsyncQueuePool,
+    connect_args={"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}},
+    **_pool_options(),
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    # Handlers serialise rows after commit; avoid implicit lazy reloads
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 def get_db():
     db = SessionLocal()
     try:
-        print("Database connection established")
         yield db
     finally:
-        print("Database connection closed")
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_pool_stats() -> dict:
+    """Connection pool usage and checkout latency of the async engine."""
+    return async_engine.pool.stats()
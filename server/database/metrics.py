@@ -0,0 +1,87 @@
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Upper bounds (ms) of the checkout latency histogram buckets
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics:
+    """Checkout latency histogram and wait counters for a connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bucket_counts = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+        self.checkouts = 0
+        self.checkout_seconds_total = 0.0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.timeouts = 0
+
+    def observe_checkout(self, seconds: float, waited: bool) -> None:
+        elapsed_ms = seconds * 1000
+        index = next(
+            (i for i, bound in enumerate(CHECKOUT_BUCKETS_MS) if elapsed_ms <= bound),
+            len(CHECKOUT_BUCKETS_MS),
+        )
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.checkouts += 1
+            self.checkout_seconds_total += seconds
+            if waited:
+                self.waits += 1
+                self.wait_seconds_total += seconds
+
+    def observe_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            histogram = {}
+            cumulative = 0
+            for bound, count in zip(CHECKOUT_BUCKETS_MS, self.bucket_counts):
+                cumulative += count
+                histogram[f"le_{bound}ms"] = cumulative
+            histogram["le_inf"] = cumulative + self.bucket_counts[-1]
+            return {
+                "checkouts": self.checkouts,
+                "checkout_latency_avg_ms": round(self.checkout_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "checkout_latency_histogram": histogram,
+                "waits": self.waits,
+                "wait_seconds_total": round(self.wait_seconds_total, 3),
+                "timeouts": self.timeouts,
+            }
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records how long each checkout takes.
+
+    A checkout counts as a wait when every pooled and overflow connection was
+    already in use when it started.
+    """
+
+    metrics = PoolMetrics()
+
+    def _do_get(self):
+        exhausted = self._max_overflow >= 0 and self.checkedout() >= self.size() + self._max_overflow
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.observe_timeout()
+            raise
+        self.metrics.observe_checkout(time.perf_counter() - started, exhausted)
+        return connection
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            **self.metrics.snapshot(),
+        }
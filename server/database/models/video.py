@@ -1,14 +1,31 @@
 from database.engine import Base
-from sqlalchemy import Column, TEXT, Enum, TIMESTAMP, func
+from sqlalchemy import Column, TEXT, BigInteger, Enum, TIMESTAMP, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
 import enum
 
 class ProcessingStatus(enum.Enum):
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
     IN_PROGRESS = "IN_PROGRESS"
+    # Lowest rendition is published and watchable; higher ones are still encoding
+    PLAYABLE = "PLAYABLE"
 
 class Video(Base):
     __tablename__ = "videos"
+    __table_args__ = (
+        Index("ix_videos_created_at_id", text("created_at DESC"), text("id DESC")),
+        Index(
+            "ix_videos_completed_created_at_id",
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_where=text("processing_status = 'COMPLETED'"),
+        ),
+        Index(
+            "ix_videos_processing_status_pending",
+            "processing_status",
+            postgresql_where=text("processing_status <> 'COMPLETED'"),
+        ),
+    )
 
     id = Column(TEXT, primary_key=True)
     title = Column(TEXT, nullable=False)
@@ -18,6 +35,14 @@ class Video(Base):
         nullable=False,
         default=ProcessingStatus.IN_PROGRESS
     )
+    # Why the last transcode attempt failed; cleared by the next status change
+    processing_error = Column(TEXT, nullable=True)
+    # Sequence number of the newest status event applied; older or replayed events are ignored
+    status_seq = Column(BigInteger, nullable=True)
+    # Latest transcoder progress: stage, percent, fps, speed, eta_seconds, updated_at
+    progress = Column(JSONB, nullable=True)
+    # Seconds spent in each transcoder stage, e.g. {"download": 1.2, "encode": 40.5}
+    stage_timings = Column(JSONB, nullable=True)
     created_at = Column(TIMESTAMP, nullable=False, default=func.now())
     updated_at = Column(TIMESTAMP, nullable=False, default=func.now(), onupdate=func.now())
 
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+from settings import settings
+
+
+class KafkaEventSource:
+    """
+    Reads status events from a Kafka topic with manual offset commits, so an
+    event is only acknowledged after the batch containing it is written.
+    """
+
+    def __init__(self, brokers: str, topic: str, group_id: str):
+        self.brokers = brokers
+        self.topic = topic
+        self.group_id = group_id
+        self._consumer = None
+
+    async def start(self) -> None:
+        from aiokafka import AIOKafkaConsumer
+
+        self._consumer = AIOKafkaConsumer(
+            self.topic,
+            bootstrap_servers=self.brokers,
+            group_id=self.group_id,
+            enable_auto_commit=False,
+            # Status must not be lost across a restart, so new groups replay the topic
+            auto_offset_reset="earliest",
+            value_deserializer=lambda m: json.loads(m.decode("utf-8")),
+        )
+        await self._consumer.start()
+        logging.info(f"Consuming status events from {self.topic}")
+
+    async def get_batch(self, max_records: int, timeout: float) -> list[dict]:
+        records = await self._consumer.getmany(timeout_ms=int(timeout * 1000), max_records=max_records)
+        # Events are keyed by video ID, so each partition holds a video's events in order
+        return [message.value for messages in records.values() for message in messages]
+
+    async def commit(self) -> None:
+        await self._consumer.commit()
+
+    async def stop(self) -> None:
+        if self._consumer is not None:
+            await self._consumer.stop()
+            self._consumer = None
+
+
+class InMemoryEventSource:
+    """
+    Stand-in for the status topic in tests and local runs without Kafka.
+
+    ``publish`` appends an event; ``get_batch`` drains them in publish order.
+    ``committed`` counts events acknowledged by the consumer. Like a Kafka
+    consumer group, a restarted source redelivers everything not yet committed.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        # Published events not yet committed, oldest first
+        self._log: list[dict] = []
+        self.committed = 0
+        self._delivered = 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        for event in self._log:
+            self._queue.put_nowait(event)
+        self._delivered = self.committed
+
+    def publish(self, event: dict) -> None:
+        self._log.append(event)
+        if self._queue is not None:
+            self._queue.put_nowait(event)
+
+    async def get_batch(self, max_records: int, timeout: float) -> list[dict]:
+        try:
+            batch = [await asyncio.wait_for(self._queue.get(), timeout)]
+        except asyncio.TimeoutError:
+            return []
+        while len(batch) < max_records and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        self._delivered += len(batch)
+        return batch
+
+    async def commit(self) -> None:
+        del self._log[:self._delivered - self.committed]
+        self.committed = self._delivered
+
+    async def stop(self) -> None:
+        self._queue = None
+
+
+def create_event_source():
+    """Build the status event source selected by STATUS_EVENTS_SOURCE, or None when disabled."""
+    if settings.STATUS_EVENTS_SOURCE == "kafka":
+        if not settings.KAFKA_BROKER:
+            # Without a broker the updater would retry forever and statuses would silently stall
+            raise RuntimeError(
+                "STATUS_EVENTS_SOURCE is 'kafka' but KAFKA_BROKER is not set; "
+                "set KAFKA_BROKER, or STATUS_EVENTS_SOURCE to 'memory' or '' to disable"
+            )
+        return KafkaEventSource(settings.KAFKA_BROKER, settings.STATUS_EVENTS_TOPIC, settings.STATUS_EVENTS_GROUP)
+    if settings.STATUS_EVENTS_SOURCE == "memory":
+        return InMemoryEventSource()
+    return None
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Optional
+
+from pydantic import ValidationError
+from sqlalchemy import BigInteger, TEXT, and_, bindparam, case, func, or_, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+
+from cache.media import invalidate_manifests
+from cache.videos import video_metadata_cache, invalidate_video_counts
+from database.engine import AsyncSessionLocal
+from database.models.video import Video, ProcessingStatus
+from pydantic_models.video import VideoStatusEvent
+
+videos = Video.__table__
+_status = bindparam("b_status", type_=videos.c.processing_status.type)
+_seq = bindparam("b_seq", type_=BigInteger)
+
+# One executemany UPDATE per batch. Every row carries every parameter; NULL
+# means "unchanged". The seq guard makes replays and stale events no-ops, and
+# a late PLAYABLE never downgrades a COMPLETED video.
+BULK_STATUS_UPDATE = (
+    update(videos)
+    .where(videos.c.id == bindparam("b_id"))
+    .where(or_(videos.c.status_seq.is_(None), videos.c.status_seq < _seq))
+    .values(
+        processing_status=case(
+            (_status.is_(None), videos.c.processing_status),
+            (
+                and_(
+                    videos.c.processing_status == ProcessingStatus.COMPLETED,
+                    _status == ProcessingStatus.PLAYABLE,
+                ),
+                videos.c.processing_status,
+            ),
+            else_=_status,
+        ),
+        processing_error=case(
+            (_status.is_(None), videos.c.processing_error),
+            else_=bindparam("b_error", type_=TEXT),
+        ),
+        progress=func.coalesce(bindparam("b_progress", type_=JSONB), videos.c.progress),
+        stage_timings=func.coalesce(bindparam("b_stage_timings", type_=JSONB), videos.c.stage_timings),
+        status_seq=_seq,
+        updated_at=func.now(),
+    )
+)
+
+
+def fold_events(events: list[VideoStatusEvent]) -> list[dict]:
+    """
+    Collapse a batch into one row of UPDATE parameters per video.
+
+    Events are applied in ``seq`` order: the newest status (with its error),
+    progress and stage timings win, and the row is stamped with the highest seq.
+    """
+    rows: dict[str, dict] = {}
+    for event in sorted(events, key=lambda e: e.seq):
+        row = rows.setdefault(event.video_id, {
+            "b_id": event.video_id,
+            "b_seq": event.seq,
+            "b_status": None,
+            "b_error": None,
+            "b_progress": None,
+            "b_stage_timings": None,
+        })
+        row["b_seq"] = event.seq
+        if event.status is not None:
+            row["b_status"] = ProcessingStatus(event.status)
+            row["b_error"] = event.error
+        if event.progress is not None:
+            row["b_progress"] = {
+                **event.progress.model_dump(),
+                "updated_at": (event.emitted_at.isoformat() if event.emitted_at else None),
+            }
+        if event.stage_timings is not None:
+            row["b_stage_timings"] = event.stage_timings
+    return list(rows.values())
+
+
+def parse_events(raw_events: list[dict]) -> list[VideoStatusEvent]:
+    """Validate raw messages, logging and dropping any that can never be applied."""
+    events = []
+    for raw in raw_events:
+        try:
+            event = VideoStatusEvent.model_validate(raw)
+            if event.status is not None:
+                ProcessingStatus(event.status)
+        except (ValidationError, ValueError) as e:
+            logging.error(f"Dropping malformed status event {raw!r}: {e}")
+            continue
+        events.append(event)
+    return events
+
+
+class StatusUpdater:
+    """
+    Background task that applies transcoder status events to the videos table.
+
+    Events are read in batches of up to ``max_batch`` (waiting at most
+    ``max_wait`` seconds for the first), written with a single bulk UPDATE and
+    only then committed on the source. A failed write is retried with the same
+    batch, so events are never skipped. If the source itself fails, it is
+    stopped and started again after ``retry_delay``.
+
+    The transcoder can finish before the upload's metadata row is inserted.
+    Events for a video without a row are held and retried, at least every
+    ``retry_delay`` seconds, for up to ``pending_timeout`` seconds. While any
+    are held, offsets are not committed, so a restart replays them.
+    """
+
+    def __init__(self, source, session_factory=AsyncSessionLocal, max_batch: int = 500,
+                 max_wait: float = 0.5, retry_delay: float = 2.0, pending_timeout: float = 600.0):
+        self.source = source
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.retry_delay = retry_delay
+        self.pending_timeout = pending_timeout
+        self.applied = 0
+        self._pending: dict[str, list[VideoStatusEvent]] = {}
+        self._pending_since: dict[str, float] = {}
+        self._last_attempt = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Events held back until their video's row exists."""
+        return sum(len(events) for events in self._pending.values())
+
+    async def apply(self, events: list[VideoStatusEvent]) -> None:
+        """Write a batch together with the events still held from earlier ones."""
+        events = [event for held in self._pending.values() for event in held] + events
+        rows = fold_events(events)
+        if not rows:
+            return
+        async with self.session_factory() as db:
+            result = await db.execute(select(videos.c.id).where(videos.c.id.in_([row["b_id"] for row in rows])))
+            existing = set(result.scalars())
+            rows = [row for row in rows if row["b_id"] in existing]
+            if rows:
+                await db.execute(BULK_STATUS_UPDATE, rows)
+                await db.commit()
+        self._hold([event for event in events if event.video_id not in existing])
+
+        for row in rows:
+            await video_metadata_cache.invalidate(row["b_id"])
+            if row["b_status"] is not None:
+                invalidate_manifests(row["b_id"])
+        if any(row["b_status"] is not None for row in rows):
+            invalidate_video_counts()
+        self.applied += sum(1 for event in events if event.video_id in existing)
+
+    def _hold(self, events: list[VideoStatusEvent]) -> None:
+        held: dict[str, list[VideoStatusEvent]] = defaultdict(list)
+        for event in events:
+            held[event.video_id].append(event)
+
+        now = time.monotonic()
+        self._pending = {}
+        self._pending_since = {video_id: since for video_id, since in self._pending_since.items() if video_id in held}
+        for video_id, video_events in held.items():
+            since = self._pending_since.setdefault(video_id, now)
+            if now - since >= self.pending_timeout:
+                logging.error(
+                    f"Dropping {len(video_events)} status events for video {video_id}: "
+                    f"no row after {self.pending_timeout:.0f}s"
+                )
+                del self._pending_since[video_id]
+                continue
+            self._pending[video_id] = video_events
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.source.start()
+                await self._consume()
+            except Exception as e:
+                # Covers the source failing to start as well as lost connections
+                # and failed offset commits; uncommitted events are redelivered
+                logging.error(f"Status event consumer failed, restarting: {e}")
+            finally:
+                await self._stop_source()
+            await asyncio.sleep(self.retry_delay)
+
+    async def _consume(self) -> None:
+        while True:
+            raw_events = await self.source.get_batch(self.max_batch, self.max_wait)
+            if not raw_events and (
+                not self._pending or time.monotonic() - self._last_attempt < self.retry_delay
+            ):
+                continue
+            events = parse_events(raw_events)
+            while True:
+                try:
+                    await self.apply(events)
+                    break
+                except Exception as e:
+                    logging.error(f"Failed to apply {len(events)} status events, retrying: {e}")
+                    await asyncio.sleep(self.retry_delay)
+            self._last_attempt = time.monotonic()
+            # Committing now would also acknowledge the held events
+            if not self._pending:
+                await self.source.commit()
+
+    async def _stop_source(self) -> None:
+        try:
+            await self.source.stop()
+        except Exception as e:
+            logging.error(f"Failed to stop status event source: {e}")
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,13 +1,43 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes import upload, video
-from database.engine import get_db
+from contextlib import asynccontextmanager
+from routes import admin, upload, video
+from database.engine import get_db, async_engine
+from storage.s3 import init_s3_client, close_s3_client, ensure_buckets
+from events.broker import create_event_source
+from events.status_updater import StatusUpdater
+from settings import settings
 import os
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared, pooled storage client reused by every request
+    await init_s3_client()
+    # Upload handlers rely on these existing instead of checking per request
+    await ensure_buckets(settings.MINIO_RAW_VIDEO_BUCKET, settings.MINIO_VIDEO_THUMBNAIL_BUCKET)
+    # Applies transcoder status events in batches; the source is exposed so an
+    # in-memory stand-in can be fed directly
+    app.state.status_events = create_event_source()
+    status_updater = None
+    if app.state.status_events is not None:
+        status_updater = StatusUpdater(
+            app.state.status_events,
+            max_batch=settings.STATUS_BATCH_MAX_EVENTS,
+            max_wait=settings.STATUS_BATCH_MAX_WAIT,
+            pending_timeout=settings.STATUS_PENDING_TIMEOUT,
+        )
+        status_updater.start()
+    yield
+    if status_updater is not None:
+        await status_updater.stop()
+    await close_s3_client()
+    await async_engine.dispose()
+
 app = FastAPI(
     title="Video Streaming System",
     description="Video Streaming System API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 origins = [
@@ -26,6 +56,7 @@ app.add_middleware(
 
 app.include_router(upload.router)
 app.include_router(video.router)
+app.include_router(admin.router)
 
 @app.get("/")
 def root():
@@ -1,6 +1,30 @@
+from typing import Optional
 from pydantic import BaseModel
 
 class UploadMetadata(BaseModel):
     video_id: str
     title: str
-    description: str
\ No newline at end of file
+    description: str
+
+class UploadSessionStart(BaseModel):
+    # Total size of the file in bytes
+    size: int
+    content_type: Optional[str] = None
+    # Requested part size; raised to S3's minimum or to fit the 10,000 part limit
+    part_size: Optional[int] = None
+
+
+class UploadPartUrlsRequest(BaseModel):
+    upload_id: str
+    part_numbers: list[int]
+
+
+class UploadedPart(BaseModel):
+    part_number: int
+    etag: str
+
+
+class UploadSessionComplete(BaseModel):
+    upload_id: str
+    # Parts to assemble; omitted, every part stored for the upload is used
+    parts: Optional[list[UploadedPart]] = None
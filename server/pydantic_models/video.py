@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+class VideoBatchRequest(BaseModel):
+    ids: list[str]
+
+
+class VideoProgress(BaseModel):
+    stage: str
+    percent: float
+    fps: Optional[float] = None
+    speed: Optional[float] = None
+    eta_seconds: Optional[float] = None
+
+class VideoTelemetryUpdate(BaseModel):
+    progress: Optional[VideoProgress] = None
+    stage_timings: Optional[dict[str, float]] = None
+
+class VideoStatusEvent(BaseModel):
+    """
+    One message on the transcoder status topic. ``seq`` increases with every
+    event the transcoder emits for a video; every other field is optional.
+    """
+    video_id: str
+    seq: int
+    status: Optional[str] = None
+    error: Optional[str] = None
+    progress: Optional[VideoProgress] = None
+    stage_timings: Optional[dict[str, float]] = None
+    emitted_at: Optional[datetime] = None
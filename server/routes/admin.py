@@ -0,0 +1,42 @@
+from fastapi import APIRouter
+from storage.s3 import get_pool_stats
+from database.engine import get_pool_stats as get_db_pool_stats
+from cache.media import media_cache
+from storage.presign import presigned_url_cache_stats
+from cache.videos import video_metadata_cache
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+)
+
+@router.get("/storage-pool")
+def get_storage_pool_stats():
+    """Connection pool usage of the shared object-storage client"""
+    return {
+        "success": True,
+        "message": "Storage pool stats retrieved successfully",
+        "data": get_pool_stats()
+    }
+
+@router.get("/db-pool")
+def get_database_pool_stats():
+    """Checked-out connections, overflow and checkout latency of the database pool"""
+    return {
+        "success": True,
+        "message": "Database pool stats retrieved successfully",
+        "data": get_db_pool_stats()
+    }
+
+@router.get("/media-cache")
+def get_media_cache_stats():
+    """Hit/miss/eviction counters of the in-process media cache"""
+    return {
+        "success": True,
+        "message": "Media cache stats retrieved successfully",
+        "data": {
+            "media": media_cache.stats(),
+            "presigned_urls": presigned_url_cache_stats(),
+            "video_metadata": video_metadata_cache.stats(),
+        }
+    }
@@ -3,14 +3,19 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from minio import Minio
 from settings import settings
 import uuid
-from pydantic_models.upload import UploadMetadata
+from pydantic_models.upload import UploadMetadata, UploadSessionStart, UploadPartUrlsRequest, UploadSessionComplete
 from database.models.video import Video
-from database.engine import get_db
-from sqlalchemy.orm import Session
-from datetime import timedelta
+from database.engine import get_async_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from pydantic_models.response import Response
 from schemas.videoSchema import VideoSchema
 from typing import Optional
+from cache.videos import invalidate_video_counts, video_metadata_cache
+from botocore.exceptions import ClientError
+from storage.s3 import get_s3_client
+from storage.multipart import MAX_PARTS, plan_parts, presigned_part_urls
+from storage.presign import presigned_put_url
 
 router = APIRouter(
     prefix="/upload",
@@ -24,32 +29,25 @@ minio_client = Minio(
     secure=False,
 )
 
+def _presign_upload_urls(video_id: str, thumbnail_id: str) -> tuple[str, str]:
+    # Buckets are created once at startup (storage.s3.ensure_buckets)
+    return (
+        presigned_put_url(settings.MINIO_RAW_VIDEO_BUCKET, video_id),
+        presigned_put_url(settings.MINIO_VIDEO_THUMBNAIL_BUCKET, thumbnail_id),
+    )
+
 # Get presigned URLs for video and thumbnail upload
 @router.get("/presigned-urls")
-def get_presigned_urls():
+async def get_presigned_urls():
     try:
         generated_id = uuid.uuid4()
 
         video_id = f"videos/{generated_id}.mp4"
         thumbnail_id = f"thumbnails/{generated_id}.jpg"
 
-        # Check if the bucket exists
-        if not minio_client.bucket_exists(settings.MINIO_RAW_VIDEO_BUCKET):
-            minio_client.make_bucket(settings.MINIO_RAW_VIDEO_BUCKET)
-
-        if not minio_client.bucket_exists(settings.MINIO_VIDEO_THUMBNAIL_BUCKET):
-            minio_client.make_bucket(settings.MINIO_VIDEO_THUMBNAIL_BUCKET)
-
-        video_presigned_url = minio_client.presigned_put_object(
-            settings.MINIO_RAW_VIDEO_BUCKET,
-            video_id,
-            expires=timedelta(seconds=3600),
-        )
-
-        thumbnail_presigned_url = minio_client.presigned_put_object(
-            settings.MINIO_VIDEO_THUMBNAIL_BUCKET,
-            thumbnail_id,
-            expires=timedelta(seconds=3600),
+        # Signing is CPU-bound; keep it off the event loop
+        video_presigned_url, thumbnail_presigned_url = await run_in_threadpool(
+            _presign_upload_urls, video_id, thumbnail_id
         )
 
         return {
@@ -66,6 +64,180 @@ def get_presigned_urls():
             detail="Server error"
         )
 
+def _session_key(object_id: str) -> str:
+    """Object key of a multipart session's video; only server-issued UUIDs are accepted."""
+    try:
+        return f"videos/{uuid.UUID(object_id)}.mp4"
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid upload id")
+
+def _is_missing_upload(e: ClientError) -> bool:
+    return e.response.get('Error', {}).get('Code') in ("NoSuchUpload", "404")
+
+async def _list_uploaded_parts(object_key: str, upload_id: str) -> list[dict]:
+    """Every part stored so far for a multipart upload, following pagination."""
+    s3_client = get_s3_client()
+    parts = []
+    marker = 0
+    while True:
+        response = await s3_client.list_parts(
+            Bucket=settings.MINIO_RAW_VIDEO_BUCKET,
+            Key=object_key,
+            UploadId=upload_id,
+            PartNumberMarker=marker,
+        )
+        parts.extend(
+            {"part_number": part['PartNumber'], "etag": part['ETag'], "size": part['Size']}
+            for part in response.get('Parts', [])
+        )
+        if not response.get('IsTruncated'):
+            return parts
+        marker = response['NextPartNumberMarker']
+
+# Multipart upload sessions: the client uploads parts in parallel straight to
+# storage with presigned URLs, and can resume by listing the parts already stored
+@router.post("/sessions", status_code=201)
+async def start_upload_session(session: UploadSessionStart):
+    """
+    Start a multipart upload of a video and sign URLs for its first parts.
+
+    Parts beyond the first UPLOAD_PART_URL_BATCH, and fresh URLs after they
+    expire, come from POST /upload/sessions/{object_id}/part-urls.
+    """
+    try:
+        part_size, part_count = plan_parts(session.size, session.part_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        object_id = str(uuid.uuid4())
+        object_key = _session_key(object_id)
+        response = await get_s3_client().create_multipart_upload(
+            Bucket=settings.MINIO_RAW_VIDEO_BUCKET,
+            Key=object_key,
+            ContentType=session.content_type or "video/mp4",
+        )
+        upload_id = response['UploadId']
+        first_parts = list(range(1, min(part_count, settings.UPLOAD_PART_URL_BATCH) + 1))
+
+        return {
+            "object_id": object_id,
+            "object_key": object_key,
+            "upload_id": upload_id,
+            "part_size": part_size,
+            "part_count": part_count,
+            # Signing is CPU-bound; keep it off the event loop
+            "parts": await run_in_threadpool(
+                presigned_part_urls, settings.MINIO_RAW_VIDEO_BUCKET, object_key, upload_id, first_parts
+            ),
+        }
+    except Exception as e:
+        logging.error(f"Error starting upload session: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+@router.post("/sessions/{object_id}/part-urls")
+async def get_upload_part_urls(object_id: str, request: UploadPartUrlsRequest):
+    """Sign upload URLs for specific parts, e.g. the next batch or parts being retried."""
+    object_key = _session_key(object_id)
+    if not request.part_numbers or len(request.part_numbers) > settings.UPLOAD_PART_URL_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Request between 1 and {settings.UPLOAD_PART_URL_BATCH} parts",
+        )
+    if any(not 1 <= n <= MAX_PARTS for n in request.part_numbers):
+        raise HTTPException(status_code=400, detail=f"Part numbers must be between 1 and {MAX_PARTS}")
+
+    # Signing needs no storage round trip, so check the upload belongs to this
+    # object first; otherwise any upload ID would get URLs for any session
+    try:
+        await get_s3_client().list_parts(
+            Bucket=settings.MINIO_RAW_VIDEO_BUCKET,
+            Key=object_key,
+            UploadId=request.upload_id,
+            MaxParts=1,
+        )
+    except ClientError as e:
+        if _is_missing_upload(e):
+            raise HTTPException(status_code=404, detail="Upload session not found")
+        logging.error(f"Error checking upload of {object_key}: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+    return {
+        "parts": await run_in_threadpool(
+            presigned_part_urls,
+            settings.MINIO_RAW_VIDEO_BUCKET, object_key, request.upload_id, request.part_numbers,
+        ),
+    }
+
+@router.get("/sessions/{object_id}/parts")
+async def list_upload_parts(object_id: str, upload_id: str):
+    """List the parts already stored, so an interrupted upload only sends the missing ones."""
+    object_key = _session_key(object_id)
+    try:
+        return {"parts": await _list_uploaded_parts(object_key, upload_id)}
+    except ClientError as e:
+        if _is_missing_upload(e):
+            raise HTTPException(status_code=404, detail="Upload session not found")
+        logging.error(f"Error listing parts of {object_key}: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+@router.post("/sessions/{object_id}/complete")
+async def complete_upload_session(object_id: str, request: UploadSessionComplete):
+    """
+    Assemble the uploaded parts into the video object.
+
+    Storage emits the upload event once the object exists, which starts transcoding.
+    """
+    object_key = _session_key(object_id)
+    try:
+        parts = (
+            [part.model_dump() for part in request.parts]
+            if request.parts
+            else await _list_uploaded_parts(object_key, request.upload_id)
+        )
+        if not parts:
+            raise HTTPException(status_code=400, detail="No parts have been uploaded")
+
+        await get_s3_client().complete_multipart_upload(
+            Bucket=settings.MINIO_RAW_VIDEO_BUCKET,
+            Key=object_key,
+            UploadId=request.upload_id,
+            MultipartUpload={"Parts": [
+                {"PartNumber": part["part_number"], "ETag": part["etag"]}
+                for part in sorted(parts, key=lambda part: part["part_number"])
+            ]},
+        )
+        return {"message": "Upload successful", "object_id": object_id, "object_key": object_key}
+    except HTTPException:
+        raise
+    except ClientError as e:
+        if _is_missing_upload(e):
+            raise HTTPException(status_code=404, detail="Upload session not found")
+        if e.response.get('Error', {}).get('Code') in ("InvalidPart", "InvalidPartOrder", "EntityTooSmall"):
+            raise HTTPException(status_code=400, detail=e.response['Error'].get('Message', "Invalid parts"))
+        logging.error(f"Error completing upload of {object_key}: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+    except Exception as e:
+        logging.error(f"Error completing upload of {object_key}: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+@router.delete("/sessions/{object_id}")
+async def abort_upload_session(object_id: str, upload_id: str):
+    """Abort an upload and discard its stored parts."""
+    object_key = _session_key(object_id)
+    try:
+        await get_s3_client().abort_multipart_upload(
+            Bucket=settings.MINIO_RAW_VIDEO_BUCKET,
+            Key=object_key,
+            UploadId=upload_id,
+        )
+        return {"message": "Upload aborted", "object_id": object_id}
+    except ClientError as e:
+        if _is_missing_upload(e):
+            raise HTTPException(status_code=404, detail="Upload session not found")
+        logging.error(f"Error aborting upload of {object_key}: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
 @router.post("/", status_code=201)
 async def upload_file_directly(
     isVideo: bool = Form(...),
@@ -82,12 +254,10 @@ async def upload_file_directly(
         object_uuid = thumbnail_id if thumbnail_id else str(uuid.uuid4())
         object_key = f"{prefix}/{object_uuid}"
 
-        # Ensure bucket exists
-        if not minio_client.bucket_exists(bucket):
-            minio_client.make_bucket(bucket)
-
+        # The MinIO SDK is blocking; keep it off the event loop
         # Read the file into memory. For large files consider streaming.
-        minio_client.put_object(
+        await run_in_threadpool(
+            minio_client.put_object,
             bucket,
             object_key,
             file.file,
@@ -103,9 +273,9 @@ async def upload_file_directly(
 
 
 @router.post("/metadata", status_code=201)
-def upload_metadata(
+async def upload_metadata(
     metadata: UploadMetadata,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         video = Video(
@@ -114,11 +284,11 @@ def upload_metadata(
             description=metadata.description,
         )
 
-        print("video: ", video)
-
         db.add(video)
-        db.commit()
-        db.refresh(video)
+        await db.commit()
+        await db.refresh(video)
+        invalidate_video_counts()
+        await video_metadata_cache.invalidate(video.id)
 
         return {
             "message": "Video metadata uploaded successfully",
@@ -126,7 +296,6 @@ def upload_metadata(
         }
         # return Response.success(message="Video metadata uploaded successfully")
     except Exception as e:
-        print("Error uploading metadata: ", e)
         logging.error(e)
         raise HTTPException(status_code=500, detail="Server error")
 
@@ -1,80 +1,218 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import StreamingResponse
-from database.engine import get_db
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse, RedirectResponse, Response as PlainResponse
+from starlette.concurrency import run_in_threadpool
+from database.engine import get_async_db
+from sqlalchemy import bindparam, func, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic_models.response import Response
 from database.models.video import Video, ProcessingStatus
+from pydantic_models.video import VideoBatchRequest, VideoTelemetryUpdate
 import logging
-import boto3
-from botocore.client import Config
 from botocore.exceptions import BotoCoreError, ClientError
 from settings import settings
+from storage.s3 import get_s3_client
+from storage.objects import StoredObject
+from storage.presign import presigned_get_url
+from cache.media import media_cache, invalidate_manifests
+from cache.videos import video_count_cache, video_metadata_cache, invalidate_video_counts
+from utils.byte_range import (
+    MultipartByteranges,
+    RangeNotSatisfiable,
+    content_range,
+    iter_body_chunks,
+    iter_bytes,
+    parse_range_header,
+    range_header_value,
+)
+from utils.manifest_rewrite import resolve_relative, rewrite_dash_manifest, rewrite_hls_playlist
+from utils.conditional import (
+    INDEX_EXTENSIONS,
+    cache_control_for,
+    has_conditional_headers,
+    if_range_allows,
+    is_not_modified,
+    is_versioned,
+    validator_headers,
+)
+from utils.cursor import InvalidCursor, decode_cursor, encode_cursor
+from utils.thumbnails import THUMBNAIL_INDEX_PATH, pick_thumbnail_variant
+from typing import Optional
+from datetime import datetime, timezone
 import io
+import posixpath
 
 router = APIRouter(
     prefix="/videos",
     tags=["Videos"],
 )
 
-def get_s3_client():
-    """Get or create S3 client for MinIO"""
-    try:
-        endpoint_url = settings.MINIO_URL
-        if not endpoint_url.startswith('http'):
-            endpoint_url = f"http://{endpoint_url}"
-            
-        return boto3.client(
-            's3',
-            endpoint_url=endpoint_url,
-            aws_access_key_id=settings.MINIO_ACCESS_KEY,
-            aws_secret_access_key=settings.MINIO_SECRET_KEY,
-            region_name='us-east-1',
-            config=Config(signature_version='s3v4')
-        )
-    except Exception as e:
-        logging.error(f"Failed to create S3 client: {e}")
-        raise HTTPException(status_code=500, detail="Storage service unavailable")
+# Content types of the files a transcode publishes, by extension
+SEGMENT_MEDIA_TYPES = {
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+    ".mpd": "application/dash+xml",
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".json": "application/json",
+    ".vtt": "text/vtt",
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+}
+
+async def _count_videos(db: AsyncSession, status: Optional[ProcessingStatus]) -> int:
+    """Total for the listing, cached for VIDEO_COUNT_CACHE_TTL seconds per filter."""
+    async def load_count():
+        query = select(func.count()).select_from(Video)
+        if status is not None:
+            query = query.where(_status_filter(status))
+        return await db.scalar(query), 1
+
+    return await video_count_cache.aget_or_load(
+        ("count", status.value if status else None),
+        load_count,
+        ttl=settings.VIDEO_COUNT_CACHE_TTL,
+    )
+
+def _status_filter(status: ProcessingStatus):
+    # Inline the literal so the planner can match the partial status indexes
+    return Video.processing_status == bindparam(
+        "status", status, type_=Video.processing_status.type, literal_execute=True
+    )
 
 @router.get("/")
-def get_all_videos(
-    db: Session = Depends(get_db),
+async def get_all_videos(
+    db: AsyncSession = Depends(get_async_db),
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    status: Optional[ProcessingStatus] = None,
 ):
-    """Get all videos with pagination"""
+    """
+    Get all videos, newest first.
+
+    Pass the ``next_cursor`` of a page as ``cursor`` to fetch the following
+    page by keyset on (created_at, id); this stays constant-time for deep
+    pages, unlike ``offset``.
+    """
     try:
-        videos = db.query(Video).order_by(Video.created_at.desc()).offset(offset).limit(limit).all()
+        query = select(Video).order_by(Video.created_at.desc(), Video.id.desc())
+        if status is not None:
+            query = query.where(_status_filter(status))
+        if cursor:
+            try:
+                created_at, last_id = decode_cursor(cursor)
+            except InvalidCursor:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.where(tuple_(Video.created_at, Video.id) < tuple_(created_at, last_id))
+        else:
+            query = query.offset(offset)
+
+        # Fetch one extra row to know whether another page exists
+        result = await db.execute(query.limit(limit + 1))
+        videos = list(result.scalars())
+        has_more = len(videos) > limit
+        videos = videos[:limit]
+
+        next_cursor = None
+        if has_more and videos:
+            next_cursor = encode_cursor(videos[-1].created_at, videos[-1].id)
+
         video_list = [video.to_dict() for video in videos]
+        total = await _count_videos(db, status)
         
         return {
             "success": True,
             "message": "Videos retrieved successfully",
             "data": {
                 "videos": video_list,
-                "total": db.query(Video).count(),
+                "total": total,
                 "limit": limit,
-                "offset": offset
+                "offset": None if cursor else offset,
+                "next_cursor": next_cursor,
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error fetching videos: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
+@router.post("/batch")
+async def get_videos_by_ids(
+    batch: VideoBatchRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get metadata for several videos in one query.
+
+    Videos are returned in the order requested (duplicates collapsed) with a
+    lean column set for grids; unknown IDs are listed under ``missing``.
+    """
+    ids = list(dict.fromkeys(batch.ids))
+    if len(ids) > settings.VIDEO_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.VIDEO_BATCH_MAX_IDS} video IDs can be requested at once"
+        )
+
+    try:
+        rows = []
+        if ids:
+            result = await db.execute(
+                select(
+                    Video.id,
+                    Video.title,
+                    Video.processing_status,
+                    Video.progress,
+                    Video.created_at,
+                ).where(Video.id.in_(ids))
+            )
+            rows = result.all()
+
+        found = {
+            row.id: {
+                "id": row.id,
+                "title": row.title,
+                "processing_status": row.processing_status.value,
+                "progress": row.progress,
+                "created_at": row.created_at,
+            }
+            for row in rows
+        }
+
+        return {
+            "success": True,
+            "message": "Videos retrieved successfully",
+            "data": {
+                "videos": [found[video_id] for video_id in ids if video_id in found],
+                "missing": [video_id for video_id in ids if video_id not in found],
+            }
+        }
+    except Exception as e:
+        logging.error(f"Error fetching video batch: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
 @router.get("/{video_id}")
-def get_video_by_id(
+async def get_video_by_id(
     video_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get video metadata by ID"""
     try:
-        video = db.query(Video).filter(Video.id == video_id).first()
-        if not video:
+        async def load_video():
+            video = await db.scalar(select(Video).where(Video.id == video_id))
+            return jsonable_encoder(video.to_dict()) if video else None
+
+        data = await video_metadata_cache.get_or_load(video_id, load_video)
+        if data is None:
             raise HTTPException(status_code=404, detail="Video not found")
         
         return {
             "success": True,
             "message": "Video found",
-            "data": video.to_dict()
+            "data": data
         }
     except HTTPException:
         raise
@@ -82,41 +220,165 @@ def get_video_by_id(
         logging.error(e)
         raise HTTPException(status_code=500, detail="Server error")
 
+def _not_modified(request: Request, obj: StoredObject, headers: dict) -> Optional[PlainResponse]:
+    """Return a 304 response if the client's cached copy is still current."""
+    if not is_not_modified(request.headers, obj.etag, obj.last_modified):
+        return None
+    if obj.body is not None:
+        obj.body.close()
+    return PlainResponse(status_code=304, headers=headers)
+
+def _redirect_to_storage(bucket: str, object_key: str) -> RedirectResponse:
+    """302 to a presigned storage URL so the media bytes bypass the API process."""
+    return RedirectResponse(
+        presigned_get_url(bucket, object_key),
+        status_code=302,
+        headers={
+            "Access-Control-Allow-Origin": "*",
+            # Never let a client reuse the redirect after the URL it points to expires
+            "Cache-Control": f"private, max-age={settings.MEDIA_PRESIGN_REFRESH_MARGIN}",
+        },
+    )
+
+def _direct_url_for(video_id: str, base_dir: str):
+    """Build a url_for callback that presigns manifest-relative paths for direct playback."""
+    def url_for(path: str) -> str:
+        return presigned_get_url(
+            settings.MINIO_PROCESS_VIDEO_BUCKET,
+            resolve_relative(base_dir, path),
+            expires_in=settings.MEDIA_DIRECT_MANIFEST_PRESIGN_EXPIRES,
+        )
+    return url_for
+
 @router.get("/{video_id}/manifest")
-def get_video_manifest(video_id: str):
-    """Stream DASH manifest file from MinIO"""
+async def get_video_manifest(video_id: str, request: Request, direct: bool = False):
+    """
+    Stream DASH manifest file from MinIO.
+
+    With ``direct=true`` the manifest lists presigned storage URLs for every
+    segment, so the player fetches media straight from MinIO.
+    """
     try:
         s3_client = get_s3_client()
         
         # Get manifest file from MinIO
         object_key = f"{video_id}/manifest.mpd"
 
-        print(object_key)
-        print(settings.MINIO_PROCESS_VIDEO_BUCKET)
-        
-        response = s3_client.get_object(
-            Bucket=settings.MINIO_PROCESS_VIDEO_BUCKET,
-            Key=object_key
+        async def load_manifest():
+            response = await s3_client.get_object(
+                Bucket=settings.MINIO_PROCESS_VIDEO_BUCKET,
+                Key=object_key
+            )
+            async with response['Body'] as body:
+                content = await body.read()
+            return StoredObject.from_response(response, data=content), len(content)
+
+        manifest = await media_cache.aget_or_load(
+            (video_id, "manifest.mpd"),
+            load_manifest,
+            ttl=settings.MEDIA_CACHE_MANIFEST_TTL,
         )
-        
-        content = response['Body'].read()
+
+        if direct:
+            async def load_direct_manifest():
+                # Signing one URL per segment is CPU-bound; keep it off the event loop
+                content = await run_in_threadpool(
+                    rewrite_dash_manifest, manifest.data, _direct_url_for(video_id, video_id)
+                )
+                return StoredObject(size=len(content), data=content), len(content)
+
+            try:
+                rewritten = await media_cache.aget_or_load(
+                    (video_id, "manifest.mpd#direct"),
+                    load_direct_manifest,
+                    ttl=settings.MEDIA_CACHE_MANIFEST_TTL,
+                )
+            except ValueError as e:
+                # Segment routes can still redirect, so the proxied manifest remains playable
+                logging.warning(f"Cannot rewrite manifest for {video_id} to direct URLs: {e}")
+            else:
+                return StreamingResponse(
+                    io.BytesIO(rewritten.data),
+                    media_type="application/dash+xml",
+                    headers={
+                        "Access-Control-Allow-Origin": "*",
+                        "Access-Control-Allow-Methods": "GET, OPTIONS",
+                        "Access-Control-Allow-Headers": "*",
+                        # Embedded URLs are signed and expire, so never cache this variant
+                        "Cache-Control": "private, no-store",
+                    },
+                )
+
+        headers = {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "GET, OPTIONS",
+            "Access-Control-Allow-Headers": "*",
+            "Cache-Control": cache_control_for(object_key),
+            **validator_headers(manifest.etag, manifest.last_modified),
+        }
+
+        not_modified = _not_modified(request, manifest, headers)
+        if not_modified is not None:
+            return not_modified
         
         return StreamingResponse(
-            io.BytesIO(content),
+            io.BytesIO(manifest.data),
             media_type="application/dash+xml",
-            headers={
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET, OPTIONS",
-                "Access-Control-Allow-Headers": "*",
-            }
+            headers=headers,
         )
     except Exception as e:
         logging.error(f"Error fetching manifest: {e}")
         raise HTTPException(status_code=404, detail="Manifest not found")
 
+async def _load_thumbnail_index(s3_client, video_id: str):
+    """Fetch the transcoder's thumbnail index; a missing index is cached as empty."""
+    try:
+        response = await s3_client.get_object(
+            Bucket=settings.MINIO_PROCESS_VIDEO_BUCKET, Key=f"{video_id}/{THUMBNAIL_INDEX_PATH}"
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ("NoSuchKey", "404"):
+            return StoredObject(size=0, data=b""), 0
+        raise
+    async with response['Body'] as body:
+        content = await body.read()
+    return StoredObject.from_response(response, data=content), len(content)
+
 @router.get("/{video_id}/thumbnail")
-def get_video_thumbnail(video_id: str):
-    """Stream video thumbnail from MinIO"""
+async def get_video_thumbnail(video_id: str, request: Request, width: Optional[int] = None):
+    """
+    Serve a video thumbnail.
+
+    Transcoded videos have posters in several widths as WebP and JPEG: the
+    narrowest one at least ``width`` pixels wide is served (the largest when no
+    width is given), as WebP if the client accepts it. Videos without them fall
+    back to the thumbnail uploaded with the video.
+    """
+    try:
+        index = await media_cache.aget_or_load(
+            (video_id, THUMBNAIL_INDEX_PATH),
+            lambda: _load_thumbnail_index(get_s3_client(), video_id),
+            ttl=settings.MEDIA_CACHE_MANIFEST_TTL,
+        )
+        variant = pick_thumbnail_variant(index.data, width, request.headers.get("accept", ""))
+    except Exception as e:
+        logging.error(f"Error reading thumbnail index for {video_id}: {e}")
+        variant = None
+
+    if variant is not None:
+        response = await get_video_segment(video_id, variant, request)
+        if not isinstance(response, RedirectResponse):
+            # Unlike the variant itself, this URL may later resolve to another image
+            response.headers["Cache-Control"] = "public, max-age=86400"
+        response.headers["Vary"] = "Accept"
+        return response
+
+    headers = {
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Methods": "GET, OPTIONS",
+        "Access-Control-Allow-Headers": "*",
+        "Cache-Control": "public, max-age=86400",
+    }
     try:
         s3_client = get_s3_client()
         
@@ -125,82 +387,282 @@ def get_video_thumbnail(video_id: str):
         # MinIO bucket: video-thumbnails
         # Full object path: thumbnails/{uuid}
         object_key = f"thumbnails/{video_id}"
+
+        if settings.MEDIA_DELIVERY_MODE == "redirect":
+            return _redirect_to_storage(settings.MINIO_VIDEO_THUMBNAIL_BUCKET, object_key)
+
+        # Forward the client's validators so MinIO answers 304 without sending the body
+        conditions = {}
+        if request.headers.get("if-none-match"):
+            conditions["IfNoneMatch"] = request.headers["if-none-match"]
+        elif request.headers.get("if-modified-since"):
+            conditions["IfModifiedSince"] = request.headers["if-modified-since"]
         
-        response = s3_client.get_object(
+        response = await s3_client.get_object(
             Bucket=settings.MINIO_VIDEO_THUMBNAIL_BUCKET,
-            Key=object_key
+            Key=object_key,
+            **conditions,
         )
-        
-        content = response['Body'].read()
+        thumbnail = StoredObject.from_response(response, body=response['Body'])
+        headers.update(validator_headers(thumbnail.etag, thumbnail.last_modified))
+        headers["Content-Length"] = str(thumbnail.size)
         
         return StreamingResponse(
-            io.BytesIO(content),
+            iter_body_chunks(thumbnail.body, settings.MEDIA_STREAM_CHUNK_SIZE),
             media_type="image/jpeg",
-            headers={
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET, OPTIONS",
-                "Access-Control-Allow-Headers": "*",
-                "Cache-Control": "public, max-age=86400",
-            }
+            headers=headers,
         )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == '304':
+            upstream = e.response.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+            if upstream.get('etag'):
+                headers["ETag"] = upstream['etag']
+            if upstream.get('last-modified'):
+                headers["Last-Modified"] = upstream['last-modified']
+            return PlainResponse(status_code=304, headers=headers)
+        logging.error(f"Error fetching thumbnail for {video_id}: {e}")
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
     except Exception as e:
         logging.error(f"Error fetching thumbnail for {video_id}: {e}")
         raise HTTPException(status_code=404, detail="Thumbnail not found")
 
+async def _load_segment(s3_client, bucket: str, object_key: str, ranged: bool):
+    """
+    Fetch a segment for the media cache loader.
+
+    Objects up to MEDIA_CACHE_MAX_ENTRY_BYTES are buffered and cached. Larger
+    objects are returned uncached: with an open body for full reads, or with
+    only their metadata when the caller will fetch byte ranges itself.
+    """
+    if ranged:
+        head = await s3_client.head_object(Bucket=bucket, Key=object_key)
+        if head['ContentLength'] > settings.MEDIA_CACHE_MAX_ENTRY_BYTES:
+            return StoredObject.from_response(head), None
+        response = await s3_client.get_object(Bucket=bucket, Key=object_key)
+    else:
+        response = await s3_client.get_object(Bucket=bucket, Key=object_key)
+        if response['ContentLength'] > settings.MEDIA_CACHE_MAX_ENTRY_BYTES:
+            return StoredObject.from_response(response, body=response['Body']), None
+
+    async with response['Body'] as body:
+        content = await body.read()
+    return StoredObject.from_response(response, data=content), len(content)
+
+async def _load_direct_playlist(s3_client, bucket: str, video_id: str, segment_path: str):
+    """Fetch an HLS playlist and presign the segment and init URIs it references."""
+    object_key = f"{video_id}/{segment_path}"
+    response = await s3_client.get_object(Bucket=bucket, Key=object_key)
+    async with response['Body'] as body:
+        content = await body.read()
+    base_dir = posixpath.dirname(object_key)
+    rewritten = await run_in_threadpool(
+        rewrite_hls_playlist, content, _direct_url_for(video_id, base_dir)
+    )
+    return StoredObject(size=len(rewritten), data=rewritten), len(rewritten)
+
 @router.get("/{video_id}/{segment_path:path}")
-def get_video_segment(video_id: str, segment_path: str):
-    """Stream video segment files from MinIO"""
+async def get_video_segment(video_id: str, segment_path: str, request: Request):
+    """Stream video segment files from MinIO, honouring HTTP Range requests"""
     try:
         s3_client = get_s3_client()
+        bucket = settings.MINIO_PROCESS_VIDEO_BUCKET
+        chunk_size = settings.MEDIA_STREAM_CHUNK_SIZE
         
         # Get segment file from MinIO
         object_key = f"{video_id}/{segment_path}"
+        cache_key = (video_id, segment_path)
         
-        response = s3_client.get_object(
-            Bucket=settings.MINIO_PROCESS_VIDEO_BUCKET,
-            Key=object_key
+        extension = posixpath.splitext(segment_path)[1].lower()
+        media_type = SEGMENT_MEDIA_TYPES.get(extension, "application/octet-stream")
+
+        headers = {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "GET, OPTIONS",
+            "Access-Control-Allow-Headers": "*",
+            "Access-Control-Expose-Headers": "Content-Range, Content-Length, Accept-Ranges, ETag, Last-Modified",
+            "Accept-Ranges": "bytes",
+            "Cache-Control": cache_control_for(segment_path),
+        }
+
+        if settings.MEDIA_DELIVERY_MODE == "redirect":
+            if segment_path.endswith(".m3u8"):
+                # Playlists stay on the API so their URIs can be presigned individually
+                playlist = await media_cache.aget_or_load(
+                    (video_id, f"{segment_path}#direct"),
+                    lambda: _load_direct_playlist(s3_client, bucket, video_id, segment_path),
+                    ttl=settings.MEDIA_CACHE_MANIFEST_TTL,
+                )
+                return StreamingResponse(
+                    io.BytesIO(playlist.data),
+                    media_type=media_type,
+                    headers={**headers, "Cache-Control": "private, no-store"},
+                )
+            # Indexes stay on the API too: the storyboard's relative sheet URLs
+            # must resolve against this route, not an unsigned storage URL
+            if not segment_path.endswith(INDEX_EXTENSIONS):
+                return _redirect_to_storage(bucket, object_key)
+
+        # Revalidation only needs metadata: answer from the cache or a HEAD request
+        if has_conditional_headers(request.headers):
+            cached = media_cache.get(cache_key)
+            metadata = cached or StoredObject.from_response(
+                await s3_client.head_object(Bucket=bucket, Key=object_key)
+            )
+            not_modified = _not_modified(
+                request, metadata, {**headers, **validator_headers(metadata.etag, metadata.last_modified)}
+            )
+            if not_modified is not None:
+                return not_modified
+
+        range_header = request.headers.get("range")
+        segment = await media_cache.aget_or_load(
+            cache_key,
+            lambda: _load_segment(s3_client, bucket, object_key, ranged=bool(range_header)),
+            # Only objects under a transcode revision are never rewritten
+            ttl=None if is_versioned(segment_path) else settings.MEDIA_CACHE_MANIFEST_TTL,
         )
-        
-        content = response['Body'].read()
-        
-        # Determine media type based on file extension
-        media_type = "video/mp4"
-        if segment_path.endswith('.m4s'):
-            media_type = "video/iso.segment"
-        elif segment_path.endswith('.mp4'):
-            media_type = "video/mp4"
+        size = segment.size
+        headers.update(validator_headers(segment.etag, segment.last_modified))
+
+        ranges = None
+        if range_header and if_range_allows(request.headers, segment.etag, segment.last_modified):
+            try:
+                ranges = parse_range_header(range_header, size)
+            except RangeNotSatisfiable as e:
+                if segment.body is not None:
+                    segment.body.close()
+                raise HTTPException(
+                    status_code=416,
+                    detail="Requested range not satisfiable",
+                    headers={"Content-Range": f"bytes */{e.size}"},
+                )
+
+        async def iter_range(start: int, end: int):
+            if segment.data is not None:
+                return iter_bytes(segment.data, start, end, chunk_size)
+            response = await s3_client.get_object(
+                Bucket=bucket,
+                Key=object_key,
+                Range=range_header_value(start, end),
+            )
+            return iter_body_chunks(response['Body'], chunk_size)
+
+        if ranges and len(ranges) > 1:
+            multipart = MultipartByteranges(ranges, size, media_type)
+            headers["Content-Length"] = str(multipart.content_length)
+            return StreamingResponse(
+                multipart.iter_body(iter_range),
+                status_code=206,
+                media_type=multipart.content_type,
+                headers=headers,
+            )
+
+        if ranges:
+            start, end = ranges[0]
+            headers["Content-Range"] = content_range(start, end, size)
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                await iter_range(start, end),
+                status_code=206,
+                media_type=media_type,
+                headers=headers,
+            )
+
+        headers["Content-Length"] = str(size)
+        if segment.body is not None:
+            content = iter_body_chunks(segment.body, chunk_size)
+        elif segment.data is not None:
+            content = iter_bytes(segment.data, 0, size - 1, chunk_size)
+        else:
+            # Large object looked up for a Range we are not honouring: fetch it whole
+            response = await s3_client.get_object(Bucket=bucket, Key=object_key)
+            content = iter_body_chunks(response['Body'], chunk_size)
         
         return StreamingResponse(
-            io.BytesIO(content),
+            content,
             media_type=media_type,
-            headers={
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET, OPTIONS",
-                "Access-Control-Allow-Headers": "*",
-                "Accept-Ranges": "bytes",
-            }
+            headers=headers,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error fetching segment {segment_path}: {e}")
         raise HTTPException(status_code=404, detail="Segment not found")
 
 @router.put("/")
-def update_video_status_by_id(
+async def update_video_status_by_id(
     id: str,
-    db: Session = Depends(get_db)
+    status: ProcessingStatus = ProcessingStatus.COMPLETED,
+    db: AsyncSession = Depends(get_async_db)
 ):
+    """
+    Set a video's processing status; COMPLETED when no status is given.
+
+    The transcoder reports status through the status event topic (see
+    events.status_updater); this endpoint is kept for manual corrections. A
+    PLAYABLE update never downgrades a completed video.
+    """
     try:
-        video = db.query(Video).filter(Video.id == id).first()
+        video = await db.scalar(select(Video).where(Video.id == id))
         if not video:
             raise HTTPException(status_code=404, detail="Video not found")
         
-        video.processing_status = ProcessingStatus.COMPLETED
-        db.commit()
+        if not (status == ProcessingStatus.PLAYABLE and video.processing_status == ProcessingStatus.COMPLETED):
+            video.processing_status = status
+            video.processing_error = None
+        await db.commit()
+        invalidate_video_counts()
+        await video_metadata_cache.invalidate(id)
+        invalidate_manifests(id)
         
         return {
             "success": True,
             "message": "Video status updated successfully"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(e)
         raise HTTPException(status_code=500, detail="Server error")
+
+@router.put("/{video_id}/telemetry")
+async def update_video_telemetry(
+    video_id: str,
+    telemetry: VideoTelemetryUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Record transcoder progress and/or per-stage timings for a video.
+
+    Called by the transcoder every few seconds while encoding, so it updates
+    the row in a single statement without loading it first.
+    """
+    values = {}
+    if telemetry.progress is not None:
+        values["progress"] = {
+            **telemetry.progress.model_dump(),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+    if telemetry.stage_timings is not None:
+        values["stage_timings"] = telemetry.stage_timings
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+
+    try:
+        result = await db.execute(
+            update(Video).where(Video.id == video_id).values(**values)
+        )
+        if result.rowcount == 0:
+            raise HTTPException(status_code=404, detail="Video not found")
+        await db.commit()
+        await video_metadata_cache.invalidate(video_id)
+
+        return {
+            "success": True,
+            "message": "Video telemetry updated successfully"
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error updating telemetry for {video_id}: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
@@ -5,6 +5,13 @@ load_dotenv()
 
 class Settings(BaseSettings):
     POSTGRES_DB_URL: str = ""
+    # Database connection pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
     MINIO_ROOT_USER: str = ""
     MINIO_ROOT_PASSWORD: str = ""
     MINIO_URL: str = ""
@@ -14,5 +21,50 @@ class Settings(BaseSettings):
     MINIO_VIDEO_THUMBNAIL_BUCKET: str = ""
     MINIO_PREVIEW_IMAGE_ENDPOINT: str = ""
     MINIO_PROCESS_VIDEO_BUCKET: str = ""
+    # Browser-reachable MinIO endpoint used when signing URLs; falls back to MINIO_URL
+    MINIO_PUBLIC_URL: str = ""
+    # Size of each chunk when streaming media bodies to the client
+    MEDIA_STREAM_CHUNK_SIZE: int = 64 * 1024
+    # Shared S3 client connection pool
+    S3_MAX_POOL_CONNECTIONS: int = 50
+    S3_KEEPALIVE_TIMEOUT: float = 30
+    S3_CONNECT_TIMEOUT: float = 5
+    S3_READ_TIMEOUT: float = 60
+    S3_MAX_ATTEMPTS: int = 3
+    # In-process cache for manifests and segments
+    MEDIA_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    MEDIA_CACHE_MAX_ENTRY_BYTES: int = 8 * 1024 * 1024
+    MEDIA_CACHE_MANIFEST_TTL: float = 30
+    # "proxy" streams media through the API, "redirect" answers with a 302 to a presigned URL
+    MEDIA_DELIVERY_MODE: str = "proxy"
+    MEDIA_PRESIGN_EXPIRES: int = 900
+    MEDIA_PRESIGN_REFRESH_MARGIN: int = 60
+    # Direct manifests embed presigned segment URLs, which must outlive a playback session
+    MEDIA_DIRECT_MANIFEST_PRESIGN_EXPIRES: int = 6 * 3600
+    PRESIGNED_URL_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    # How long listing totals are reused before recounting
+    VIDEO_COUNT_CACHE_TTL: float = 30
+    # Read-through cache for GET /videos/{id}: "memory" (per worker) or "redis" (shared)
+    VIDEO_METADATA_CACHE_BACKEND: str = "memory"
+    VIDEO_METADATA_CACHE_URL: str = ""
+    VIDEO_METADATA_CACHE_TTL: float = 300
+    VIDEO_METADATA_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    # Upper bound on IDs accepted by POST /videos/batch
+    VIDEO_BATCH_MAX_IDS: int = 100
+    # Multipart upload sessions: default part size, part URL lifetime, and how
+    # many part URLs are signed per request
+    UPLOAD_PART_SIZE: int = 16 * 1024 * 1024
+    UPLOAD_PART_URL_EXPIRES: int = 3600
+    UPLOAD_PART_URL_BATCH: int = 100
+    # Where transcoder status events come from: "kafka", "memory" (in-process stand-in) or "" to disable
+    STATUS_EVENTS_SOURCE: str = "kafka"
+    KAFKA_BROKER: str = ""
+    STATUS_EVENTS_TOPIC: str = "video-status"
+    STATUS_EVENTS_GROUP: str = "video-status-updater"
+    # Events written per bulk UPDATE, and how long to wait for a batch to start
+    STATUS_BATCH_MAX_EVENTS: int = 500
+    STATUS_BATCH_MAX_WAIT: float = 0.5
+    # How long events for a video whose row is not inserted yet are held and retried
+    STATUS_PENDING_TIMEOUT: float = 600
 
 settings = Settings()
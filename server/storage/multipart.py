@@ -0,0 +1,43 @@
+import math
+from typing import Optional
+from storage.s3 import get_presign_client
+from settings import settings
+
+# S3 multipart limits: every part but the last is at least 5 MiB, at most 10,000 parts
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PART_SIZE = 5 * 1024 * 1024 * 1024
+MAX_PARTS = 10000
+
+
+def plan_parts(size: int, requested_part_size: Optional[int] = None) -> tuple[int, int]:
+    """
+    Pick the part size for an upload of ``size`` bytes.
+
+    Returns:
+        (part_size, part_count)
+
+    Raises:
+        ValueError: If the file cannot be uploaded within S3's limits
+    """
+    if size <= 0:
+        raise ValueError("size must be positive")
+    part_size = max(requested_part_size or settings.UPLOAD_PART_SIZE, MIN_PART_SIZE, math.ceil(size / MAX_PARTS))
+    if part_size > MAX_PART_SIZE:
+        raise ValueError(f"{size} bytes exceeds the multipart upload limit")
+    return part_size, math.ceil(size / part_size)
+
+
+def presigned_part_urls(bucket: str, key: str, upload_id: str, part_numbers: list[int]) -> list[dict]:
+    """Sign one PUT URL per part; signing is local, so no request reaches storage."""
+    client = get_presign_client()
+    return [
+        {
+            "part_number": part_number,
+            "url": client.generate_presigned_url(
+                'upload_part',
+                Params={'Bucket': bucket, 'Key': key, 'UploadId': upload_id, 'PartNumber': part_number},
+                ExpiresIn=settings.UPLOAD_PART_URL_EXPIRES,
+            ),
+        }
+        for part_number in part_numbers
+    ]
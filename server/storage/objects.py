@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+
+@dataclass
+class StoredObject:
+    """An object fetched from storage, either buffered in memory or still streaming."""
+    size: int
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+    # Full body, present when the object is small enough to be cached
+    data: Optional[bytes] = None
+    # Open botocore StreamingBody for objects served without buffering
+    body: Optional[Any] = None
+
+    @classmethod
+    def from_response(cls, response: dict, **kwargs) -> "StoredObject":
+        """Build from a head_object/get_object response, keeping its validators."""
+        return cls(
+            size=response['ContentLength'],
+            etag=response.get('ETag'),
+            last_modified=response.get('LastModified'),
+            **kwargs,
+        )
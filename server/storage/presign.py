@@ -0,0 +1,39 @@
+from typing import Optional
+from cache.lru import ByteBudgetLRUCache
+from storage.s3 import get_presign_client
+from settings import settings
+
+# Presigned URLs are a few hundred bytes each, so this holds tens of thousands
+_url_cache = ByteBudgetLRUCache(max_bytes=settings.PRESIGNED_URL_CACHE_MAX_BYTES)
+
+
+def presigned_get_url(bucket: str, key: str, expires_in: Optional[int] = None) -> str:
+    """
+    Return a presigned GET URL for an object, reusing a cached one until
+    MEDIA_PRESIGN_REFRESH_MARGIN seconds before it expires.
+    """
+    expires_in = expires_in or settings.MEDIA_PRESIGN_EXPIRES
+
+    def sign():
+        url = get_presign_client().generate_presigned_url(
+            'get_object',
+            Params={'Bucket': bucket, 'Key': key},
+            ExpiresIn=expires_in,
+        )
+        return url, len(url)
+
+    ttl = max(expires_in - settings.MEDIA_PRESIGN_REFRESH_MARGIN, 1)
+    return _url_cache.get_or_load((bucket, key, expires_in), sign, ttl=ttl)
+
+
+def presigned_put_url(bucket: str, key: str, expires_in: int = 3600) -> str:
+    """Return a presigned PUT URL for a browser upload; each object is signed once, so it is not cached."""
+    return get_presign_client().generate_presigned_url(
+        'put_object',
+        Params={'Bucket': bucket, 'Key': key},
+        ExpiresIn=expires_in,
+    )
+
+
+def presigned_url_cache_stats() -> dict:
+    return _url_cache.stats()
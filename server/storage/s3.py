@@ -0,0 +1,225 @@
+import asyncio
+import inspect
+import logging
+import threading
+from contextlib import AsyncExitStack
+import boto3
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+from botocore.client import Config
+from botocore.exceptions import ClientError
+from settings import settings
+
+_client = None
+_exit_stack = None
+_presign_client = None
+_lock = threading.Lock()
+
+
+class _PoolUsage:
+    """
+    Connections the shared client has checked out, counted by the app itself.
+
+    A call holds a connection until it returns; a streamed body holds it until
+    the body is closed. Everything runs on the event loop, so plain integers
+    are enough.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    def acquire(self) -> None:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+
+_usage = _PoolUsage()
+
+
+class _TrackedBody:
+    """A response body that hands its connection back to the usage count once closed."""
+
+    def __init__(self, body):
+        self._body = body
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._body, name)
+
+    def _release(self) -> None:
+        if not self._released:
+            self._released = True
+            _usage.release()
+
+    def close(self) -> None:
+        try:
+            self._body.close()
+        finally:
+            self._release()
+
+    async def aclose(self) -> None:
+        try:
+            await self._body.aclose()
+        finally:
+            self._release()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+
+class _TrackedClient:
+    """Forwards to the aiobotocore client, counting every API call in ``_usage``."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            _usage.acquire()
+            try:
+                response = await attr(*args, **kwargs)
+            except BaseException:
+                _usage.release()
+                raise
+            if isinstance(response, dict) and response.get('Body') is not None:
+                response['Body'] = _TrackedBody(response['Body'])
+            else:
+                _usage.release()
+            return response
+
+        return call
+
+
+def _endpoint_url(url: str = None) -> str:
+    endpoint_url = url or settings.MINIO_URL
+    if not endpoint_url.startswith('http'):
+        endpoint_url = f"http://{endpoint_url}"
+    return endpoint_url
+
+
+def _client_config() -> AioConfig:
+    return AioConfig(
+        signature_version='s3v4',
+        max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+        connect_timeout=settings.S3_CONNECT_TIMEOUT,
+        read_timeout=settings.S3_READ_TIMEOUT,
+        retries={'max_attempts': settings.S3_MAX_ATTEMPTS, 'mode': 'standard'},
+        connector_args={'keepalive_timeout': settings.S3_KEEPALIVE_TIMEOUT},
+    )
+
+
+async def init_s3_client():
+    """Create the process-wide async S3 client. Called once at application startup."""
+    global _client, _exit_stack
+    if _client is None:
+        _exit_stack = AsyncExitStack()
+        _client = _TrackedClient(await _exit_stack.enter_async_context(
+            get_session().create_client(
+                's3',
+                endpoint_url=_endpoint_url(),
+                aws_access_key_id=settings.MINIO_ACCESS_KEY,
+                aws_secret_access_key=settings.MINIO_SECRET_KEY,
+                region_name='us-east-1',
+                config=_client_config(),
+            )
+        ))
+        logging.info(
+            f"S3 client initialised for {_endpoint_url()} "
+            f"(pool size {settings.S3_MAX_POOL_CONNECTIONS})"
+        )
+    return _client
+
+
+def get_s3_client():
+    """Return the shared async S3 client created by init_s3_client()."""
+    if _client is None:
+        raise RuntimeError("S3 client is not initialised; init_s3_client() must run at startup")
+    return _client
+
+
+def get_presign_client():
+    """
+    Return a client that signs URLs against MINIO_PUBLIC_URL.
+
+    The signature covers the host, so URLs handed to browsers must be signed
+    for the public endpoint rather than the in-cluster one. Signing happens
+    locally, so this client never opens a connection.
+    """
+    global _presign_client
+    if _presign_client is None:
+        with _lock:
+            if _presign_client is None:
+                _presign_client = boto3.client(
+                    's3',
+                    endpoint_url=_endpoint_url(settings.MINIO_PUBLIC_URL),
+                    aws_access_key_id=settings.MINIO_ACCESS_KEY,
+                    aws_secret_access_key=settings.MINIO_SECRET_KEY,
+                    region_name='us-east-1',
+                    config=Config(signature_version='s3v4', s3={'addressing_style': 'path'})
+                )
+    return _presign_client
+
+
+async def ensure_buckets(*bucket_names: str, attempts: int = 10, retry_delay: float = 2.0) -> None:
+    """
+    Create any missing bucket. Called once at startup so request handlers never
+    check bucket existence; retries while MinIO is still starting.
+    """
+    client = get_s3_client()
+    for bucket_name in filter(None, bucket_names):
+        for attempt in range(1, attempts + 1):
+            try:
+                try:
+                    await client.head_bucket(Bucket=bucket_name)
+                except ClientError as e:
+                    if e.response.get('Error', {}).get('Code') not in ("404", "NoSuchBucket"):
+                        raise
+                    await client.create_bucket(Bucket=bucket_name)
+                    logging.info(f"Created bucket {bucket_name}")
+                break
+            except Exception as e:
+                if attempt == attempts:
+                    logging.error(f"Could not verify bucket {bucket_name}: {e}")
+                    raise
+                logging.warning(f"Bucket {bucket_name} not reachable yet ({e}), retrying in {retry_delay}s")
+                await asyncio.sleep(retry_delay)
+
+
+async def close_s3_client() -> None:
+    """Release pooled connections held by the shared S3 client."""
+    global _client, _exit_stack
+    if _exit_stack is not None:
+        await _exit_stack.aclose()
+    _client = None
+    _exit_stack = None
+
+
+def get_pool_stats() -> dict:
+    """
+    Report connection pool usage of the shared S3 client.
+
+    ``in_flight`` counts calls and open response bodies, each holding or
+    waiting for one pooled connection, so ``waiting`` is what exceeds the pool.
+    """
+    limit = settings.S3_MAX_POOL_CONNECTIONS
+    # A limit of 0 leaves the pool unbounded
+    in_use = min(_usage.in_flight, limit) if limit else _usage.in_flight
+    return {
+        "max_pool_connections": limit,
+        "in_flight": _usage.in_flight,
+        "in_use": in_use,
+        "waiting": _usage.in_flight - in_use,
+        "peak_in_flight": _usage.peak,
+        "saturation": round(in_use / limit, 3) if limit else 0.0,
+    }
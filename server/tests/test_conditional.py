@@ -0,0 +1,48 @@
+import pytest
+
+from utils.conditional import (
+    IMMUTABLE_CACHE_CONTROL,
+    INDEX_EXTENSIONS,
+    REVALIDATE_CACHE_CONTROL,
+    cache_control_for,
+)
+
+
+@pytest.mark.parametrize("path", [
+    "manifest.mpd",
+    "master.m3u8",
+    "thumbnails/index.json",
+    "storyboard/storyboard.vtt",
+    "r1a2b3c4d5e6f/media_0.m3u8",
+    "r1a2b3c4d5e6f/manifest.mpd",
+    "r1a2b3c4d5e6f/storyboard/storyboard.vtt",
+    # Published before revisions existed, so they may be rewritten in place
+    "init-stream0.m4s",
+    "chunk-stream0-00001.m4s",
+    "storyboard/sheet-001.jpg",
+])
+def test_entry_points_and_unversioned_objects_are_revalidated(path):
+    assert cache_control_for(path) == REVALIDATE_CACHE_CONTROL
+
+
+@pytest.mark.parametrize("path", [
+    "r1a2b3c4d5e6f/init-stream0.m4s",
+    "r1a2b3c4d5e6f/chunk-stream0-00001.m4s",
+    "r1a2b3c4d5e6f/hd/chunk-stream1-00003.m4s",
+    "r1a2b3c4d5e6f/thumbnails/thumb-320.webp",
+    "r1a2b3c4d5e6f/storyboard/sheet-001.jpg",
+    "video-1/r1a2b3c4d5e6f/chunk-stream0-00001.m4s",
+])
+def test_objects_under_a_revision_are_immutable(path):
+    assert cache_control_for(path) == IMMUTABLE_CACHE_CONTROL
+
+
+@pytest.mark.parametrize("path", ["rev/chunk.m4s", "r1a2b3/chunk.m4s", "xr1a2b3c4d5e6f/chunk.m4s"])
+def test_lookalike_directories_are_not_revisions(path):
+    assert cache_control_for(path) == REVALIDATE_CACHE_CONTROL
+
+
+def test_thumbnail_index_and_storyboard_are_indexes():
+    assert "thumbnails/index.json".endswith(INDEX_EXTENSIONS)
+    assert "storyboard/storyboard.vtt".endswith(INDEX_EXTENSIONS)
+    assert not "chunk-stream0-00001.m4s".endswith(INDEX_EXTENSIONS)
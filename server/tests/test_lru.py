@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+
+from cache.lru import ByteBudgetLRUCache
+
+
+def test_least_recently_used_entries_are_evicted_past_the_byte_budget():
+    cache = ByteBudgetLRUCache(max_bytes=10)
+    cache.set("a", "A", 4)
+    cache.set("b", "B", 4)
+    assert cache.get("a") == "A"
+    cache.set("c", "C", 4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.current_bytes == 8
+    assert cache.evictions == 1
+
+
+def test_replacing_an_entry_updates_the_byte_count():
+    cache = ByteBudgetLRUCache(max_bytes=10)
+    cache.set("a", "A", 4)
+    cache.set("a", "AA", 6)
+    assert cache.current_bytes == 6
+    cache.delete("a")
+    assert cache.current_bytes == 0
+
+
+def test_oversized_entries_are_not_stored():
+    cache = ByteBudgetLRUCache(max_bytes=100, max_entry_bytes=10)
+    cache.set("small", "s", 5)
+
+    assert cache.set("big", "b", 11) is False
+    assert cache.get("big") is None
+    assert cache.get("small") == "s"
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = ByteBudgetLRUCache(max_bytes=100)
+    cache.set("short", "s", 1, ttl=5)
+    cache.set("forever", "f", 1)
+
+    now[0] += 4.9
+    assert cache.get("short") == "s"
+    now[0] += 0.2
+    assert cache.get("short") is None
+    assert cache.get("forever") == "f"
+    assert cache.expirations == 1
+    assert cache.current_bytes == 1
+
+
+def test_delete_where_drops_matching_keys():
+    cache = ByteBudgetLRUCache(max_bytes=100)
+    cache.set(("a", "manifest.mpd"), "m", 1)
+    cache.set(("a", "chunk.m4s"), "c", 1)
+    cache.set(("b", "manifest.mpd"), "m", 1)
+
+    assert cache.delete_where(lambda key: key[0] == "a" and key[1].endswith(".mpd")) == 1
+    assert cache.get(("a", "manifest.mpd")) is None
+    assert cache.get(("a", "chunk.m4s")) == "c"
+    assert cache.get(("b", "manifest.mpd")) == "m"
+
+
+def test_uncacheable_loads_are_returned_but_not_stored():
+    cache = ByteBudgetLRUCache(max_bytes=100)
+    assert cache.get_or_load("k", lambda: ("v", None)) == "v"
+    assert cache.get("k") is None
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ByteBudgetLRUCache(max_bytes=100)
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "v", 1
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader))) for _ in range(4)]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["v"] * 4
+
+
+def test_concurrent_async_misses_share_one_load():
+    cache = ByteBudgetLRUCache(max_bytes=100)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "v", 1
+
+    async def scenario():
+        return await asyncio.gather(*(cache.aget_or_load("k", loader, ttl=30) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["v"] * 5
+    assert calls == [1]
+
+
+def test_failed_load_releases_the_key_lock():
+    cache = ByteBudgetLRUCache(max_bytes=100)
+
+    async def failing():
+        raise OSError("storage unavailable")
+
+    async def succeeding():
+        return "v", 1
+
+    async def scenario():
+        try:
+            await cache.aget_or_load("k", failing)
+        except OSError:
+            pass
+        return await cache.aget_or_load("k", succeeding)
+
+    assert asyncio.run(scenario()) == "v"
@@ -0,0 +1,46 @@
+from utils.manifest_rewrite import resolve_relative, rewrite_hls_playlist
+
+MASTER = b"""#EXTM3U
+#EXT-X-VERSION:7
+#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="group_A1",NAME="audio_0",DEFAULT=YES,URI="media_2.m3u8"
+#EXT-X-STREAM-INF:BANDWIDTH=1180800,RESOLUTION=640x360,CODECS="avc1.64001e,mp4a.40.2",AUDIO="group_A1"
+media_0.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=3580800,RESOLUTION=1280x720,CODECS="avc1.64001f,mp4a.40.2",AUDIO="group_A1"
+media_1.m3u8
+"""
+
+MEDIA = b"""#EXTM3U
+#EXT-X-VERSION:7
+#EXT-X-TARGETDURATION:4
+#EXT-X-MEDIA-SEQUENCE:1
+#EXT-X-MAP:URI="init-stream0.m4s"
+#EXTINF:4.000000,
+chunk-stream0-00001.m4s
+#EXTINF:2.000000,
+chunk-stream0-00002.m4s
+#EXT-X-ENDLIST
+"""
+
+
+def signer(base_dir):
+    return lambda path: f"https://storage.example/{resolve_relative(base_dir, path)}?X-Amz-Signature=abc"
+
+
+def test_master_playlist_keeps_variant_playlists_relative():
+    rewritten = rewrite_hls_playlist(MASTER, signer("video-1")).decode()
+
+    assert 'URI="media_2.m3u8"' in rewritten
+    assert "\nmedia_0.m3u8\n" in rewritten
+    assert "\nmedia_1.m3u8\n" in rewritten
+    assert "storage.example" not in rewritten
+
+
+def test_media_playlist_presigns_segments_and_init_map():
+    rewritten = rewrite_hls_playlist(MEDIA, signer("video-1")).decode()
+    lines = rewritten.splitlines()
+
+    assert '#EXT-X-MAP:URI="https://storage.example/video-1/init-stream0.m4s?X-Amz-Signature=abc"' in lines
+    assert "https://storage.example/video-1/chunk-stream0-00001.m4s?X-Amz-Signature=abc" in lines
+    assert "https://storage.example/video-1/chunk-stream0-00002.m4s?X-Amz-Signature=abc" in lines
+    assert "#EXTINF:4.000000," in lines
+    assert lines[-1] == "#EXT-X-ENDLIST"
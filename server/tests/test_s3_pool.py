@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiobotocore")
+pytest.importorskip("boto3")
+pytest.importorskip("pydantic_settings")
+
+from aiobotocore.session import get_session
+
+from storage import s3
+
+
+class FakeBody:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    async def aclose(self):
+        self.close()
+
+
+class FakeClient:
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.proceed = asyncio.Event()
+
+    async def head_object(self, **kwargs):
+        self.started.set()
+        await self.proceed.wait()
+        return {"ContentLength": 1}
+
+    async def get_object(self, **kwargs):
+        return {"Body": FakeBody()}
+
+    def generate_presigned_url(self, *args, **kwargs):
+        return "http://example"
+
+
+@pytest.fixture(autouse=True)
+def usage(monkeypatch):
+    usage = s3._PoolUsage()
+    monkeypatch.setattr(s3, "_usage", usage)
+    return usage
+
+
+def test_call_holds_a_connection_until_it_returns(usage):
+    async def scenario():
+        fake = FakeClient()
+        client = s3._TrackedClient(fake)
+        task = asyncio.create_task(client.head_object(Bucket="b", Key="k"))
+        await fake.started.wait()
+        assert usage.in_flight == 1
+        fake.proceed.set()
+        await task
+
+    asyncio.run(scenario())
+    assert usage.in_flight == 0
+    assert usage.peak == 1
+
+
+def test_body_holds_a_connection_until_closed(usage):
+    async def scenario():
+        client = s3._TrackedClient(FakeClient())
+        response = await client.get_object(Bucket="b", Key="k")
+        assert usage.in_flight == 1
+        async with response["Body"]:
+            pass
+        assert response["Body"].closed
+        response["Body"].close()
+
+    asyncio.run(scenario())
+    assert usage.in_flight == 0
+
+
+def test_cancelled_call_releases_its_connection(usage):
+    async def scenario():
+        fake = FakeClient()
+        client = s3._TrackedClient(fake)
+        task = asyncio.create_task(client.head_object(Bucket="b", Key="k"))
+        await fake.started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert usage.in_flight == 0
+
+
+def test_sync_methods_are_not_counted(usage):
+    client = s3._TrackedClient(FakeClient())
+    assert client.generate_presigned_url("get_object") == "http://example"
+    assert usage.in_flight == 0
+
+
+def test_stats_report_waiting_beyond_the_pool(usage, monkeypatch):
+    monkeypatch.setattr(s3.settings, "S3_MAX_POOL_CONNECTIONS", 2)
+    usage.in_flight = 3
+    stats = s3.get_pool_stats()
+    assert stats["in_use"] == 2
+    assert stats["waiting"] == 1
+    assert stats["saturation"] == 1.0
+
+
+def test_aiobotocore_api_methods_are_tracked():
+    async def scenario():
+        async with get_session().create_client(
+            "s3", endpoint_url="http://localhost:9", region_name="us-east-1",
+            aws_access_key_id="test", aws_secret_access_key="test",
+        ) as client:
+            tracked = s3._TrackedClient(client)
+            # API methods must be coroutine functions, or calls would go uncounted
+            assert tracked.get_object is not client.get_object
+            assert tracked.meta is client.meta
+
+    asyncio.run(scenario())
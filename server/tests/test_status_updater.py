@@ -0,0 +1,248 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("asyncpg")
+pytest.importorskip("psycopg2")
+
+from sqlalchemy.dialects import postgresql
+
+from cache.media import media_cache
+from cache.videos import video_count_cache
+from database.models.video import ProcessingStatus
+from events.broker import InMemoryEventSource
+from events.status_updater import BULK_STATUS_UPDATE, StatusUpdater
+
+NEW_ROW = {"processing_status": None, "processing_error": None, "progress": None, "status_seq": None}
+
+
+class FakeVideos:
+    """
+    In-memory videos table that applies BULK_STATUS_UPDATE rows with the same
+    seq guard and COMPLETED/PLAYABLE rule as the SQL statement.
+    """
+
+    def __init__(self, *video_ids: str):
+        self.rows = {video_id: dict(NEW_ROW) for video_id in video_ids}
+        self.executed: list[list[dict]] = []
+
+    def session(self):
+        return FakeSession(self)
+
+    def apply(self, params: list[dict]) -> None:
+        self.executed.append(params)
+        for param in params:
+            row = self.rows.get(param["b_id"])
+            if row is None or (row["status_seq"] is not None and row["status_seq"] >= param["b_seq"]):
+                continue
+            status = param["b_status"]
+            if status is not None and not (
+                row["processing_status"] == ProcessingStatus.COMPLETED and status == ProcessingStatus.PLAYABLE
+            ):
+                row["processing_status"] = status
+                row["processing_error"] = param["b_error"]
+            if param["b_progress"] is not None:
+                row["progress"] = param["b_progress"]
+            row["status_seq"] = param["b_seq"]
+
+
+class FakeSession:
+    def __init__(self, videos: FakeVideos):
+        self.videos = videos
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        if statement is BULK_STATUS_UPDATE:
+            self.videos.apply(params)
+            return None
+        # The existence check: SELECT id FROM videos WHERE id IN (...)
+        ids = [value for values in statement.compile().params.values() for value in values]
+        return FakeResult([video_id for video_id in ids if video_id in self.videos.rows])
+
+    async def commit(self):
+        pass
+
+
+class FakeResult:
+    def __init__(self, values):
+        self.values = values
+
+    def scalars(self):
+        return iter(self.values)
+
+
+class FlakySource(InMemoryEventSource):
+    """Raises from get_batch once, as a dropped broker connection would."""
+
+    def __init__(self):
+        super().__init__()
+        self.failures = 1
+        self.starts = 0
+
+    async def start(self) -> None:
+        self.starts += 1
+        await super().start()
+
+    async def get_batch(self, max_records: int, timeout: float) -> list[dict]:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("broker went away")
+        return await super().get_batch(max_records, timeout)
+
+
+def run_updater(source: InMemoryEventSource, videos: FakeVideos, events: list[dict]) -> StatusUpdater:
+    """Publish ``events``, run the updater until all of them are committed, then stop it."""
+    async def scenario():
+        updater = StatusUpdater(source, session_factory=videos.session, max_wait=0.01, retry_delay=0.01)
+        for event in events:
+            source.publish(event)
+        updater.start()
+        for _ in range(500):
+            if source.committed == len(events):
+                break
+            await asyncio.sleep(0.01)
+        await updater.stop()
+        return updater
+
+    return asyncio.run(scenario())
+
+
+def test_events_for_one_video_fold_into_one_row():
+    videos = FakeVideos("a")
+    source = InMemoryEventSource()
+    updater = run_updater(source, videos, [
+        {"video_id": "a", "seq": 1, "status": "IN_PROGRESS"},
+        {"video_id": "a", "seq": 2, "progress": {"stage": "encode", "percent": 40.0}},
+        {"video_id": "a", "seq": 3, "status": "COMPLETED"},
+    ])
+
+    assert source.committed == 3
+    assert updater.applied == 3
+    assert len(videos.executed) == 1
+    assert len(videos.executed[0]) == 1
+    assert videos.rows["a"]["processing_status"] == ProcessingStatus.COMPLETED
+    assert videos.rows["a"]["progress"]["percent"] == 40.0
+    assert videos.rows["a"]["status_seq"] == 3
+
+
+def test_out_of_order_events_in_a_batch_keep_the_newest_status():
+    videos = FakeVideos("a")
+    run_updater(InMemoryEventSource(), videos, [
+        {"video_id": "a", "seq": 5, "status": "FAILED", "error": "ffmpeg exited with 1"},
+        {"video_id": "a", "seq": 4, "status": "IN_PROGRESS"},
+    ])
+
+    row = videos.executed[0][0]
+    assert row["b_seq"] == 5
+    assert row["b_status"] == ProcessingStatus.FAILED
+    assert videos.rows["a"]["processing_error"] == "ffmpeg exited with 1"
+
+
+def test_seq_guard_ignores_older_events():
+    videos = FakeVideos("a")
+    videos.rows["a"].update(processing_status=ProcessingStatus.COMPLETED, status_seq=10)
+    run_updater(InMemoryEventSource(), videos, [
+        {"video_id": "a", "seq": 7, "status": "IN_PROGRESS"},
+    ])
+
+    assert videos.executed[0][0]["b_seq"] == 7
+    assert videos.rows["a"]["processing_status"] == ProcessingStatus.COMPLETED
+    assert videos.rows["a"]["status_seq"] == 10
+
+
+def test_bulk_update_guards_on_status_seq():
+    sql = str(BULK_STATUS_UPDATE.compile(dialect=postgresql.dialect()))
+    where = sql.split("WHERE", 1)[1]
+    assert "videos.status_seq IS NULL OR videos.status_seq <" in where
+
+
+def test_status_change_invalidates_counts():
+    videos = FakeVideos("a", "b")
+    video_count_cache.set("all", 2, 1)
+    run_updater(InMemoryEventSource(), videos, [{"video_id": "a", "seq": 1, "progress": {"stage": "encode", "percent": 10.0}}])
+    assert video_count_cache.get("all") == 2
+
+    run_updater(InMemoryEventSource(), videos, [{"video_id": "b", "seq": 1, "status": "COMPLETED"}])
+    assert video_count_cache.get("all") is None
+
+
+def test_status_change_drops_cached_manifests():
+    videos = FakeVideos("a")
+    media_cache.set(("a", "manifest.mpd"), b"mpd", 3)
+    media_cache.set(("a", "r0123456789ab/chunk-stream0-00001.m4s"), b"seg", 3)
+    run_updater(InMemoryEventSource(), videos, [{"video_id": "a", "seq": 1, "status": "PLAYABLE"}])
+
+    assert media_cache.get(("a", "manifest.mpd")) is None
+    assert media_cache.get(("a", "r0123456789ab/chunk-stream0-00001.m4s")) == b"seg"
+
+
+def test_source_failure_restarts_and_redelivers():
+    videos = FakeVideos("a")
+    source = FlakySource()
+    run_updater(source, videos, [{"video_id": "a", "seq": 1, "status": "COMPLETED"}])
+
+    assert source.starts == 2
+    assert source.committed == 1
+    assert videos.rows["a"]["processing_status"] == ProcessingStatus.COMPLETED
+
+
+async def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition() and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.01)
+
+
+def test_events_for_a_missing_row_are_held_until_it_exists():
+    videos = FakeVideos("a")
+    source = InMemoryEventSource()
+
+    async def scenario():
+        updater = StatusUpdater(source, session_factory=videos.session, max_wait=0.01, retry_delay=0.01)
+        updater.start()
+        source.publish({"video_id": "late", "seq": 1, "status": "IN_PROGRESS"})
+        source.publish({"video_id": "a", "seq": 1, "status": "IN_PROGRESS"})
+        source.publish({"video_id": "late", "seq": 2, "status": "COMPLETED"})
+        await wait_for(lambda: updater.applied == 1)
+        await asyncio.sleep(0.05)
+
+        # "a" is written, but nothing is acknowledged while "late" is held
+        assert videos.rows["a"]["processing_status"] == ProcessingStatus.IN_PROGRESS
+        assert updater.pending == 2
+        assert source.committed == 0
+
+        videos.rows["late"] = dict(NEW_ROW)
+        await wait_for(lambda: source.committed == 3)
+        await updater.stop()
+        return updater
+
+    updater = asyncio.run(scenario())
+    assert updater.pending == 0
+    assert updater.applied == 3
+    assert videos.rows["late"]["processing_status"] == ProcessingStatus.COMPLETED
+    assert videos.rows["late"]["status_seq"] == 2
+
+
+def test_held_events_are_dropped_after_the_pending_timeout():
+    videos = FakeVideos()
+    source = InMemoryEventSource()
+
+    async def scenario():
+        updater = StatusUpdater(source, session_factory=videos.session, max_wait=0.01, retry_delay=0.01,
+                                pending_timeout=0.05)
+        source.publish({"video_id": "orphan", "seq": 1, "status": "COMPLETED"})
+        updater.start()
+        await wait_for(lambda: source.committed == 1)
+        await updater.stop()
+        return updater
+
+    updater = asyncio.run(scenario())
+    assert source.committed == 1
+    assert updater.pending == 0
+    assert updater.applied == 0
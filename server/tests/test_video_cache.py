@@ -0,0 +1,79 @@
+import asyncio
+
+from cache.videos import InProcessBackend, VideoMetadataCache
+
+
+def make_cache() -> VideoMetadataCache:
+    return VideoMetadataCache(backend=InProcessBackend(max_bytes=1024), ttl=60)
+
+
+def test_loaded_metadata_is_cached():
+    cache = make_cache()
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return {"id": "v1", "processing_status": "COMPLETED"}
+
+    async def run():
+        first = await cache.get_or_load("v1", loader)
+        second = await cache.get_or_load("v1", loader)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second == {"id": "v1", "processing_status": "COMPLETED"}
+    assert len(loads) == 1
+
+
+def test_load_overtaken_by_invalidation_is_not_cached():
+    cache = make_cache()
+    rows = {"v1": "IN_PROGRESS"}
+
+    async def run():
+        read = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_loader():
+            status = rows["v1"]
+            read.set()
+            await release.wait()
+            return {"id": "v1", "processing_status": status}
+
+        load = asyncio.create_task(cache.get_or_load("v1", slow_loader))
+        await read.wait()
+        # A writer commits and invalidates while the slow load holds the old row
+        rows["v1"] = "COMPLETED"
+        await cache.invalidate("v1")
+        release.set()
+        stale = await load
+
+        async def loader():
+            return {"id": "v1", "processing_status": rows["v1"]}
+
+        return stale, await cache.get_or_load("v1", loader)
+
+    stale, fresh = asyncio.run(run())
+
+    assert stale["processing_status"] == "IN_PROGRESS"
+    assert fresh["processing_status"] == "COMPLETED"
+    assert cache._generations == {}
+    assert cache._loads_in_flight == {}
+
+
+def test_failed_load_releases_its_generation():
+    cache = make_cache()
+
+    async def failing_loader():
+        raise RuntimeError("database down")
+
+    async def run():
+        try:
+            await cache.get_or_load("v1", failing_loader)
+        except RuntimeError:
+            pass
+
+    asyncio.run(run())
+
+    assert cache._generations == {}
+    assert cache._loads_in_flight == {}
@@ -0,0 +1,154 @@
+import uuid
+from typing import AsyncIterator, Optional
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when none of the requested byte ranges fit inside the object."""
+
+    def __init__(self, size: int):
+        super().__init__(f"Requested range not satisfiable for object of size {size}")
+        self.size = size
+
+
+def parse_range_header(range_header: Optional[str], size: int) -> Optional[list[tuple[int, int]]]:
+    """
+    Parse an HTTP Range header into a list of inclusive (start, end) byte ranges.
+
+    Args:
+        range_header: Raw value of the Range header (e.g. "bytes=0-499,1000-")
+        size: Total size of the object in bytes
+
+    Returns:
+        Sorted, coalesced list of ranges, or None if the header is absent or
+        malformed (in which case the full object should be served)
+
+    Raises:
+        RangeNotSatisfiable: If the header is valid but no range overlaps the object
+    """
+    if not range_header:
+        return None
+
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part or "-" not in part:
+            return None
+
+        first, _, last = part.partition("-")
+        try:
+            if first == "":
+                # Suffix range: the last N bytes of the object
+                suffix_length = int(last)
+                if suffix_length <= 0:
+                    continue
+                start = max(size - suffix_length, 0)
+                end = size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else None
+        except ValueError:
+            return None
+
+        if start < 0 or (end is not None and end < start):
+            return None
+        if start >= size:
+            continue
+        if end is None:
+            end = size - 1
+
+        ranges.append((start, min(end, size - 1)))
+
+    if not ranges:
+        raise RangeNotSatisfiable(size)
+
+    return coalesce_ranges(ranges)
+
+
+def coalesce_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Merge overlapping or adjacent ranges so each byte is sent at most once."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def content_range(start: int, end: int, size: int) -> str:
+    """Format a Content-Range header value."""
+    return f"bytes {start}-{end}/{size}"
+
+
+def range_header_value(start: int, end: int) -> str:
+    """Format a Range header value for forwarding a single range to S3."""
+    return f"bytes={start}-{end}"
+
+
+async def iter_body_chunks(body, chunk_size: int) -> AsyncIterator[bytes]:
+    """
+    Yield an aiobotocore StreamingBody in fixed-size chunks and close it afterwards,
+    so memory per request stays bounded regardless of object size.
+    """
+    try:
+        async for chunk in body.iter_chunks(chunk_size=chunk_size):
+            if chunk:
+                yield chunk
+    finally:
+        body.close()
+
+
+async def iter_bytes(data: bytes, start: int, end: int, chunk_size: int) -> AsyncIterator[bytes]:
+    """Yield the inclusive slice [start, end] of an in-memory body in fixed-size chunks."""
+    view = memoryview(data)
+    for offset in range(start, end + 1, chunk_size):
+        yield bytes(view[offset:min(offset + chunk_size, end + 1)])
+
+
+class MultipartByteranges:
+    """
+    Builds a multipart/byteranges response body for multi-range requests.
+
+    Each part is produced lazily through ``iter_part(start, end)``, a coroutine
+    returning an async iterator over the bytes of that range.
+    """
+
+    def __init__(self, ranges: list[tuple[int, int]], size: int, media_type: str):
+        self.ranges = ranges
+        self.size = size
+        self.media_type = media_type
+        self.boundary = uuid.uuid4().hex
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/byteranges; boundary={self.boundary}"
+
+    def _part_header(self, start: int, end: int) -> bytes:
+        return (
+            f"--{self.boundary}\r\n"
+            f"Content-Type: {self.media_type}\r\n"
+            f"Content-Range: {content_range(start, end, self.size)}\r\n"
+            "\r\n"
+        ).encode("latin-1")
+
+    def _closing(self) -> bytes:
+        return f"--{self.boundary}--\r\n".encode("latin-1")
+
+    @property
+    def content_length(self) -> int:
+        length = len(self._closing())
+        for start, end in self.ranges:
+            length += len(self._part_header(start, end)) + (end - start + 1) + 2
+        return length
+
+    async def iter_body(self, iter_part) -> AsyncIterator[bytes]:
+        for start, end in self.ranges:
+            yield self._part_header(start, end)
+            async for chunk in await iter_part(start, end):
+                yield chunk
+            yield b"\r\n"
+        yield self._closing()
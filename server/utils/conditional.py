@@ -0,0 +1,115 @@
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Mapping, Optional
+
+# Each transcode publishes under a fresh revision directory, so segments, init
+# files and images there are never rewritten
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Manifests and indexes, and media published before revisions existed, may be
+# rewritten in place; the ETag/Last-Modified validators keep revalidation cheap
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+# Revision directory written by the transcoder: "r" followed by 12 hex digits
+_REVISION_DIR = re.compile(r"(^|/)r[0-9a-f]{12}/")
+
+MANIFEST_EXTENSIONS = (".mpd", ".m3u8")
+# Files listing other objects of a video, rewritten whenever it is re-published:
+# manifests plus the thumbnail index and the storyboard
+INDEX_EXTENSIONS = MANIFEST_EXTENSIONS + (".json", ".vtt")
+
+
+def format_http_date(value: datetime) -> str:
+    """Format a datetime as an RFC 7231 HTTP-date."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _strip_weak(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(header_value: str, etag: Optional[str]) -> bool:
+    """Weak comparison of an If-None-Match / If-Range value against an ETag."""
+    if not etag:
+        return False
+    if header_value.strip() == "*":
+        return True
+    candidates = [_strip_weak(tag.strip()) for tag in header_value.split(",")]
+    return _strip_weak(etag) in candidates
+
+
+def is_not_modified(
+    headers: Mapping[str, str],
+    etag: Optional[str],
+    last_modified: Optional[datetime],
+) -> bool:
+    """
+    Decide whether a conditional GET can be answered with 304.
+
+    If-None-Match takes precedence over If-Modified-Since, as required by RFC 7232.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        since = _parse_http_date(if_modified_since)
+        if since is None:
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def has_conditional_headers(headers: Mapping[str, str]) -> bool:
+    return "if-none-match" in headers or "if-modified-since" in headers
+
+
+def if_range_allows(headers: Mapping[str, str], etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """Return False when If-Range no longer matches, meaning the full object must be sent."""
+    if_range = headers.get("if-range")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # Strong comparison is required for If-Range
+        return bool(etag) and not if_range.startswith("W/") and if_range == etag
+    since = _parse_http_date(if_range)
+    if since is None or last_modified is None:
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) == since
+
+
+def validator_headers(etag: Optional[str], last_modified: Optional[datetime]) -> dict[str, str]:
+    headers = {}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified is not None:
+        headers["Last-Modified"] = format_http_date(last_modified)
+    return headers
+
+
+def is_versioned(path: str) -> bool:
+    """Whether an object lives under a transcode revision and so never changes."""
+    return bool(_REVISION_DIR.search(path)) and not path.endswith(INDEX_EXTENSIONS)
+
+
+def cache_control_for(path: str) -> str:
+    return IMMUTABLE_CACHE_CONTROL if is_versioned(path) else REVALIDATE_CACHE_CONTROL
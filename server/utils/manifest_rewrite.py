@@ -0,0 +1,143 @@
+import copy
+import io
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+from typing import Callable
+
+DASH_NS = "urn:mpeg:dash:schema:mpd:2011"
+_TEMPLATE_IDENTIFIER = re.compile(r"\$(RepresentationID|Number|Bandwidth|Time)(?:%0(\d+)d)?\$")
+_HLS_URI_ATTRIBUTE = re.compile(r'URI="([^"]+)"')
+
+# Attributes that carry over unchanged from SegmentTemplate to SegmentList
+_SEGMENT_BASE_ATTRIBUTES = ("timescale", "presentationTimeOffset", "startNumber", "duration")
+
+
+def _tag(name: str) -> str:
+    return f"{{{DASH_NS}}}{name}"
+
+
+def _expand_template(template: str, representation_id: str, bandwidth: str, number: int, time: int) -> str:
+    values = {
+        "RepresentationID": representation_id,
+        "Number": number,
+        "Bandwidth": bandwidth,
+        "Time": time,
+    }
+
+    def substitute(match):
+        value = values[match.group(1)]
+        width = match.group(2)
+        if width and isinstance(value, int):
+            return f"{value:0{int(width)}d}"
+        return str(value)
+
+    return _TEMPLATE_IDENTIFIER.sub(substitute, template).replace("$$", "$")
+
+
+def _timeline_segments(timeline: ET.Element) -> list[int]:
+    """Return the start time of every segment described by a SegmentTimeline."""
+    starts = []
+    current = 0
+    for s in timeline.findall(_tag("S")):
+        if "t" in s.attrib:
+            current = int(s.attrib["t"])
+        duration = int(s.attrib["d"])
+        repeat = int(s.attrib.get("r", 0))
+        if repeat < 0:
+            raise ValueError("Open-ended SegmentTimeline repeats cannot be expanded")
+        for _ in range(repeat + 1):
+            starts.append(current)
+            current += duration
+    return starts
+
+
+def _register_namespaces(content: bytes) -> None:
+    for _, (prefix, uri) in ET.iterparse(io.BytesIO(content), events=("start-ns",)):
+        ET.register_namespace(prefix, uri)
+
+
+def rewrite_dash_manifest(content: bytes, url_for: Callable[[str], str]) -> bytes:
+    """
+    Replace every SegmentTemplate in a DASH manifest with an explicit SegmentList
+    whose URLs come from ``url_for(relative_path)``.
+
+    Templates cannot carry per-object signatures, so each segment is listed
+    individually. Only SegmentTimeline-based templates (what ffmpeg writes with
+    ``-use_timeline 1``) are supported; anything else raises ValueError.
+    """
+    _register_namespaces(content)
+    root = ET.fromstring(content)
+
+    for adaptation_set in root.iter(_tag("AdaptationSet")):
+        shared_template = adaptation_set.find(_tag("SegmentTemplate"))
+        for representation in adaptation_set.findall(_tag("Representation")):
+            template = representation.find(_tag("SegmentTemplate"))
+            owner = representation
+            if template is None:
+                template = shared_template
+                owner = None
+            if template is None:
+                continue
+
+            timeline = template.find(_tag("SegmentTimeline"))
+            if timeline is None:
+                raise ValueError("SegmentTemplate without SegmentTimeline cannot be expanded")
+
+            representation_id = representation.attrib.get("id", "")
+            bandwidth = representation.attrib.get("bandwidth", "")
+            start_number = int(template.attrib.get("startNumber", 1))
+
+            segment_list = ET.Element(_tag("SegmentList"), {
+                name: template.attrib[name]
+                for name in _SEGMENT_BASE_ATTRIBUTES if name in template.attrib
+            })
+            initialization = template.attrib.get("initialization")
+            if initialization:
+                path = _expand_template(initialization, representation_id, bandwidth, start_number, 0)
+                ET.SubElement(segment_list, _tag("Initialization"), {"sourceURL": url_for(path)})
+
+            segment_list.append(copy.deepcopy(timeline))
+            media = template.attrib["media"]
+            for offset, start_time in enumerate(_timeline_segments(timeline)):
+                path = _expand_template(media, representation_id, bandwidth, start_number + offset, start_time)
+                ET.SubElement(segment_list, _tag("SegmentURL"), {"media": url_for(path)})
+
+            if owner is not None:
+                owner.remove(template)
+            representation.append(segment_list)
+
+        if shared_template is not None:
+            adaptation_set.remove(shared_template)
+
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+def _is_playlist(uri: str) -> bool:
+    return uri.split("?", 1)[0].endswith(".m3u8")
+
+
+def rewrite_hls_playlist(content: bytes, url_for: Callable[[str], str]) -> bytes:
+    """
+    Point every segment and init map URI in an HLS playlist at ``url_for``.
+
+    Variant and rendition playlist URIs stay relative, so players fetch them
+    back through the API and their own segment URIs are rewritten in turn.
+    """
+    def rewrite(uri: str) -> str:
+        return uri if _is_playlist(uri) else url_for(uri)
+
+    lines = []
+    for line in content.decode("utf-8").splitlines():
+        stripped = line.strip()
+        if stripped and not stripped.startswith("#"):
+            line = rewrite(stripped)
+        elif stripped.startswith("#") and 'URI="' in stripped:
+            line = _HLS_URI_ATTRIBUTE.sub(lambda m: f'URI="{rewrite(m.group(1))}"', line)
+        lines.append(line)
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def resolve_relative(base_dir: str, path: str) -> str:
+    """Resolve a manifest-relative path against the manifest's directory."""
+    return posixpath.normpath(posixpath.join(base_dir, path))
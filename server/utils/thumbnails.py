@@ -0,0 +1,32 @@
+import json
+from typing import Optional
+
+# Written by the transcoder next to the poster variants it generates
+THUMBNAIL_INDEX_PATH = "thumbnails/index.json"
+
+
+def pick_thumbnail_variant(index_data: bytes, width: Optional[int], accept: str) -> Optional[str]:
+    """
+    Choose the generated poster that best fits a requested display width.
+
+    Args:
+        index_data: Raw thumbnail index, empty when the video has none
+        width: Width the client will display the image at; None picks the largest
+        accept: The request's Accept header; WebP is chosen when it is accepted
+
+    Returns:
+        Object path of the variant relative to the video's prefix, or None if
+        the video has no generated thumbnails
+    """
+    if not index_data:
+        return None
+    index = json.loads(index_data)
+    widths = sorted(index.get("widths") or [])
+    if not widths:
+        return None
+
+    # The narrowest variant that still covers the slot, so it is never upscaled
+    chosen = widths[-1] if width is None else next((w for w in widths if w >= width), widths[-1])
+    fmt = "webp" if "webp" in index.get("formats", []) and "image/webp" in accept else "jpg"
+    # Transcodes publish the images under a revision directory named by ``base``
+    return f"{index.get('base', '')}thumbnails/thumb-{chosen}.{fmt}"
@@ -1,44 +1,232 @@
 import os
-import requests
-import boto3
+import shutil
+import tempfile
 import subprocess
-from botocore.client import Config
+import threading
+import uuid
+from botocore.exceptions import ClientError
 from settings import settings
 from pathlib import Path
-from ffmpeg_presets import get_dash_transcode_preset, get_hls_transcode_preset
+from ffmpeg_presets import get_dash_and_hls_transcode_preset, get_image_preset, select_renditions
+from manifests import (
+    verify_shared_segments, merge_dash_manifests, merge_hls_masters, rebase_dash_manifest, rebase_hls_master,
+)
+from segment_uploader import SegmentUploader, upload_file
+from mp4_layout import moov_before_mdat
+from chunked import ChunkedTranscode
+from probe import SourceInfo, probe_source
+from complexity import measure_complexity
+from progress import FfmpegProgress, PROGRESS_ARGS
+from telemetry import StageTimer, TelemetryReporter
+from runtime import TranscoderRuntime
+from thumbnails import plan_images, prepare_image_dirs, rebase_image_index, write_image_index
+
+# Output subdirectory for the renditions added after the fast-start preview
+HD_SUBDIR = "hd"
+# Files players open first; copies at the video's root point into the current revision
+ENTRY_POINTS = ("manifest.mpd", "master.m3u8")
+
+
+def new_revision() -> str:
+    """
+    Directory name a transcode publishes its outputs under.
+
+    Every job gets a fresh one, so no segment key is ever rewritten and the
+    server can serve them as immutable. The server recognises exactly this
+    shape: "r" followed by 12 hex digits.
+    """
+    return f"r{uuid.uuid4().hex[:12]}"
 
 class VideoTranscoder:
-    def __init__(self):
-        self.s3 = boto3.client(
-            's3',
-            endpoint_url=settings.MINIO_URL,
-            aws_access_key_id=settings.MINIO_ACCESS_KEY,
-            aws_secret_access_key=settings.MINIO_SECRET_KEY,
-            region_name='us-east-1',
-            config=Config(signature_version='s3v4')
-        )
+    def __init__(self, runtime: TranscoderRuntime, threads: int = None):
+        # Pooled S3 client and status publisher shared by every job in the process
+        self.runtime = runtime
+        self.s3 = runtime.s3
+        # ffmpeg thread cap for this job; None lets ffmpeg use every core
+        self.threads = threads
 
     def download_video(self, bucket_name, object_key, download_path='input.mp4'):
         self.s3.download_file(bucket_name, object_key, download_path)
         print(f"Downloaded video to {download_path}")
 
-    def transcode_video(self, input_path='input.mp4', output_dir='output'):
+    def _read_range(self, bucket_name, object_key):
+        def read_range(start: int, end: int) -> bytes:
+            try:
+                response = self.s3.get_object(Bucket=bucket_name, Key=object_key, Range=f"bytes={start}-{end}")
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') == 'InvalidRange':
+                    return b""
+                raise
+            return response['Body'].read()
+        return read_range
+
+    def resolve_input(self, bucket_name, object_key, download_path) -> str:
+        """
+        Decide how ffmpeg reads the source and return the path or URL to pass to it.
+
+        In "stream" mode ffmpeg reads straight from a presigned GET URL, so
+        encoding starts immediately and no scratch copy is needed. "auto" streams
+        only fast-start MP4/MOV files; sources whose moov atom sits after the media
+        data (or that are not ISO BMFF) are downloaded first, since ffmpeg would
+        have to seek back and forth across the whole file over HTTP.
+        """
+        mode = settings.INPUT_MODE
+        if mode == "auto":
+            try:
+                mode = "stream" if moov_before_mdat(self._read_range(bucket_name, object_key)) else "download"
+            except Exception as e:
+                print(f"Could not inspect {object_key} layout, downloading instead: {e}")
+                mode = "download"
+
+        if mode == "stream":
+            print(f"Streaming {object_key} into ffmpeg from storage")
+            return self.s3.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': bucket_name, 'Key': object_key},
+                ExpiresIn=settings.INPUT_URL_EXPIRES,
+            )
+
+        self.download_video(bucket_name, object_key, download_path)
+        return str(download_path)
+
+    def _read_progress(self, stream, progress: FfmpegProgress):
+        for line in stream:
+            try:
+                progress.feed(line)
+            except Exception as e:
+                print(f"Failed to report progress: {e}")
+
+    def _run_ffmpeg(self, command, uploader: SegmentUploader = None, progress: FfmpegProgress = None):
+        reader = None
+        if progress is None:
+            process = subprocess.Popen(command)
+        else:
+            command = [command[0], *PROGRESS_ARGS, *command[1:]]
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+            reader = threading.Thread(target=self._read_progress, args=(process.stdout, progress), daemon=True)
+            reader.start()
         try:
-            dash_command = get_dash_transcode_preset(input_path, str(output_dir))
-            subprocess.run(dash_command, check=True)
-            
-            hls_command = get_hls_transcode_preset(input_path, str(output_dir))
-            subprocess.run(hls_command, check=True)
+            while True:
+                try:
+                    process.wait(timeout=1)
+                    break
+                except subprocess.TimeoutExpired:
+                    # Segments are uploading meanwhile; stop encoding if an upload failed
+                    if uploader is not None and uploader.error:
+                        raise RuntimeError(f"Segment upload failed: {uploader.error}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            if reader is not None:
+                reader.join(timeout=5)
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command)
+
+    def probe(self, input_path) -> SourceInfo:
+        """Probe the source; None falls back to the default ladder."""
+        try:
+            source = probe_source(input_path)
+        except Exception as e:
+            print(f"Could not probe {input_path}, using the default ladder: {e}")
+            return None
 
-            print(f"Video processed to DASH and HLS at {output_dir}")
+        if settings.BITRATE_MODE == "per_title":
+            try:
+                source.complexity = measure_complexity(
+                    input_path, source,
+                    samples=settings.PER_TITLE_SAMPLES,
+                    sample_duration=settings.PER_TITLE_SAMPLE_DURATION,
+                    crf=settings.PER_TITLE_CRF,
+                    min_factor=settings.PER_TITLE_MIN_FACTOR,
+                    max_factor=settings.PER_TITLE_MAX_FACTOR,
+                    threads=self.threads,
+                )
+            except Exception as e:
+                print(f"Complexity probe failed for {input_path}, using fixed bitrates: {e}")
+
+        renditions = ", ".join(f"{r[0]}@{r[2]}" for r in select_renditions(source))
+        print(
+            f"Source {source.display_width}x{source.display_height} @ {source.fps:.3f} fps, "
+            f"{'with' if source.has_audio else 'no'} audio, {source.duration:.1f}s -> {renditions}"
+        )
+        return source
+
+    def _use_chunked(self, source: SourceInfo) -> bool:
+        if settings.TRANSCODE_MODE != "chunked" or source is None:
+            return False
+        # Short sources gain nothing from splitting and pay for the extra packaging pass
+        return source.duration >= 2 * settings.CHUNK_DURATION
+
+    def _encode_progress(self, source: SourceInfo, reporter: TelemetryReporter, stage: str) -> FfmpegProgress:
+        if reporter is None:
+            return None
+
+        def report(percent, fps, speed, eta_seconds):
+            reporter.progress(stage, percent, fps, speed, eta_seconds)
+
+        return FfmpegProgress(source.duration if source else 0.0, report, settings.PROGRESS_INTERVAL)
+
+    def transcode_video(self, input_path='input.mp4', output_dir='output', uploader: SegmentUploader = None,
+                        work_dir=None, timer: StageTimer = None, reporter: TelemetryReporter = None,
+                        source: SourceInfo = None, renditions: list = None, include_audio: bool = True,
+                        stage: str = "encode", images: bool = False):
+        """
+        Encode ``renditions`` of the probed ``source`` (the whole ladder by default)
+        into CMAF DASH + HLS output in ``output_dir``. Without a probed source the
+        default 30 fps ladder with audio is used. With ``images``, thumbnails and
+        the storyboard are extracted from the same decode.
+        """
+        timer = timer or StageTimer()
+        image_plan = None
+        if images and settings.THUMBNAILS and source is not None and source.duration > 0:
+            image_plan = plan_images(source, settings.STORYBOARD_INTERVAL)
+            prepare_image_dirs(output_dir)
+        try:
+            with timer.stage(stage):
+                self._encode(input_path, output_dir, source, uploader, work_dir, reporter,
+                             renditions, include_audio, stage, image_plan)
+            if image_plan is not None:
+                write_image_index(image_plan, output_dir)
+
+            segments = verify_shared_segments(output_dir)
+            print(f"Video processed to DASH and HLS at {output_dir} ({len(segments)} shared segments)")
 
         except subprocess.CalledProcessError as e:
             print(f"Error during transcoding: {e}")
             raise
 
+    def _encode(self, input_path, output_dir, source: SourceInfo, uploader: SegmentUploader,
+                work_dir, reporter: TelemetryReporter, renditions, include_audio: bool, stage: str,
+                image_plan=None):
+        if work_dir is not None and self._use_chunked(source):
+            chunked = ChunkedTranscode(
+                input_path, output_dir, work_dir, source,
+                chunk_duration=settings.CHUNK_DURATION,
+                parallelism=settings.CHUNK_PARALLELISM,
+                threads=self.threads,
+                renditions=renditions,
+                include_audio=include_audio,
+            )
+            on_chunk = (lambda percent: reporter.progress(stage, percent)) if reporter else None
+            concat_list, audio_path = chunked.encode(on_progress=on_chunk)
+            if image_plan is not None:
+                # Chunks are decoded separately, so images need a pass of their own
+                self._run_ffmpeg(get_image_preset(input_path, str(output_dir), image_plan, self.threads), uploader)
+            self._run_ffmpeg(chunked.package_command(concat_list, audio_path), uploader)
+        else:
+            # One encode produces CMAF segments shared by manifest.mpd and master.m3u8
+            command = get_dash_and_hls_transcode_preset(
+                input_path, str(output_dir), threads=self.threads, source=source,
+                renditions=renditions, include_audio=include_audio, images=image_plan,
+            )
+            self._run_ffmpeg(command, uploader, progress=self._encode_progress(source, reporter, stage))
+
     def upload_processed_files(self, prefix: str, local_dir: str) -> None:
         """
         Upload processed files from local directory to S3 bucket.
+
+        Files are uploaded concurrently, manifests last.
         
         Args:
             prefix: S3 key prefix for the uploaded files
@@ -46,19 +234,15 @@ class VideoTranscoder:
             
         Raises:
             FileNotFoundError: If local directory doesn't exist
-            Exception: For other S3-related errors
+            Exception: For other S3-related errors, including any failed upload
         """
         try:
             self._ensure_local_dir_exists(local_dir)
             self._ensure_bucket_exists(settings.MINIO_PROCESS_VIDEO_BUCKET)
             
-            # Upload all files in the directory
-            for root, _, files in os.walk(local_dir):
-                for file in files:
-                    local_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(local_path, local_dir)
-                    s3_key = f"{prefix}/{relative_path}"
-                    self._upload_file_to_s3(local_path, settings.MINIO_PROCESS_VIDEO_BUCKET, s3_key)
+            SegmentUploader(
+                self.s3, settings.MINIO_PROCESS_VIDEO_BUCKET, prefix, local_dir
+            ).finish()
                     
         except Exception as e:
             print(f"Error in upload_processed_files: {e}")
@@ -70,82 +254,162 @@ class VideoTranscoder:
             raise FileNotFoundError(f"Local directory {local_dir} does not exist")
 
     def _ensure_bucket_exists(self, bucket_name: str) -> None:
-        """Ensure the specified bucket exists, create it if it doesn't."""
-        try:
-            self.s3.head_bucket(Bucket=bucket_name)
-            print(f"Bucket {bucket_name} exists")
-            return
-            
-        except Exception as e:
-            if "404" not in str(e):
-                print(f"Error checking bucket {bucket_name}: {e}")
-                raise
-                
-        print(f"Bucket {bucket_name} does not exist, creating...")
+        """Ensure the specified bucket exists; only the first job in the process hits S3."""
+        self.runtime.ensure_bucket(bucket_name)
+
+    def _encode_and_upload(self, input_path, output_dir: Path, prefix: str, work_dir: Path,
+                           timer: StageTimer, reporter: TelemetryReporter, source: SourceInfo,
+                           renditions: list = None, include_audio: bool = True, stage: str = "encode",
+                           images: bool = False):
+        # Upload segments while ffmpeg is still encoding; manifests go last
+        uploader = SegmentUploader(
+            self.s3, settings.MINIO_PROCESS_VIDEO_BUCKET, prefix, output_dir
+        )
+        uploader.start()
         try:
-            self.s3.create_bucket(Bucket=bucket_name)
-            print(f"Successfully created bucket: {bucket_name}")
-        except Exception as e:
-            print(f"Failed to create bucket {bucket_name}: {e}")
+            self.transcode_video(
+                input_path=input_path,
+                output_dir=output_dir,
+                uploader=uploader,
+                work_dir=work_dir,
+                timer=timer,
+                reporter=reporter,
+                source=source,
+                renditions=renditions,
+                include_audio=include_audio,
+                stage=stage,
+                images=images
+            )
+        except Exception:
+            uploader.abort()
             raise
+        # Only the tail is left here; most segments uploaded during the encode
+        with timer.stage("upload"):
+            uploader.finish()
 
-    def _upload_file_to_s3(self, local_path: str, bucket_name: str, s3_key: str) -> bool:
-        try:
-            print(f"Uploading {local_path} to s3://{bucket_name}/{s3_key}")
-            self.s3.upload_file(local_path, bucket_name, s3_key)
-            print(f"Successfully uploaded {s3_key}")
-            return True
-        except Exception as e:
-            print(f"Error uploading {os.path.basename(local_path)}: {e}")
-            return False
+    def _publish_progressive(self, input_path, source: SourceInfo, renditions: list, video_id: str, revision: str,
+                             output_path: Path, work_dir: Path, timer: StageTimer, reporter: TelemetryReporter):
+        """
+        Publish the lowest rendition first, then add the rest of the ladder.
 
-    def update_video_status(self, url, object_key):
-        try:
-            response = requests.put(
-                f"{url}/videos?id={object_key}"
-            )
-            print(f"Status updated. Server responded with: {response.status_code}")
-        except requests.RequestException as e:
-            print(f"Failed to notify status: {e}")
+        The preview pass encodes the lowest rung with audio into the output root,
+        exactly like a one-rung ladder, and the video is marked PLAYABLE. The
+        remaining rungs are then encoded video-only into HD_SUBDIR with the same
+        GOP, so their segments line up with the preview's. Once they are uploaded,
+        manifests listing every rendition replace the preview ones.
+        """
+        prefix = f"{video_id}/{revision}"
+        self._encode_and_upload(
+            input_path, output_path, prefix, work_dir, timer, reporter, source,
+            renditions=renditions[:1], stage="encode_preview", images=True
+        )
+        with timer.stage("upload"):
+            self._publish_entry_points(output_path, video_id, revision)
+        with timer.stage("notify"):
+            reporter.status("PLAYABLE")
+        timer.mark("first_playable")
+
+        hd_dir = output_path / HD_SUBDIR
+        hd_dir.mkdir()
+        self._encode_and_upload(
+            input_path, hd_dir, f"{prefix}/{HD_SUBDIR}", work_dir / HD_SUBDIR, timer, reporter, source,
+            renditions=renditions[1:], include_audio=False
+        )
+
+        with timer.stage("upload"):
+            self._publish_merged_manifests(output_path, prefix, HD_SUBDIR)
+            self._publish_entry_points(output_path, video_id, revision)
+
+    def _publish_merged_manifests(self, output_dir: Path, prefix: str, subdir: str):
+        mpd = merge_dash_manifests(output_dir / "manifest.mpd", output_dir / subdir / "manifest.mpd", subdir)
+        master = merge_hls_masters(output_dir / "master.m3u8", output_dir / subdir / "master.m3u8", subdir)
+        (output_dir / "manifest.mpd").write_bytes(mpd)
+        (output_dir / "master.m3u8").write_text(master)
+        verify_shared_segments(output_dir)
+
+        for name in ENTRY_POINTS:
+            upload_file(self.s3, settings.MINIO_PROCESS_VIDEO_BUCKET, f"{prefix}/{name}", output_dir / name)
+
+    def _publish_entry_points(self, output_dir: Path, video_id: str, revision: str):
+        """
+        Point the video's root manifests, thumbnail index and storyboard at ``revision``.
+
+        Each is replaced by a single PUT, uploaded after everything it references,
+        so players see either the previous publish or this one, never a mix.
+        """
+        copies = {
+            name: text.encode("utf-8") for name, text in rebase_image_index(output_dir, revision).items()
+        }
+        copies["manifest.mpd"] = rebase_dash_manifest(output_dir / "manifest.mpd", revision)
+        copies["master.m3u8"] = rebase_hls_master(output_dir / "master.m3u8", revision).encode("utf-8")
+
+        entry_dir = output_dir.parent / "entry"
+        for name, content in copies.items():
+            path = entry_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+            upload_file(self.s3, settings.MINIO_PROCESS_VIDEO_BUCKET, f"{video_id}/{name}", path)
 
     def process_video(self, object_key, bucket_name=None):
-        work_dir = Path("/tmp/workspace")
-        work_dir.mkdir(exist_ok=True)
+        # Extract video_id from object_key (e.g., 'videos/uuid.mp4' -> 'uuid')
+        base_name = os.path.basename(object_key)
+        video_id = os.path.splitext(base_name)[0]
+
+        # Each job gets its own workspace so concurrent jobs never share files
+        workspace_root = Path(settings.WORKSPACE_ROOT)
+        workspace_root.mkdir(parents=True, exist_ok=True)
+        work_dir = Path(tempfile.mkdtemp(prefix=f"{video_id}-", dir=workspace_root))
         input_path = work_dir / "input.mp4"
         output_path = work_dir / "output"
-        output_path.mkdir(exist_ok=True)
+        output_path.mkdir()
+        revision = new_revision()
 
-        print(f"Processing video: {object_key} from bucket: {bucket_name}")
+        print(f"Processing video: {object_key} from bucket: {bucket_name} in {work_dir} as revision {revision}")
+        timer = StageTimer()
+        reporter = TelemetryReporter(self.runtime.events, video_id)
 
         try:
-            # Extract video_id from object_key (e.g., 'videos/uuid.mp4' -> 'uuid')
-            import os
-            base_name = os.path.basename(object_key)
-            video_id = os.path.splitext(base_name)[0]
+            # A retried job clears the FAILED state of the previous attempt
+            reporter.status("IN_PROGRESS")
 
             # Use provided bucket_name or fall back to settings
             bucket_to_use = bucket_name or settings.MINIO_RAW_VIDEO_BUCKET
-            self.download_video(
-                bucket_name=bucket_to_use,
-                object_key=object_key,
-                download_path=input_path
-            )
-            self.transcode_video(
-                input_path=input_path,
-                output_dir=output_path
-            )
-            self.upload_processed_files(
-                prefix=video_id,
-                local_dir=output_path
-            )
-            self.update_video_status(
-                url=settings.SERVER_URL,
-                object_key=video_id
-            )
+            with timer.stage("download"):
+                source = self.resolve_input(
+                    bucket_name=bucket_to_use,
+                    object_key=object_key,
+                    download_path=input_path
+                )
+
+            with timer.stage("probe"):
+                source_info = self.probe(source)
+
+            self._ensure_bucket_exists(settings.MINIO_PROCESS_VIDEO_BUCKET)
+            renditions = select_renditions(source_info)
+            if settings.PUBLISH_MODE == "progressive" and len(renditions) > 1:
+                self._publish_progressive(
+                    source, source_info, renditions, video_id, revision, output_path, work_dir, timer, reporter
+                )
+            else:
+                self._encode_and_upload(
+                    source, output_path, f"{video_id}/{revision}", work_dir, timer, reporter, source_info, images=True
+                )
+                with timer.stage("upload"):
+                    self._publish_entry_points(output_path, video_id, revision)
+
+            with timer.stage("notify"):
+                reporter.status("COMPLETED")
+
+            timings = timer.summary()
+            print(f"Stage timings for {video_id}: {timings}")
+            reporter.stage_timings(timings)
+
+        except Exception as e:
+            try:
+                reporter.status("FAILED", error=f"{type(e).__name__}: {e}"[:2000])
+            except Exception as report_error:
+                print(f"Failed to report FAILED status for {video_id}: {report_error}")
+            raise
 
         finally:
-            if input_path.exists():
-                input_path.unlink()
-            if output_path.exists():
-                import shutil
-                shutil.rmtree(str(output_path)) 
+            shutil.rmtree(work_dir, ignore_errors=True)
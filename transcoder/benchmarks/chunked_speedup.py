@@ -0,0 +1,99 @@
+"""
+Wall-clock comparison of single-pass and chunked transcoding.
+
+Generates a synthetic test source of the requested length (testsrc2 video with
+a sine tone), encodes it once in a single ffmpeg pass and once as parallel
+keyframe-aligned chunks, and reports the time taken by each along with the
+speedup. Run from the transcoder directory:
+
+    python benchmarks/chunked_speedup.py --minutes 10 --parallelism 4
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.lavfi import make_source
+from chunked import ChunkedTranscode
+from ffmpeg_presets import get_dash_and_hls_transcode_preset
+from manifests import verify_shared_segments
+from probe import probe_source
+
+
+def run_single(source: Path, output_dir: Path) -> float:
+    started = time.perf_counter()
+    info = probe_source(source)
+    subprocess.run(get_dash_and_hls_transcode_preset(source, str(output_dir), source=info), check=True)
+    return time.perf_counter() - started
+
+
+def run_chunked(source: Path, output_dir: Path, work_dir: Path, chunk_duration: float, parallelism: int) -> float:
+    started = time.perf_counter()
+    chunked = ChunkedTranscode(
+        source, output_dir, work_dir, probe_source(source),
+        chunk_duration=chunk_duration,
+        parallelism=parallelism,
+        threads=os.cpu_count(),
+    )
+    concat_list, audio_path = chunked.encode()
+    subprocess.run(chunked.package_command(concat_list, audio_path), check=True)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--chunk-duration", type=float, default=60)
+    parser.add_argument("--parallelism", type=int, default=4)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    scratch = Path(tempfile.mkdtemp(prefix="chunked-bench-"))
+    try:
+        source = scratch / "source.mp4"
+        print(f"Generating {args.minutes} minute test source...")
+        make_source(source, 1920, 1080, 30, args.minutes * 60)
+
+        single_dir = scratch / "single"
+        single_dir.mkdir()
+        print("Single-pass encode...")
+        single = run_single(source, single_dir)
+
+        chunked_dir = scratch / "chunked"
+        chunked_dir.mkdir()
+        print(f"Chunked encode ({args.parallelism} parallel, {args.chunk_duration}s chunks)...")
+        chunked = run_chunked(source, chunked_dir, scratch / "work", args.chunk_duration, args.parallelism)
+
+        results = {
+            "minutes": args.minutes,
+            "chunk_duration": args.chunk_duration,
+            "parallelism": args.parallelism,
+            "single_seconds": round(single, 2),
+            "chunked_seconds": round(chunked, 2),
+            "speedup": round(single / chunked, 2),
+            "single_segments": len(verify_shared_segments(single_dir)),
+            "chunked_segments": len(verify_shared_segments(chunked_dir)),
+        }
+        print(f"{'mode':<10}{'seconds':>10}")
+        print(f"{'single':<10}{results['single_seconds']:>10}")
+        print(f"{'chunked':<10}{results['chunked_seconds']:>10}")
+        print(f"speedup: {results['speedup']}x")
+
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+    finally:
+        if not args.keep:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
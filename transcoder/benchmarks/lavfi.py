@@ -0,0 +1,29 @@
+import subprocess
+from pathlib import Path
+
+
+def make_source(path: Path, width: int, height: int, fps: float, seconds: float, audio: bool = True) -> None:
+    """
+    Write a deterministic test source: testsrc2 video, optionally with a sine tone.
+
+    The same arguments always produce the same frames. Bitexact flags keep
+    encoder and muxer version strings out of the file, so runs are comparable.
+    """
+    command = [
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={seconds}",
+    ]
+    if audio:
+        command.extend(["-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={seconds}"])
+    command.extend([
+        "-c:v", "libx264", "-preset", "ultrafast", "-g", str(round(fps * 2)),
+        "-pix_fmt", "yuv420p",
+    ])
+    if audio:
+        command.extend(["-c:a", "aac", "-shortest"])
+    command.extend([
+        "-fflags", "+bitexact", "-flags:v", "+bitexact", "-flags:a", "+bitexact",
+        "-movflags", "+faststart",
+        str(path),
+    ])
+    subprocess.run(command, check=True)
@@ -0,0 +1,237 @@
+"""
+Reproducible transcoding benchmark over synthetic lavfi sources.
+
+Generates deterministic inputs (testsrc2 video + sine audio) for a matrix of
+resolutions, frame rates and durations, runs every preset builder on each and
+records, per run:
+
+  - wall_seconds, cpu_seconds (user + sys of the ffmpeg process)
+  - realtime_factor (media seconds encoded per wall-clock second)
+  - peak_rss_mb of the ffmpeg process
+  - output bytes per rendition and in total
+
+Results are written as JSON. Pass a previous report as --baseline to flag
+runs that got slower or bigger by more than --threshold percent; the exit
+status is 1 when any regression is found. Run from the transcoder directory:
+
+    python benchmarks/preset_suite.py --output report.json
+    python benchmarks/preset_suite.py --baseline report.json --output new.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.lavfi import make_source
+from ffmpeg_presets import (
+    get_dash_and_hls_transcode_preset,
+    get_dash_transcode_preset,
+    get_hls_transcode_preset,
+    select_renditions,
+)
+from probe import probe_source
+
+# (name, width, height, fps, seconds)
+CASES = [
+    ("360p24-10s", 640, 360, 24, 10),
+    ("720p30-10s", 1280, 720, 30, 10),
+    ("1080p30-10s", 1920, 1080, 30, 10),
+    ("1080p60-10s", 1920, 1080, 60, 10),
+    ("1080x1920p30-10s", 1080, 1920, 30, 10),
+    ("1080p25-60s", 1920, 1080, 25, 60),
+]
+
+QUICK_CASES = ["360p24-10s", "1080p30-10s"]
+
+PRESETS = {
+    "dash": lambda source, output_dir, info: get_dash_transcode_preset(source, output_dir, source=info),
+    "hls": lambda source, output_dir, info: get_hls_transcode_preset(source, output_dir, source=info),
+    "dash_and_hls": lambda source, output_dir, info: get_dash_and_hls_transcode_preset(source, output_dir, source=info),
+}
+
+# Metrics compared against the baseline; larger is worse for all of them
+COMPARED_METRICS = ["wall_seconds", "cpu_seconds", "peak_rss_mb", "total_bytes"]
+
+
+def run_ffmpeg(command: list[str]) -> dict:
+    """Run ffmpeg and collect the resource usage of that process alone."""
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    wall = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+
+    return {
+        "wall_seconds": round(wall, 3),
+        "cpu_seconds": round(usage.ru_utime + usage.ru_stime, 3),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+    }
+
+
+def _playlist_files(playlist: Path) -> list[Path]:
+    files = []
+    for line in playlist.read_text().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#EXT-X-MAP:"):
+            match = re.search(r'URI="([^"]+)"', line)
+            if match:
+                files.append(playlist.parent / match.group(1))
+        elif not line.startswith("#"):
+            files.append(playlist.parent / line)
+    return files
+
+
+def rendition_bytes(output_dir: Path, labels: list[str]) -> dict[str, int]:
+    """
+    Sum output bytes per rendition.
+
+    DASH output names files after the stream index (init-stream0.m4s,
+    chunk-stream0-00001.m4s); HLS-only output is attributed through the files
+    each variant playlist references. Streams past the video ladder are audio.
+    """
+    def label_for(index: int) -> str:
+        return labels[index] if index < len(labels) else "audio"
+
+    sizes: dict[str, int] = {}
+    if (output_dir / "manifest.mpd").exists():
+        for path in output_dir.glob("*stream*.m4s"):
+            match = re.search(r"stream(\d+)", path.name)
+            if match:
+                label = label_for(int(match.group(1)))
+                sizes[label] = sizes.get(label, 0) + path.stat().st_size
+        return sizes
+
+    for playlist in sorted(output_dir.glob("hls_*.m3u8")):
+        match = re.fullmatch(r"hls_(\d+)\.m3u8", playlist.name)
+        if match:
+            label = label_for(int(match.group(1)))
+            files = {f for f in _playlist_files(playlist) if f.exists()}
+            sizes[label] = sizes.get(label, 0) + sum(f.stat().st_size for f in files)
+    return sizes
+
+
+def run_case(scratch: Path, case: tuple, presets: list[str]) -> dict:
+    name, width, height, fps, seconds = case
+    source = scratch / f"{name}.mp4"
+    make_source(source, width, height, fps, seconds)
+    info = probe_source(source)
+    labels = [r[0] for r in select_renditions(info)]
+
+    results = {}
+    for preset in presets:
+        output_dir = scratch / name / preset
+        output_dir.mkdir(parents=True)
+        print(f"  {name} / {preset}...")
+        metrics = run_ffmpeg(PRESETS[preset](source, str(output_dir), info))
+        sizes = rendition_bytes(output_dir, labels)
+        metrics["realtime_factor"] = round(seconds / metrics["wall_seconds"], 2)
+        metrics["rendition_bytes"] = sizes
+        metrics["total_bytes"] = sum(sizes.values())
+        results[preset] = metrics
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return results
+
+
+def ffmpeg_version() -> str:
+    try:
+        result = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True, check=True)
+        return result.stdout.splitlines()[0]
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """List every metric that grew by more than ``threshold`` percent over the baseline."""
+    regressions = []
+    for case, presets in report["results"].items():
+        for preset, metrics in presets.items():
+            previous = baseline.get("results", {}).get(case, {}).get(preset)
+            if not previous:
+                continue
+            for metric in COMPARED_METRICS:
+                old, new = previous.get(metric), metrics.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old * 100
+                line = f"{case:<18}{preset:<14}{metric:<14}{old:>14}{new:>14}{change:>+9.1f}%"
+                print(line)
+                if change > threshold:
+                    regressions.append(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--case", action="append", choices=[c[0] for c in CASES], help="Run only this case, repeatable")
+    parser.add_argument("--quick", action="store_true", help=f"Run only {', '.join(QUICK_CASES)}")
+    parser.add_argument("--preset", action="append", choices=list(PRESETS), help="Run only this preset, repeatable")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--baseline", help="Previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    args = parser.parse_args()
+
+    selected = args.case or (QUICK_CASES if args.quick else [c[0] for c in CASES])
+    cases = [c for c in CASES if c[0] in selected]
+    presets = args.preset or list(PRESETS)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "ffmpeg": ffmpeg_version(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": {},
+    }
+
+    scratch = Path(tempfile.mkdtemp(prefix="preset-suite-"))
+    try:
+        for case in cases:
+            print(f"Running {case[0]}...")
+            report["results"][case[0]] = run_case(scratch, case, presets)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"{'case':<18}{'preset':<14}{'wall s':>9}{'cpu s':>9}{'x rt':>7}{'rss MB':>9}{'bytes':>12}")
+    for case, results in report["results"].items():
+        for preset, m in results.items():
+            print(
+                f"{case:<18}{preset:<14}{m['wall_seconds']:>9}{m['cpu_seconds']:>9}"
+                f"{m['realtime_factor']:>7}{m['peak_rss_mb']:>9}{m['total_bytes']:>12}"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} (regression threshold {args.threshold}%):")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s):")
+            for line in regressions:
+                print(line)
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import math
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from pathlib import Path
+
+from ffmpeg_presets import (
+    get_chunk_transcode_preset,
+    get_audio_transcode_preset,
+    get_package_preset,
+    SEGMENT_DURATION,
+)
+from probe import SourceInfo, get_keyframe_times
+
+# Seconds a keyframe may sit off a segment boundary and still count as on it
+KEYFRAME_TOLERANCE = 1e-3
+
+
+def plan_chunks(duration: float, keyframes: list[float], chunk_duration: float,
+                segment_duration: float = SEGMENT_DURATION) -> list[tuple[float, float]]:
+    """
+    Split [0, duration) into ranges of roughly ``chunk_duration`` seconds.
+
+    Every boundary falls on a multiple of ``segment_duration``, so the fixed GOP
+    of each chunk continues the one before it and the packaged segments stay
+    regular across joins. A source keyframe on such a multiple is preferred,
+    since decoding starts there without references into the previous chunk;
+    otherwise the chunk is cut at the multiple itself and ffmpeg seeks
+    accurately from the keyframe before it. A tail shorter than half a chunk is
+    folded into the previous one. Sources with a single keyframe come back as
+    one chunk, as every seek into them would decode from the start.
+    """
+    boundaries = [0.0]
+    if len(keyframes) > 1:
+        aligned = [
+            keyframe for keyframe in keyframes
+            if abs(keyframe - round(keyframe / segment_duration) * segment_duration) < KEYFRAME_TOLERANCE
+        ]
+        target = chunk_duration
+        while True:
+            cut = float(math.ceil(target / segment_duration - KEYFRAME_TOLERANCE) * segment_duration)
+            cut = next((k for k in aligned if cut - KEYFRAME_TOLERANCE <= k < target + chunk_duration / 2), cut)
+            if duration - cut < chunk_duration / 2:
+                break
+            boundaries.append(cut)
+            target = cut + chunk_duration
+    boundaries.append(duration)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+class ChunkedTranscode:
+    """
+    Encodes one video as independent time chunks in parallel, then joins them.
+
+    Chunks are cut on segment boundaries and encoded to the full rendition
+    ladder concurrently. Audio is encoded once for the whole file. The chunks are then
+    concatenated and packaged with stream copy into the same CMAF DASH + HLS
+    layout a single-pass encode produces, so the server cannot tell them apart.
+    """
+
+    def __init__(self, input_path: str, output_dir: Path, work_dir: Path, source: SourceInfo,
+                 chunk_duration: float, parallelism: int, threads: int = None,
+                 renditions: list[tuple] = None, include_audio: bool = True):
+        self.input_path = str(input_path)
+        self.source = source
+        self.renditions = renditions
+        self.include_audio = include_audio
+        self.output_dir = Path(output_dir)
+        self.chunks_dir = Path(work_dir) / "chunks"
+        self.chunk_duration = chunk_duration
+        self.parallelism = max(1, parallelism)
+        # Split the job's thread share between the chunks encoding at once
+        self.threads = max(1, threads // self.parallelism) if threads else None
+        self._processes: set[subprocess.Popen] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._encoded = 0.0
+
+    def _run(self, command: list[str]) -> None:
+        with self._lock:
+            if self._stopped.is_set():
+                raise RuntimeError("Chunked transcode stopped")
+            process = subprocess.Popen(command)
+            self._processes.add(process)
+        try:
+            process.wait()
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command)
+
+    def _stop(self) -> None:
+        """Kill every running ffmpeg and refuse to start new ones."""
+        with self._lock:
+            self._stopped.set()
+            for process in self._processes:
+                if process.poll() is None:
+                    process.kill()
+
+    def _run_chunk(self, command: list[str], seconds: float, total: float, on_progress) -> None:
+        self._run(command)
+        if on_progress is None or not seconds:
+            return
+        with self._lock:
+            self._encoded += seconds
+            percent = round(min(self._encoded / total * 100, 100.0), 1)
+        try:
+            on_progress(percent)
+        except Exception as e:
+            print(f"Failed to report progress: {e}")
+
+    def encode(self, on_progress=None) -> tuple[Path, Path]:
+        """
+        Encode all chunks and the audio track.
+
+        ``on_progress(percent)`` is called as chunks finish, with the share of
+        the source duration encoded so far.
+
+        Returns:
+            (concat list path, audio path or None)
+        """
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        chunks = plan_chunks(self.source.duration, get_keyframe_times(self.input_path), self.chunk_duration)
+        print(f"Encoding {self.input_path} as {len(chunks)} chunks, {self.parallelism} at a time")
+
+        chunk_paths = [self.chunks_dir / f"chunk_{i:05d}.mp4" for i in range(len(chunks))]
+        audio_path = self.chunks_dir / "audio.mp4" if self.include_audio and self.source.has_audio else None
+
+        commands = [
+            get_chunk_transcode_preset(
+                self.input_path, path, start, end,
+                threads=self.threads, source=self.source, renditions=self.renditions,
+            )
+            for path, (start, end) in zip(chunk_paths, chunks)
+        ]
+        if audio_path:
+            commands.append(get_audio_transcode_preset(self.input_path, audio_path))
+
+        # Audio is cheap next to video, so only chunk seconds count towards progress
+        seconds = [end - start for start, end in chunks] + [0.0] * (len(commands) - len(chunks))
+        total = sum(seconds) or 1.0
+        self._encoded = 0.0
+
+        with ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="chunk") as executor:
+            futures = [
+                executor.submit(self._run_chunk, command, length, total, on_progress)
+                for command, length in zip(commands, seconds)
+            ]
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            failed = [f for f in done if f.exception() is not None]
+            if failed:
+                self._stop()
+                for future in futures:
+                    future.cancel()
+                raise failed[0].exception()
+
+        concat_list = self.chunks_dir / "chunks.txt"
+        concat_list.write_text("".join(f"file '{path.resolve()}'\n" for path in chunk_paths))
+        return concat_list, audio_path
+
+    def package_command(self, concat_list: Path, audio_path: Path) -> list[str]:
+        """Command that joins the encoded chunks into the final DASH + HLS output."""
+        return get_package_preset(concat_list, audio_path, self.output_dir)
@@ -0,0 +1,62 @@
+import subprocess
+
+from ffmpeg_presets import VIDEO_LADDER, get_complexity_probe_preset
+from probe import SourceInfo
+
+# Bitrate the probe encode reaches on the content the fixed ladder was tuned for.
+# A title that needs this much at the probe CRF keeps the fixed bitrates.
+REFERENCE_BITRATE = 500_000
+
+# Height of the probe encode; matches the lowest rung so it stays cheap
+PROBE_HEIGHT = VIDEO_LADDER[0][1]
+
+
+def sample_offsets(duration: float, samples: int, sample_duration: float) -> list[tuple[float, float]]:
+    """
+    Spread ``samples`` windows of ``sample_duration`` seconds evenly over the source.
+
+    Windows are centred in equal slices of the timeline, so openings, credits and
+    the middle all contribute. Short sources are probed as a single window.
+    """
+    if duration <= 0:
+        return []
+    if duration <= samples * sample_duration:
+        return [(0.0, duration)]
+
+    slice_length = duration / samples
+    return [
+        (i * slice_length + (slice_length - sample_duration) / 2, sample_duration)
+        for i in range(samples)
+    ]
+
+
+def measure_complexity(input_path: str, source: SourceInfo, samples: int, sample_duration: float,
+                       crf: int, min_factor: float, max_factor: float, threads: int = None) -> float:
+    """
+    Estimate how many bits this title needs relative to the fixed ladder.
+
+    Encodes evenly spaced samples at a constant CRF and low resolution and
+    compares the resulting bitrate with REFERENCE_BITRATE. Static slides land
+    well below 1.0 and high-motion footage above it. The result is clamped to
+    [min_factor, max_factor] and applied to every rung, on the assumption that
+    complexity measured at the lowest rung carries over to the higher ones.
+
+    Returns:
+        Bitrate multiplier for the ladder
+    """
+    height = min(PROBE_HEIGHT, source.short_side - source.short_side % 2) or PROBE_HEIGHT
+    total_bytes = 0
+    total_seconds = 0.0
+    for start, length in sample_offsets(source.duration, samples, sample_duration):
+        command = get_complexity_probe_preset(
+            input_path, start, length, height, source.portrait, crf, threads=threads
+        )
+        result = subprocess.run(command, check=True, capture_output=True)
+        total_bytes += len(result.stdout)
+        total_seconds += length
+
+    if not total_seconds or not total_bytes:
+        return 1.0
+
+    bitrate = total_bytes * 8 / total_seconds
+    return max(min_factor, min(max_factor, bitrate / REFERENCE_BITRATE))
@@ -0,0 +1,161 @@
+import logging
+import queue
+import time
+from collections import defaultdict, deque
+
+from kafka import ConsumerRebalanceListener, TopicPartition
+from kafka.errors import CommitFailedError
+from kafka.structs import OffsetAndMetadata
+
+from worker_pool import TranscodeWorkerPool
+
+logger = logging.getLogger('transcoder')
+
+
+def _offset(offset: int) -> OffsetAndMetadata:
+    # kafka-python 2.1 added leader_epoch to OffsetAndMetadata
+    if len(OffsetAndMetadata._fields) == 3:
+        return OffsetAndMetadata(offset, "", -1)
+    return OffsetAndMetadata(offset, "")
+
+
+class _Rebalance(ConsumerRebalanceListener):
+    def __init__(self, owner: "PartitionedConsumer"):
+        self.owner = owner
+
+    def on_partitions_revoked(self, revoked):
+        self.owner._on_revoked(revoked)
+
+    def on_partitions_assigned(self, assigned):
+        logger.info(f"Assigned partitions: {sorted(f'{tp.topic}-{tp.partition}' for tp in assigned)}")
+
+
+class PartitionedConsumer:
+    """
+    Feeds Kafka messages to the worker pool without ever blocking the poll loop.
+
+    Each assigned partition runs at most one job at a time, so partitions are
+    the unit of parallelism: with P partitions spread over R replicas of W
+    workers, up to min(P, R × W) videos encode at once. A partition is paused
+    while it has a job in flight (and all of them while every worker is busy),
+    so ``poll()`` keeps the consumer in its group without fetching work it
+    cannot start.
+
+    Offsets are committed manually, only after a job succeeds, from this
+    thread (the Kafka client is not thread-safe). A failed job is retried up to
+    ``max_attempts`` times and then skipped; its partition waits
+    ``retry_backoff`` seconds before the first retry, doubling each time up to
+    ``retry_backoff_max``, while the poll loop keeps running. Jobs still running when their
+    partition is revoked finish, but are not committed; the new owner redoes
+    them, so delivery is at-least-once.
+    """
+
+    def __init__(self, consumer, topic: str, pool: TranscodeWorkerPool, handler,
+                 max_attempts: int = 3, poll_timeout_ms: int = 1000,
+                 retry_backoff: float = 5.0, retry_backoff_max: float = 300.0):
+        self.consumer = consumer
+        self.pool = pool
+        self.handler = handler
+        self.max_attempts = max(1, max_attempts)
+        self.poll_timeout_ms = poll_timeout_ms
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self._backlog: dict[TopicPartition, deque] = defaultdict(deque)
+        self._in_flight: dict[TopicPartition, tuple] = {}
+        # Bumped on revoke so completions from a previous assignment are ignored
+        self._generation: dict[TopicPartition, int] = defaultdict(int)
+        self._attempts: dict[tuple, int] = {}
+        # Monotonic time before which a partition's failed job is not retried
+        self._retry_at: dict[TopicPartition, float] = {}
+        self._completed: queue.Queue = queue.Queue()
+        self._running = True
+        consumer.subscribe([topic], listener=_Rebalance(self))
+
+    def run(self) -> None:
+        while self._running:
+            self._handle_completions()
+            records = self.consumer.poll(timeout_ms=self.poll_timeout_ms)
+            for tp, messages in records.items():
+                self._backlog[tp].extend(messages)
+            self._dispatch()
+            self._apply_backpressure()
+
+    def stop(self) -> None:
+        self._running = False
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        for tp, backlog in self._backlog.items():
+            if not backlog or tp in self._in_flight or self._retry_at.get(tp, 0) > now:
+                continue
+            self._retry_at.pop(tp, None)
+            message = backlog[0]
+            future = self.pool.try_submit(self.handler, message)
+            if future is None:
+                return
+            backlog.popleft()
+            generation = self._generation[tp]
+            self._in_flight[tp] = (message, generation)
+            future.add_done_callback(
+                lambda f, tp=tp, message=message, generation=generation:
+                    self._completed.put((tp, message, generation, f.exception()))
+            )
+
+    def _handle_completions(self) -> None:
+        while True:
+            try:
+                tp, message, generation, error = self._completed.get_nowait()
+            except queue.Empty:
+                return
+            if self._in_flight.get(tp, (None, None))[1] == generation:
+                del self._in_flight[tp]
+            if generation != self._generation[tp]:
+                logger.info(f"Partition {tp.partition} was reassigned; not committing offset {message.offset}")
+                continue
+
+            key = (tp, message.offset)
+            if error is not None:
+                attempts = self._attempts.get(key, 0) + 1
+                self._attempts[key] = attempts
+                if attempts < self.max_attempts:
+                    delay = min(self.retry_backoff * 2 ** (attempts - 1), self.retry_backoff_max)
+                    logger.warning(
+                        f"Job at {tp.topic}-{tp.partition}@{message.offset} failed (attempt {attempts}), "
+                        f"retrying in {delay:.0f}s: {error}"
+                    )
+                    self._backlog[tp].appendleft(message)
+                    self._retry_at[tp] = time.monotonic() + delay
+                    continue
+                logger.error(f"Giving up on {tp.topic}-{tp.partition}@{message.offset} after {attempts} attempts: {error}")
+
+            self._attempts.pop(key, None)
+            self._commit(tp, message.offset + 1)
+
+    def _commit(self, tp: TopicPartition, offset: int) -> None:
+        try:
+            self.consumer.commit({tp: _offset(offset)})
+        except CommitFailedError as e:
+            # The group rebalanced; the partition's new owner resumes from the last commit
+            logger.warning(f"Could not commit {tp.topic}-{tp.partition}@{offset}: {e}")
+
+    def _apply_backpressure(self) -> None:
+        assigned = self.consumer.assignment()
+        if not self.pool.has_capacity():
+            wanted = set(assigned)
+        else:
+            wanted = {tp for tp in assigned if tp in self._in_flight or self._backlog.get(tp)}
+        paused = set(self.consumer.paused())
+        if wanted - paused:
+            self.consumer.pause(*(wanted - paused))
+        if paused - wanted:
+            self.consumer.resume(*(paused - wanted))
+
+    def _on_revoked(self, revoked) -> None:
+        for tp in revoked:
+            self._generation[tp] += 1
+            self._backlog.pop(tp, None)
+            self._in_flight.pop(tp, None)
+            self._retry_at.pop(tp, None)
+        self._attempts = {key: n for key, n in self._attempts.items() if key[0] not in revoked}
+        if revoked:
+            logger.info(f"Revoked partitions: {sorted(f'{tp.topic}-{tp.partition}' for tp in revoked)}")
@@ -1,106 +1,344 @@
-def get_dash_transcode_preset(input_path: str, output_dir: str) -> list[str]:
+from probe import SourceInfo, DEFAULT_FPS
+from thumbnails import ImagePlan, POSTER_SAMPLE_FPS, THUMBNAIL_FORMATS, STORYBOARD_DIR, thumbnail_name
+
+# (label, height, target_bitrate, max_bitrate, vbv_buffer), lowest first
+# maxrate = target × 1.1, bufsize = target × 2 — standard VBV settings
+VIDEO_LADDER = [
+    ("360p",  360,  "500k",  "550k",  "1000k"),
+    ("720p",  720,  "1500k", "1650k", "3000k"),
+    ("1080p", 1080, "3000k", "3300k", "6000k"),
+]
+
+# Segment length in seconds, shared by DASH and HLS
+SEGMENT_DURATION = 2
+
+# Encoder arguments per thumbnail format; mjpeg needs full-range YUV
+IMAGE_CODEC_ARGS = {
+    "webp": ["-c:v", "libwebp", "-quality", "80"],
+    "jpg": ["-c:v", "mjpeg", "-q:v", "3", "-pix_fmt", "yuvj420p"],
+}
+
+def get_dash_transcode_preset(input_path: str, output_dir: str, source: SourceInfo = None) -> list[str]:
     """
     Returns FFmpeg command arguments for DASH transcoding with multiple resolutions.
 
     Args:
         input_path: Path to the input video file
         output_dir: Directory where output files will be saved
+        source: Probed source; None encodes the full ladder at 30 fps with audio
 
     Returns:
         List of command line arguments for subprocess.run()
     """
     command = ["ffmpeg", "-i", str(input_path)]
-    command.extend(["-filter_complex", get_video_filter_complex()])
-
-    # (label, stream_index, target_bitrate, max_bitrate, vbv_buffer)
-    # maxrate = target × 1.1, bufsize = target × 2 — standard VBV settings
-    video_streams = [
-        ("360p",  0, "500k",  "550k",  "1000k"),
-        ("720p",  1, "1500k", "1650k", "3000k"),
-        ("1080p", 2, "3000k", "3300k", "6000k"),
-    ]
+    command.extend(get_video_encode_args(source))
 
-    for stream_name, index, bitrate, maxrate, bufsize in video_streams:
-        command.extend(get_video_stream_args(stream_name, index, bitrate, maxrate, bufsize))
-
-    command.extend(get_audio_stream_args())
-    command.extend(get_dash_output_args(output_dir))
+    if has_audio(source):
+        command.extend(get_audio_stream_args())
+    command.extend(get_dash_output_args(output_dir, audio=has_audio(source)))
     return command
 
-def get_hls_transcode_preset(input_path: str, output_dir: str) -> list[str]:
+def get_hls_transcode_preset(input_path: str, output_dir: str, source: SourceInfo = None) -> list[str]:
     """
     Returns FFmpeg command arguments for HLS transcoding with multiple resolutions.
 
     Args:
         input_path: Path to the input video file
         output_dir: Directory where output files will be saved
+        source: Probed source; None encodes the full ladder at 30 fps with audio
 
     Returns:
         List of command line arguments for subprocess.run()
     """
     command = ["ffmpeg", "-i", str(input_path)]
-    command.extend(["-filter_complex", get_video_filter_complex()])
-
-    video_streams = [
-        ("360p",  0, "500k",  "550k",  "1000k"),
-        ("720p",  1, "1500k", "1650k", "3000k"),
-        ("1080p", 2, "3000k", "3300k", "6000k"),
-    ]
-
-    for stream_name, index, bitrate, maxrate, bufsize in video_streams:
-        command.extend(get_video_stream_args(stream_name, index, bitrate, maxrate, bufsize))
+    command.extend(get_video_encode_args(source))
 
-    command.extend(get_audio_stream_args())
-    command.extend(get_hls_output_args(output_dir))
+    if has_audio(source):
+        command.extend(get_audio_stream_args())
+    command.extend(get_hls_output_args(output_dir, len(select_renditions(source))))
     return command
 
-def get_dash_and_hls_transcode_preset(input_path: str, output_dir: str) -> list[str]:
+def get_dash_and_hls_transcode_preset(input_path: str, output_dir: str, threads: int = None, source: SourceInfo = None,
+                                      renditions: list[tuple] = None, include_audio: bool = True,
+                                      images: ImagePlan = None) -> list[str]:
     """
-    Returns FFmpeg command arguments for both DASH and HLS transcoding in a single pass.
+    Returns FFmpeg command arguments for both DASH and HLS from a single encode.
 
-    Encoding once and muxing to both formats is more efficient than two separate runs,
-    but requires careful stream mapping since DASH and HLS share the same encoded frames.
+    Every rendition is encoded once into CMAF (fMP4) segments by the DASH muxer,
+    which also writes HLS playlists pointing at the very same segment files.
+    The DASH manifest and the HLS master therefore share one set of segments.
 
     Args:
         input_path: Path to the input video file
         output_dir: Directory where output files will be saved
+        threads: Cap on decoder/filter/encoder threads, so several jobs can share a host
+        source: Probed source; None encodes the full ladder at 30 fps with audio
+        renditions: Subset of the source's ladder to encode; None encodes all of it
+        include_audio: Whether this encode carries the audio track
+        images: Thumbnails and storyboard to extract from the same decoded frames
 
     Returns:
         List of command line arguments for subprocess.run()
     """
-    command = ["ffmpeg", "-i", input_path]
-    command.extend(["-filter_complex", get_video_filter_complex()])
+    audio = include_audio and has_audio(source)
+    command = ["ffmpeg"]
+    command.extend(get_thread_args(threads))
+    command.extend(get_input_args(input_path))
+    command.extend(get_video_encode_args(source, renditions, threads))
 
-    video_streams = [
-        ("360p",  0, "500k",  "550k",  "1000k"),
-        ("720p",  1, "1500k", "1650k", "3000k"),
-        ("1080p", 2, "3000k", "3300k", "6000k"),
-    ]
+    if audio:
+        command.extend(get_audio_stream_args())
+    command.extend(get_cmaf_output_args(output_dir, audio=audio))
+    if images is not None:
+        command.extend(get_image_output_args(images, output_dir))
 
-    for stream_name, index, bitrate, maxrate, bufsize in video_streams:
-        command.extend(get_video_stream_args(stream_name, index, bitrate, maxrate, bufsize))
+    return command
+
+def get_image_preset(input_path: str, output_dir: str, images: ImagePlan, threads: int = None) -> list[str]:
+    """
+    Returns FFmpeg command arguments that only extract thumbnails and storyboard
+    sheets, for encodes that do not decode the source in one pass (chunked mode).
+    """
+    command = ["ffmpeg"]
+    command.extend(get_thread_args(threads))
+    command.extend(get_input_args(input_path))
+    command.extend(get_image_output_args(images, output_dir))
+    return command
+
+def get_chunk_transcode_preset(input_path: str, output_path: str, start: float, end: float, threads: int = None,
+                               source: SourceInfo = None, renditions: list[tuple] = None) -> list[str]:
+    """
+    Returns FFmpeg command arguments to encode one time range of the source.
 
+    The range should start on a multiple of SEGMENT_DURATION so its GOP lines up
+    with the neighbouring chunks; ``-ss`` before the input seeks accurately, so
+    the start need not be a source keyframe. All
+    renditions are written as video tracks of a single MP4; audio is encoded
+    separately for the whole file so AAC priming never lands mid-stream.
+
+    Args:
+        input_path: Path or URL of the input video
+        output_path: MP4 file receiving the encoded renditions of this chunk
+        start: Start of the range in seconds
+        end: End of the range in seconds (exclusive)
+        threads: Cap on decoder/filter/encoder threads
+        source: Probed source the ladder and GOP are derived from
+        renditions: Subset of the source's ladder to encode; None encodes all of it
+
+    Returns:
+        List of command line arguments for subprocess.run()
+    """
+    command = ["ffmpeg"]
+    command.extend(get_thread_args(threads))
+    command.extend(["-ss", f"{start:.6f}", "-to", f"{end:.6f}"])
+    command.extend(get_input_args(input_path))
+    command.extend(get_video_encode_args(source, renditions, threads))
+    command.extend(["-an", "-f", "mp4", str(output_path)])
+    return command
+
+def get_audio_transcode_preset(input_path: str, output_path: str) -> list[str]:
+    """Returns FFmpeg command arguments to encode only the audio track of the source."""
+    command = ["ffmpeg"]
+    command.extend(get_input_args(input_path))
+    command.append("-vn")
     command.extend(get_audio_stream_args())
+    command.extend(["-f", "mp4", str(output_path)])
+    return command
+
+def get_complexity_probe_preset(input_path: str, start: float, duration: float, height: int, portrait: bool, crf: int, threads: int = None) -> list[str]:
+    """
+    Returns FFmpeg command arguments for a constant-quality encode of one sample.
+
+    The sample is encoded at a low resolution with the production x264 preset and
+    a fixed CRF, and the raw H.264 stream is written to stdout. The number of
+    bytes it takes to reach that quality measures how hard the content is to
+    compress.
+    """
+    size = f"{height}:-2" if portrait else f"-2:{height}"
+    command = ["ffmpeg", "-v", "error"]
+    command.extend(["-ss", f"{start:.3f}", "-t", f"{duration:.3f}"])
+    command.extend(get_input_args(input_path))
+    command.extend([
+        "-map", "0:v:0",
+        "-vf", f"scale={size}:flags=fast_bilinear",
+        "-c:v", "libx264",
+        "-preset", "veryfast",
+        "-crf", str(crf),
+    ])
+    if threads:
+        command.extend(["-threads", str(threads)])
+    command.extend(["-an", "-f", "h264", "pipe:1"])
+    return command
+
+def get_package_preset(concat_list_path: str, audio_path: str, output_dir: str) -> list[str]:
+    """
+    Returns FFmpeg command arguments that stitch encoded chunks and package them.
+
+    The concat demuxer offsets each chunk by the duration of the previous ones,
+    so timestamps are continuous. Streams are copied, not re-encoded, into the
+    same CMAF DASH + HLS layout as a single-pass encode.
 
-    # Both outputs share the encoded streams from above — no re-encoding occurs
-    command.extend(get_dash_output_args(output_dir))
-    command.extend(get_hls_output_args(output_dir))
+    Args:
+        concat_list_path: concat demuxer list of chunk files, in order
+        audio_path: Separately encoded audio, or None if the source has no audio
+        output_dir: Directory where output files will be saved
+
+    Returns:
+        List of command line arguments for subprocess.run()
+    """
+    command = ["ffmpeg", "-f", "concat", "-safe", "0", "-i", str(concat_list_path)]
+    if audio_path:
+        command.extend(["-i", str(audio_path)])
 
+    command.extend(["-map", "0:v"])
+    if audio_path:
+        command.extend(["-map", "1:a"])
+    command.extend(["-c", "copy"])
+    command.extend(get_cmaf_output_args(output_dir, audio=bool(audio_path)))
     return command
 
-def get_video_filter_complex() -> str:
+def has_audio(source: SourceInfo = None) -> bool:
+    """Whether audio should be mapped; unprobed sources are assumed to have it."""
+    return source is None or source.has_audio
+
+def select_renditions(source: SourceInfo = None) -> list[tuple]:
+    """
+    Pick the ladder rungs worth encoding for a source.
+
+    Rungs taller than the source's short side are dropped, so nothing is
+    upscaled. A source smaller than the lowest rung gets a single rendition at
+    its own size with the lowest rung's bitrate.
+    """
+    if source is None or not source.short_side:
+        return list(VIDEO_LADDER)
+
+    renditions = [r for r in VIDEO_LADDER if r[1] <= source.short_side]
+    if not renditions:
+        # Even height keeps yuv420p chroma subsampling happy
+        height = source.short_side - source.short_side % 2
+        _, _, bitrate, maxrate, bufsize = VIDEO_LADDER[0]
+        renditions = [(f"{height}p", height, bitrate, maxrate, bufsize)]
+
+    if source.complexity != 1.0:
+        renditions = [
+            (label, height, *(scale_bitrate(rate, source.complexity) for rate in rates))
+            for label, height, *rates in renditions
+        ]
+    return renditions
+
+def scale_bitrate(bitrate: str, factor: float) -> str:
+    """Scale a "<n>k" bitrate, keeping target, maxrate and bufsize in the same proportions."""
+    return f"{max(1, round(int(bitrate.rstrip('k')) * factor))}k"
+
+def get_gop_size(fps: float = DEFAULT_FPS) -> int:
+    """Frames per segment, so every segment starts on a keyframe at the source frame rate."""
+    return max(1, round(fps * SEGMENT_DURATION))
+
+def get_video_encode_args(source: SourceInfo = None, renditions: list[tuple] = None, threads: int = None) -> list[str]:
+    """
+    Generate the filter graph and per-rendition encoder arguments for a source.
+
+    All renditions encode in parallel, so a ``threads`` cap is divided between
+    their encoders rather than given to each of them.
+    """
+    renditions = renditions or select_renditions(source)
+    portrait = source is not None and source.portrait
+    gop = get_gop_size(source.fps if source is not None else DEFAULT_FPS)
+    shares = split_threads(threads, len(renditions)) if threads else [None] * len(renditions)
+
+    args = ["-filter_complex", get_video_filter_complex(renditions, portrait)]
+    for index, (stream_name, _, bitrate, maxrate, bufsize) in enumerate(renditions):
+        args.extend(get_video_stream_args(stream_name, index, bitrate, maxrate, bufsize, gop, shares[index]))
+    return args
+
+def split_threads(threads: int, encoders: int) -> list[int]:
+    """Share a thread cap between parallel encoders, at least one each; the largest renditions get the remainder."""
+    share, remainder = divmod(threads, encoders)
+    return [max(1, share + (1 if index >= encoders - remainder else 0)) for index in range(encoders)]
+
+def get_input_args(input_path: str) -> list[str]:
+    """Generate FFmpeg input arguments; remote sources get HTTP reconnect handling."""
+    input_path = str(input_path)
+    if input_path.startswith(("http://", "https://")):
+        return [
+            # Resume the source stream with a Range request after dropped connections
+            "-reconnect", "1",
+            "-reconnect_on_network_error", "1",
+            "-reconnect_delay_max", "10",
+            "-i", input_path,
+        ]
+    return ["-i", input_path]
+
+def get_thread_args(threads: int = None) -> list[str]:
+    """Generate arguments, placed before the input, that cap decoder and filter-graph threads."""
+    if not threads:
+        return []
+    return ["-filter_complex_threads", str(threads), "-threads", str(threads)]
+
+def get_video_filter_complex(renditions: list[tuple] = None, portrait: bool = False) -> str:
     """Generate the filter complex string for video processing."""
-    return (
-        "[0:v]split=3[v1][v2][v3];"
+    renditions = renditions or VIDEO_LADDER
+
+    def scale(height: int) -> str:
+        # Rendition height is the short side; -2 keeps the aspect ratio with an even long side
+        size = f"{height}:-2" if portrait else f"-2:{height}"
         # setsar=1 forces square pixels to correct non-square SAR from source video
-        "[v1]scale=640:360:flags=fast_bilinear,setsar=1[360p];"
-        "[v2]scale=1280:720:flags=fast_bilinear,setsar=1[720p];"
-        "[v3]scale=1920:1080:flags=fast_bilinear,setsar=1[1080p]"
+        return f"scale={size}:flags=fast_bilinear,setsar=1"
+
+    if len(renditions) == 1:
+        stream_name, height = renditions[0][:2]
+        return f"[0:v]{scale(height)}[{stream_name}]"
+
+    split = f"[0:v]split={len(renditions)}" + "".join(f"[v{i}]" for i in range(len(renditions)))
+    return ";".join(
+        [split] + [f"[v{i}]{scale(height)}[{stream_name}]" for i, (stream_name, height, *_) in enumerate(renditions)]
+    )
+
+def get_image_filter_complex(images: ImagePlan) -> str:
+    """
+    Branch the decoded video into poster variants and storyboard sheets.
+
+    The thumbnail filter keeps the most representative frame of the poster
+    window, which is then scaled to every width and split per format. The
+    storyboard samples one frame per interval and tiles them into sheets.
+    """
+    # Candidates are sampled and shrunk to the largest poster size before the
+    # thumbnail filter buffers them
+    largest_width, largest_height = images.poster_sizes[-1]
+    chains = [
+        f"[0:v]trim=start={images.poster_start:.3f}:duration={images.poster_window:.3f},"
+        f"fps={POSTER_SAMPLE_FPS},scale={largest_width}:{largest_height},"
+        f"thumbnail=n={images.poster_frames},setsar=1,split={len(images.poster_sizes)}"
+        + "".join(f"[poster{width}]" for width, _ in images.poster_sizes)
+    ]
+    for width, height in images.poster_sizes:
+        chains.append(
+            f"[poster{width}]scale={width}:{height},split={len(THUMBNAIL_FORMATS)}"
+            + "".join(f"[thumb{width}{fmt}]" for fmt in THUMBNAIL_FORMATS)
+        )
+    chains.append(
+        f"[0:v]fps=1/{images.interval},scale={images.tile_width}:{images.tile_height}:flags=fast_bilinear,"
+        f"setsar=1,tile={images.columns}x{images.rows}[storyboard]"
     )
+    return ";".join(chains)
+
+def get_image_output_args(images: ImagePlan, output_dir: str) -> list[str]:
+    """Generate the image filter graph and one image2 output per thumbnail variant plus the storyboard."""
+    # Atomic writes go through a .tmp file, so the segment uploader never sees a partial image
+    image2 = ["-f", "image2", "-atomic_writing", "1"]
+    args = ["-filter_complex", get_image_filter_complex(images)]
+    for width, _ in images.poster_sizes:
+        for fmt in THUMBNAIL_FORMATS:
+            args.extend(["-map", f"[thumb{width}{fmt}]", "-frames:v", "1", *IMAGE_CODEC_ARGS[fmt]])
+            args.extend([*image2, "-update", "1", f"{output_dir}/{thumbnail_name(width, fmt)}"])
+    args.extend(["-map", "[storyboard]", "-fps_mode", "passthrough", "-c:v", "mjpeg", "-q:v", "5", "-pix_fmt", "yuvj420p"])
+    args.extend([*image2, f"{output_dir}/{STORYBOARD_DIR}/sheet-%03d.jpg"])
+    return args
 
-def get_video_stream_args(stream_name: str, index: int, bitrate: str, maxrate: str, bufsize: str) -> list[str]:
+def get_video_stream_args(stream_name: str, index: int, bitrate: str, maxrate: str, bufsize: str, gop: int = 60,
+                          threads: int = None) -> list[str]:
     """Generate FFmpeg arguments for a single video stream."""
-    return [
+    args = [
         "-map", f"[{stream_name}]",
         f"-c:v:{index}", "libx264",
         f"-b:v:{index}", bitrate,
@@ -109,13 +347,15 @@ def get_video_stream_args(stream_name: str, index: int, bitrate: str, maxrate: s
         "-preset", "veryfast",
         "-profile:v", "high",
         "-level:v", "4.1",
-        # GOP must equal fps × seg_duration so segment boundaries align with keyframes.
-        # Assuming 30fps and 2s segments: 30 × 2 = 60
-        "-g", "60",
-        "-keyint_min", "60",
+        # GOP must equal fps × seg_duration so segment boundaries align with keyframes
+        "-g", str(gop),
+        "-keyint_min", str(gop),
         # Disable scene-cut detection to enforce fixed GOP size
         "-sc_threshold", "0",
     ]
+    if threads:
+        args.extend([f"-threads:v:{index}", str(threads)])
+    return args
 
 def get_audio_stream_args() -> list[str]:
     """Generate FFmpeg arguments for the audio stream."""
@@ -125,31 +365,41 @@ def get_audio_stream_args() -> list[str]:
         "-b:a", "128k"
     ]
 
-def get_dash_output_args(output_dir: str) -> list[str]:
+def get_dash_output_args(output_dir: str, audio: bool = True) -> list[str]:
     """Generate FFmpeg arguments for DASH output."""
+    adaptation_sets = "id=0,streams=v id=1,streams=a" if audio else "id=0,streams=v"
     return [
         "-use_timeline", "1",
         "-use_template", "1",
         # 2s segments: short enough for ABR to react quickly without excessive requests
-        "-seg_duration", "2",
+        "-seg_duration", str(SEGMENT_DURATION),
         "-dash_segment_type", "mp4",
-        "-adaptation_sets", "id=0,streams=v id=1,streams=a",
+        "-adaptation_sets", adaptation_sets,
         "-f", "dash",
         f"{output_dir}/manifest.mpd"
     ]
 
-def get_hls_output_args(output_dir: str) -> list[str]:
+def get_cmaf_output_args(output_dir: str, audio: bool = True) -> list[str]:
+    """Generate FFmpeg arguments for DASH output that also writes HLS playlists over the same segments."""
+    return [
+        # Emit master.m3u8 + media_N.m3u8 referencing the DASH fMP4 segments
+        "-hls_playlist", "1",
+        "-hls_master_name", "master.m3u8",
+        *get_dash_output_args(output_dir, audio=audio),
+    ]
+
+def get_hls_output_args(output_dir: str, video_streams: int = len(VIDEO_LADDER)) -> list[str]:
     """Generate FFmpeg arguments for HLS output."""
     return [
         "-f", "hls",
         # Match seg_duration in DASH for consistency
-        "-hls_time", "2",
+        "-hls_time", str(SEGMENT_DURATION),
         "-hls_playlist_type", "vod",
         "-hls_segment_type", "fmp4",
         "-hls_flags", "independent_segments",
-        # Required to map all 3 video streams into separate variant playlists.
+        # Required to map every video stream into its own variant playlist.
         # Without this, FFmpeg only writes a single quality to master.m3u8
-        "-var_stream_map", "v:0 v:1 v:2",
+        "-var_stream_map", " ".join(f"v:{i}" for i in range(video_streams)),
         "-master_pl_name", "master.m3u8",
         f"{output_dir}/hls_%v.m3u8"
     ]
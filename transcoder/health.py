@@ -0,0 +1,42 @@
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from runtime import TranscoderRuntime
+
+logger = logging.getLogger('transcoder')
+
+
+def start_health_server(runtime: TranscoderRuntime, port: int) -> ThreadingHTTPServer:
+    """
+    Serve ``/healthz`` (the process is alive) and ``/readyz`` (ffmpeg checked
+    and the Kafka consumer connected) on a daemon thread.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/healthz":
+                self._reply(200, {"alive": True})
+            elif self.path == "/readyz":
+                readiness = runtime.readiness()
+                self._reply(200 if readiness["ready"] else 503, readiness)
+            else:
+                self._reply(404, {"detail": "Not found"})
+
+        def _reply(self, status: int, body: dict):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            # Probes hit this every few seconds; keep them out of the logs
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, name="health-server", daemon=True).start()
+    logger.info(f"Health probes listening on :{port} (/healthz, /readyz)")
+    return server
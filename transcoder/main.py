@@ -2,11 +2,16 @@ import json
 import time
 import threading
 import logging
+from functools import partial
 from kafka import KafkaConsumer, errors
 from kafka.errors import NoBrokersAvailable
 from settings import settings
 from VideoTranscoder import VideoTranscoder
+from worker_pool import TranscodeWorkerPool
+from consumer import PartitionedConsumer
 from utils import get_url_decoded
+from runtime import TranscoderRuntime
+from health import start_health_server
 
 # Configure logging
 logging.basicConfig(
@@ -25,16 +30,19 @@ def create_kafka_consumer():
     for attempt in range(1, max_retries + 1):
         try:
             logger.info(f"Attempt {attempt}: Connecting to Kafka at {settings.KAFKA_BROKER}")
+            # Subscribed by PartitionedConsumer, which also owns offset commits
             consumer = KafkaConsumer(
-                topic_name,
                 bootstrap_servers=settings.KAFKA_BROKER,
                 value_deserializer=lambda m: json.loads(m.decode('utf-8')),
                 auto_offset_reset='latest',  # Only process new messages
                 group_id='video-transcoder-group',  # Add consumer group
-                enable_auto_commit=True,
+                # Offsets are committed only after a video is fully processed
+                enable_auto_commit=False,
                 session_timeout_ms=10000,  # 10 seconds
                 request_timeout_ms=11000,  # 11 seconds
-                max_poll_interval_ms=300000  # 5 minutes
+                # The poll loop never waits on a transcode, so this only bounds a stuck loop
+                max_poll_interval_ms=300000,  # 5 minutes
+                max_poll_records=settings.KAFKA_MAX_POLL_RECORDS
             )
             logger.info("Successfully connected to Kafka")
             return consumer
@@ -52,8 +60,13 @@ def create_kafka_consumer():
     
     raise Exception("Failed to create Kafka consumer after multiple attempts")
 
-def process_message(message):
-    """Process a single Kafka message."""
+def process_message(message, runtime: TranscoderRuntime, threads=None):
+    """
+    Process a single Kafka message.
+
+    Raises:
+        Exception: If processing failed, so the offset is not committed
+    """
     try:
         logger.info(f"Received message: {message.value}")
         
@@ -77,30 +90,45 @@ def process_message(message):
         logger.info(f"Processing video: {object_key} from bucket: {bucket_name}")
         
         # Process the video
-        processor = VideoTranscoder()
+        processor = VideoTranscoder(runtime, threads=threads)
         processor.process_video(object_key=object_key, bucket_name=bucket_name)
         
         logger.info(f"Successfully processed video: {object_key}")
         
     except Exception as e:
         logger.error(f"Error processing message: {e}", exc_info=True)
+        raise
 
-def consume_messages():
-    """Continuously consume messages from Kafka."""
+def consume_messages(runtime: TranscoderRuntime):
+    """Continuously consume messages from Kafka and hand them to the worker pool."""
     consumer = None
+    pool = TranscodeWorkerPool(
+        workers=settings.TRANSCODE_WORKERS,
+        cpu_budget=settings.TRANSCODE_CPU_BUDGET,
+    )
     
     while True:  # Outer loop for reconnection
         try:
             if consumer is None:
                 consumer = create_kafka_consumer()
+                runtime.consumer_connected = True
                 logger.info("Starting to consume messages...")
             
-            # This will block until a message is received
-            for message in consumer:
-                process_message(message)
+            # Keeps polling while jobs run; only returns on error
+            PartitionedConsumer(
+                consumer,
+                topic_name,
+                pool,
+                partial(process_message, runtime=runtime),
+                max_attempts=settings.JOB_MAX_ATTEMPTS,
+                poll_timeout_ms=settings.KAFKA_POLL_TIMEOUT_MS,
+                retry_backoff=settings.JOB_RETRY_BACKOFF,
+                retry_backoff_max=settings.JOB_RETRY_BACKOFF_MAX,
+            ).run()
                 
         except Exception as e:
             logger.error(f"Error in Kafka consumer: {e}")
+            runtime.consumer_connected = False
             
             # Close the consumer if it exists
             if consumer is not None:
@@ -114,11 +142,11 @@ def consume_messages():
             logger.info("Attempting to reconnect in 10 seconds...")
             time.sleep(10)
 
-def init_kafka_listener():
+def init_kafka_listener(runtime: TranscoderRuntime):
     """Initialize the Kafka listener in a separate thread."""
     try:
         logger.info("Starting Kafka listener thread...")
-        thread = threading.Thread(target=consume_messages, daemon=True)
+        thread = threading.Thread(target=consume_messages, args=(runtime,), daemon=True)
         thread.start()
         logger.info(f"Kafka listener started for topic: {topic_name}")
         return thread
@@ -128,9 +156,16 @@ def init_kafka_listener():
 
 if __name__ == "__main__":
     logger.info("Starting video transcoder service...")
+
+    # Clients, bucket checks and the ffmpeg capability check happen once, here;
+    # a host that cannot transcode exits instead of failing every job
+    runtime = TranscoderRuntime()
+    if settings.HEALTH_PORT:
+        start_health_server(runtime, settings.HEALTH_PORT)
+    runtime.start()
     
     # Start the Kafka listener
-    kafka_thread = init_kafka_listener()
+    kafka_thread = init_kafka_listener(runtime)
     
     # Keep the main thread alive
     try:
@@ -141,4 +176,5 @@ if __name__ == "__main__":
     except Exception as e:
         logger.error(f"Unexpected error: {e}", exc_info=True)
     finally:
+        runtime.close()
         logger.info("Video transcoder service stopped")
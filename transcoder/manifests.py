@@ -0,0 +1,232 @@
+import copy
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+DASH_NS = "{urn:mpeg:dash:schema:mpd:2011}"
+_TEMPLATE_IDENTIFIER = re.compile(r"\$(RepresentationID|Number|Bandwidth|Time)(?:%0(\d+)d)?\$")
+_HLS_URI_ATTRIBUTE = re.compile(r'URI="([^"]+)"')
+_HLS_ATTRIBUTE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def _expand_template(template: str, values: dict) -> str:
+    def substitute(match):
+        value = values[match.group(1)]
+        width = match.group(2)
+        return f"{value:0{int(width)}d}" if width else str(value)
+    return _TEMPLATE_IDENTIFIER.sub(substitute, template).replace("$$", "$")
+
+
+def list_dash_segments(mpd_path: Path) -> set[str]:
+    """Return every init and media file referenced by a SegmentTemplate/SegmentTimeline DASH manifest."""
+    root = ET.parse(mpd_path).getroot()
+    files = set()
+    for adaptation_set in root.iter(f"{DASH_NS}AdaptationSet"):
+        shared_template = adaptation_set.find(f"{DASH_NS}SegmentTemplate")
+        for representation in adaptation_set.findall(f"{DASH_NS}Representation"):
+            template = representation.find(f"{DASH_NS}SegmentTemplate")
+            if template is None:
+                template = shared_template
+            if template is None:
+                continue
+
+            values = {
+                "RepresentationID": representation.get("id", ""),
+                "Bandwidth": representation.get("bandwidth", ""),
+                "Number": int(template.get("startNumber", 1)),
+                "Time": 0,
+            }
+            if template.get("initialization"):
+                files.add(_expand_template(template.get("initialization"), values))
+
+            number = values["Number"]
+            time = 0
+            for s in template.iter(f"{DASH_NS}S"):
+                time = int(s.get("t", time))
+                for _ in range(int(s.get("r", 0)) + 1):
+                    files.add(_expand_template(template.get("media"), {**values, "Number": number, "Time": time}))
+                    number += 1
+                    time += int(s.get("d"))
+    return files
+
+
+def _playlist_uris(playlist_path: Path) -> list[str]:
+    uris = []
+    for line in playlist_path.read_text().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            uris.extend(_HLS_URI_ATTRIBUTE.findall(line))
+        else:
+            uris.append(line)
+    return uris
+
+
+def list_hls_segments(master_path: Path) -> set[str]:
+    """Return every media file reachable from an HLS master playlist, relative to its directory."""
+    base_dir = master_path.parent
+    files = set()
+    for uri in _playlist_uris(master_path):
+        if uri.endswith(".m3u8"):
+            # Media playlists reference segments relative to their own directory
+            playlist_dir = posixpath.dirname(uri)
+            files.update(
+                posixpath.normpath(posixpath.join(playlist_dir, segment))
+                for segment in _playlist_uris(base_dir / uri)
+            )
+        else:
+            files.add(uri)
+    return files
+
+
+def verify_shared_segments(output_dir: Path, mpd_name: str = "manifest.mpd", master_name: str = "master.m3u8") -> set[str]:
+    """
+    Check that the DASH manifest and the HLS master resolve to the same segment
+    files and that all of them exist on disk.
+
+    Returns:
+        The shared set of segment file names
+
+    Raises:
+        RuntimeError: If the manifests disagree or reference missing files
+    """
+    output_dir = Path(output_dir)
+    dash_files = list_dash_segments(output_dir / mpd_name)
+    hls_files = list_hls_segments(output_dir / master_name)
+
+    if dash_files != hls_files:
+        raise RuntimeError(
+            f"DASH and HLS manifests reference different segments: "
+            f"only DASH={sorted(dash_files - hls_files)[:5]}, only HLS={sorted(hls_files - dash_files)[:5]}"
+        )
+
+    missing = sorted(name for name in dash_files if not (output_dir / name).exists())
+    if missing:
+        raise RuntimeError(f"Manifests reference missing segment files: {missing[:5]}")
+
+    return dash_files
+
+
+def _is_video(adaptation_set: ET.Element) -> bool:
+    if adaptation_set.get("contentType") == "video":
+        return True
+    representation = adaptation_set.find(f"{DASH_NS}Representation")
+    mime_type = adaptation_set.get("mimeType") or (representation.get("mimeType", "") if representation is not None else "")
+    return mime_type.startswith("video/")
+
+
+def merge_dash_manifests(base_path: Path, extra_path: Path, subdir: str) -> bytes:
+    """
+    Add the video Representations of a manifest in ``subdir`` to the base manifest.
+
+    Both encodes use the same GOP and segment duration, so their segments line
+    up and players can switch between them. Added Representations get fresh ids
+    and their templates are rewritten to literal paths under ``subdir``.
+
+    Returns:
+        The merged manifest, to be written next to the base one
+    """
+    for _, (prefix, uri) in ET.iterparse(base_path, events=("start-ns",)):
+        ET.register_namespace(prefix, uri)
+    root = ET.parse(base_path).getroot()
+    extra_root = ET.parse(extra_path).getroot()
+
+    video_set = next(a for a in root.iter(f"{DASH_NS}AdaptationSet") if _is_video(a))
+    used_ids = [int(r.get("id")) for r in root.iter(f"{DASH_NS}Representation") if r.get("id", "").isdigit()]
+    next_id = max(used_ids, default=-1) + 1
+
+    for extra_set in extra_root.iter(f"{DASH_NS}AdaptationSet"):
+        if not _is_video(extra_set):
+            continue
+        shared_template = extra_set.find(f"{DASH_NS}SegmentTemplate")
+        for representation in extra_set.findall(f"{DASH_NS}Representation"):
+            representation = copy.deepcopy(representation)
+            template = representation.find(f"{DASH_NS}SegmentTemplate")
+            if template is None and shared_template is not None:
+                template = copy.deepcopy(shared_template)
+                representation.append(template)
+
+            original_id = representation.get("id", "")
+            for attribute in ("initialization", "media"):
+                value = template.get(attribute) if template is not None else None
+                if value:
+                    value = value.replace("$RepresentationID$", original_id)
+                    template.set(attribute, posixpath.join(subdir, value))
+
+            representation.set("id", str(next_id))
+            next_id += 1
+            video_set.append(representation)
+
+            for attribute, size in (("maxWidth", "width"), ("maxHeight", "height")):
+                if video_set.get(attribute) and representation.get(size):
+                    video_set.set(attribute, str(max(int(video_set.get(attribute)), int(representation.get(size)))))
+
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+def _hls_attributes(tag_line: str) -> dict[str, str]:
+    return dict(_HLS_ATTRIBUTE.findall(tag_line.partition(":")[2]))
+
+
+def merge_hls_masters(base_path: Path, extra_path: Path, subdir: str) -> str:
+    """
+    Add the variant streams of an HLS master in ``subdir`` to the base master.
+
+    Variants from a video-only encode are attached to the base master's audio
+    group, with the audio codec added to CODECS, so every variant plays with
+    the same audio rendition.
+
+    Returns:
+        The merged master playlist, to be written next to the base one
+    """
+    lines = base_path.read_text().splitlines()
+
+    audio_group = audio_codec = None
+    for line in lines:
+        if line.startswith("#EXT-X-MEDIA:") and "TYPE=AUDIO" in line:
+            audio_group = _hls_attributes(line).get("GROUP-ID")
+        elif line.startswith("#EXT-X-STREAM-INF:"):
+            codecs = _hls_attributes(line).get("CODECS", "").strip('"').split(",")
+            audio_codec = audio_codec or next((c for c in codecs if c.startswith("mp4a")), None)
+
+    extra_lines = extra_path.read_text().splitlines()
+    for line, uri in zip(extra_lines, extra_lines[1:]):
+        if not line.startswith("#EXT-X-STREAM-INF:"):
+            continue
+        if audio_group and "AUDIO=" not in line:
+            line += f",AUDIO={audio_group}"
+            if audio_codec:
+                line = re.sub(r'CODECS="([^"]*)"', lambda m: f'CODECS="{m.group(1)},{audio_codec}"', line)
+        lines.extend([line, posixpath.join(subdir, uri.strip())])
+
+    return "\n".join(lines) + "\n"
+
+
+def rebase_dash_manifest(mpd_path: Path, subdir: str) -> bytes:
+    """
+    Return the manifest with every SegmentTemplate path moved under ``subdir``,
+    so a copy published one directory up still points at the same segments.
+    """
+    for _, (prefix, uri) in ET.iterparse(mpd_path, events=("start-ns",)):
+        ET.register_namespace(prefix, uri)
+    root = ET.parse(mpd_path).getroot()
+    for template in root.iter(f"{DASH_NS}SegmentTemplate"):
+        for attribute in ("initialization", "media"):
+            if template.get(attribute):
+                template.set(attribute, posixpath.join(subdir, template.get(attribute)))
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+def rebase_hls_master(master_path: Path, subdir: str) -> str:
+    """Return the master playlist with every variant and rendition URI moved under ``subdir``."""
+    lines = []
+    for line in master_path.read_text().splitlines():
+        stripped = line.strip()
+        if stripped and not stripped.startswith("#"):
+            line = posixpath.join(subdir, stripped)
+        elif stripped.startswith("#"):
+            line = _HLS_URI_ATTRIBUTE.sub(lambda m: f'URI="{posixpath.join(subdir, m.group(1))}"', line)
+        lines.append(line)
+    return "\n".join(lines) + "\n"
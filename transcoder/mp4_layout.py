@@ -0,0 +1,43 @@
+import struct
+from typing import Callable, Optional
+
+# Top-level boxes allowed before the movie header in a fast-start file
+_MAX_BOXES = 16
+
+
+def moov_before_mdat(read_range: Callable[[int, int], bytes]) -> Optional[bool]:
+    """
+    Walk the top-level ISO BMFF boxes of a file to find whether ``moov`` comes
+    before ``mdat`` (a "fast-start" layout that can be decoded while streaming).
+
+    Args:
+        read_range: Callable returning the bytes in the inclusive range [start, end]
+
+    Returns:
+        True if moov precedes mdat, False if mdat comes first, or None if the
+        file is not an ISO BMFF (MP4/MOV) file or its layout could not be read
+    """
+    offset = 0
+    for index in range(_MAX_BOXES):
+        header = read_range(offset, offset + 15)
+        if len(header) < 8:
+            return None
+
+        size, box_type = struct.unpack(">I4s", header[:8])
+        if index == 0 and box_type != b"ftyp":
+            return None
+        if box_type == b"moov":
+            return True
+        if box_type == b"mdat":
+            return False
+
+        if size == 1:
+            # 64-bit largesize follows the type
+            if len(header) < 16:
+                return None
+            size = struct.unpack(">Q", header[8:16])[0]
+        if size < 8:
+            # 0 means "extends to end of file", which leaves nothing after it
+            return None
+        offset += size
+    return None
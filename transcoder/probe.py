@@ -0,0 +1,121 @@
+import json
+import subprocess
+from dataclasses import dataclass
+
+# Used when the container reports no usable frame rate
+DEFAULT_FPS = 30.0
+
+
+@dataclass
+class SourceInfo:
+    """What the encoder needs to know about a source before building its ladder."""
+    width: int
+    height: int
+    fps: float
+    rotation: int
+    has_audio: bool
+    duration: float
+    # Multiplier applied to the ladder's bitrates; 1.0 keeps the fixed ladder
+    complexity: float = 1.0
+
+    @property
+    def display_width(self) -> int:
+        # ffmpeg autorotates, so a 90°/270° source comes out with its sides swapped
+        return self.height if self.rotation % 180 == 90 else self.width
+
+    @property
+    def display_height(self) -> int:
+        return self.width if self.rotation % 180 == 90 else self.height
+
+    @property
+    def portrait(self) -> bool:
+        return self.display_height > self.display_width
+
+    @property
+    def short_side(self) -> int:
+        return min(self.display_width, self.display_height)
+
+
+def _ffprobe(input_path: str, *args: str) -> dict:
+    command = ["ffprobe", "-v", "error", "-of", "json", *args, str(input_path)]
+    result = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(result.stdout or "{}")
+
+
+def _parse_rate(value: str) -> float:
+    try:
+        num, _, den = (value or "").partition("/")
+        rate = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+    return rate
+
+
+def _frame_rate(stream: dict) -> float:
+    # avg_frame_rate is the real cadence; r_frame_rate can be a timebase for VFR sources
+    for key in ("avg_frame_rate", "r_frame_rate"):
+        rate = _parse_rate(stream.get(key))
+        if 0 < rate <= 240:
+            return rate
+    return DEFAULT_FPS
+
+
+def _rotation(stream: dict) -> int:
+    rotate = stream.get("tags", {}).get("rotate")
+    if rotate is None:
+        for side_data in stream.get("side_data_list", []):
+            if "rotation" in side_data:
+                rotate = side_data["rotation"]
+                break
+    try:
+        return int(float(rotate or 0)) % 360
+    except ValueError:
+        return 0
+
+
+def probe_source(input_path: str) -> SourceInfo:
+    """
+    Read resolution, frame rate, rotation, audio presence and duration of a source.
+
+    Raises:
+        subprocess.CalledProcessError: If ffprobe cannot read the input
+        ValueError: If the input has no video stream
+    """
+    data = _ffprobe(input_path, "-show_format", "-show_streams")
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        raise ValueError(f"{input_path} has no video stream")
+
+    try:
+        duration = float(data.get("format", {}).get("duration") or video.get("duration") or 0.0)
+    except ValueError:
+        duration = 0.0
+
+    return SourceInfo(
+        width=int(video.get("width", 0)),
+        height=int(video.get("height", 0)),
+        fps=_frame_rate(video),
+        rotation=_rotation(video),
+        has_audio=any(s.get("codec_type") == "audio" for s in streams),
+        duration=duration,
+    )
+
+
+def get_keyframe_times(input_path: str) -> list[float]:
+    """
+    Return the presentation times, in seconds, of every video keyframe.
+
+    Reads packet flags rather than decoding frames, so it only costs a pass over
+    the container index.
+    """
+    data = _ffprobe(
+        input_path,
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags",
+    )
+    times = []
+    for packet in data.get("packets", []):
+        if "K" in packet.get("flags", "") and packet.get("pts_time") not in (None, "N/A"):
+            times.append(float(packet["pts_time"]))
+    return sorted(times)
@@ -0,0 +1,69 @@
+import time
+from typing import Callable, Optional
+
+# Arguments that make ffmpeg write machine-readable progress to stdout instead
+# of the interactive stats line on stderr
+PROGRESS_ARGS = ["-progress", "pipe:1", "-nostats"]
+
+
+def _parse_speed(value: str) -> Optional[float]:
+    # "2.93x", or "N/A" before the first frame
+    try:
+        return float(value.rstrip("x"))
+    except (AttributeError, ValueError):
+        return None
+
+
+def _parse_float(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class FfmpegProgress:
+    """
+    Parses the key=value blocks ffmpeg writes with ``-progress``.
+
+    Each block ends with ``progress=continue`` (or ``progress=end``). At most
+    once every ``min_interval`` seconds, and always for the final block,
+    ``on_progress(percent, fps, speed, eta_seconds)`` is called. ``percent``
+    and ``eta_seconds`` are None when the source duration is unknown.
+    """
+
+    def __init__(self, duration: float, on_progress: Callable, min_interval: float = 5.0):
+        self.duration = duration
+        self.on_progress = on_progress
+        self.min_interval = min_interval
+        self._block: dict[str, str] = {}
+        self._last_report = 0.0
+
+    def feed(self, line: str) -> None:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            return
+        if key != "progress":
+            self._block[key] = value
+            return
+
+        block, self._block = self._block, {}
+        final = value == "end"
+        now = time.monotonic()
+        if not final and now - self._last_report < self.min_interval:
+            return
+        self._last_report = now
+        self.on_progress(*self._summarize(block, final))
+
+    def _summarize(self, block: dict, final: bool) -> tuple:
+        fps = _parse_float(block.get("fps"))
+        speed = _parse_speed(block.get("speed"))
+        # out_time_us is microseconds; out_time_ms is also microseconds despite its name
+        out_time_us = _parse_float(block.get("out_time_us") or block.get("out_time_ms"))
+        out_time = out_time_us / 1_000_000 if out_time_us is not None else None
+
+        percent = eta = None
+        if self.duration > 0 and out_time is not None:
+            percent = 100.0 if final else round(min(max(out_time / self.duration * 100, 0.0), 100.0), 1)
+            if speed:
+                eta = 0.0 if final else round(max(self.duration - out_time, 0.0) / speed, 1)
+        return percent, fps, speed, eta
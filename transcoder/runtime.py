@@ -0,0 +1,142 @@
+import logging
+import subprocess
+import threading
+
+import boto3
+from botocore.client import Config
+from botocore.exceptions import ClientError
+
+from settings import settings
+from telemetry import StatusPublisher
+
+logger = logging.getLogger('transcoder')
+
+# What the presets need from the ffmpeg build
+REQUIRED_ENCODERS = ("libx264", "aac", "libwebp", "mjpeg")
+REQUIRED_MUXERS = ("dash", "mp4", "h264", "image2")
+
+
+def _ffmpeg_list(flag: str) -> set[str]:
+    """Names listed by ``ffmpeg -encoders``/``-muxers``, below the "--" separator line."""
+    result = subprocess.run(["ffmpeg", "-hide_banner", flag], check=True, capture_output=True, text=True)
+    names = set()
+    listing = False
+    for line in result.stdout.splitlines():
+        if line.strip().startswith("--"):
+            listing = True
+            continue
+        parts = line.split()
+        if listing and len(parts) >= 2:
+            # Muxers can list several comma-separated names, e.g. "mov,mp4,m4a"
+            names.update(parts[1].split(","))
+    return names
+
+
+def check_ffmpeg() -> dict:
+    """
+    Verify that ffmpeg and ffprobe run and support every encoder and muxer we use.
+
+    Returns:
+        Version and capability details for the readiness probe
+
+    Raises:
+        RuntimeError: If a binary is missing or lacks a required capability
+    """
+    try:
+        version = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-version"], check=True, capture_output=True, text=True
+        ).stdout.splitlines()[0]
+        subprocess.run(["ffprobe", "-hide_banner", "-version"], check=True, capture_output=True)
+        encoders = _ffmpeg_list("-encoders")
+        muxers = _ffmpeg_list("-muxers")
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise RuntimeError(f"ffmpeg/ffprobe are not usable: {e}")
+
+    missing = [f"encoder {name}" for name in REQUIRED_ENCODERS if name not in encoders]
+    missing += [f"muxer {name}" for name in REQUIRED_MUXERS if name not in muxers]
+    if missing:
+        raise RuntimeError(f"ffmpeg build is missing: {', '.join(missing)}")
+
+    return {"version": version, "encoders": list(REQUIRED_ENCODERS), "muxers": list(REQUIRED_MUXERS)}
+
+
+class TranscoderRuntime:
+    """
+    Process-wide state shared by every transcode job.
+
+    Created once at startup: one pooled S3 client and one status event
+    publisher (both safe to share between worker threads), the set of buckets known to
+    exist, and the result of the ffmpeg capability check. Jobs only borrow
+    these, so per-job work is pure transcoding.
+    """
+
+    def __init__(self):
+        self.s3 = boto3.session.Session().client(
+            's3',
+            endpoint_url=settings.MINIO_URL,
+            aws_access_key_id=settings.MINIO_ACCESS_KEY,
+            aws_secret_access_key=settings.MINIO_SECRET_KEY,
+            region_name='us-east-1',
+            config=Config(
+                signature_version='s3v4',
+                # Enough connections for every concurrent job's uploads and their parts
+                max_pool_connections=(
+                    settings.TRANSCODE_WORKERS * settings.UPLOAD_WORKERS * settings.UPLOAD_PART_CONCURRENCY
+                ),
+            )
+        )
+
+        # Status and progress events from every worker share one producer
+        self.events = StatusPublisher(settings.KAFKA_BROKER, settings.STATUS_EVENTS_TOPIC)
+
+        self.ffmpeg = None
+        self.consumer_connected = False
+        self._buckets: set[str] = set()
+        self._bucket_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Run the one-time startup checks; raises if the host cannot transcode."""
+        self.ffmpeg = check_ffmpeg()
+        logger.info(f"ffmpeg ready: {self.ffmpeg['version']}")
+        try:
+            self.ensure_bucket(settings.MINIO_PROCESS_VIDEO_BUCKET)
+        except Exception as e:
+            # Storage may still be starting; the first job retries the check
+            logger.warning(f"Could not check bucket {settings.MINIO_PROCESS_VIDEO_BUCKET} yet: {e}")
+
+    def ensure_bucket(self, bucket_name: str) -> None:
+        """Ensure the bucket exists, creating it if needed; checked once per process."""
+        if bucket_name in self._buckets:
+            return
+        with self._bucket_lock:
+            if bucket_name in self._buckets:
+                return
+            try:
+                self.s3.head_bucket(Bucket=bucket_name)
+                logger.info(f"Bucket {bucket_name} exists")
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in ("404", "NoSuchBucket"):
+                    logger.error(f"Error checking bucket {bucket_name}: {e}")
+                    raise
+                logger.info(f"Bucket {bucket_name} does not exist, creating...")
+                try:
+                    self.s3.create_bucket(Bucket=bucket_name)
+                except ClientError as e:
+                    # Another replica may have created it in the meantime
+                    if e.response.get('Error', {}).get('Code') != "BucketAlreadyOwnedByYou":
+                        logger.error(f"Failed to create bucket {bucket_name}: {e}")
+                        raise
+                logger.info(f"Successfully created bucket: {bucket_name}")
+            self._buckets.add(bucket_name)
+
+    def readiness(self) -> dict:
+        """What the readiness probe reports; ``ready`` is True once jobs can be taken."""
+        return {
+            "ready": self.ffmpeg is not None and self.consumer_connected,
+            "ffmpeg": self.ffmpeg,
+            "consumer_connected": self.consumer_connected,
+            "buckets": sorted(self._buckets),
+        }
+
+    def close(self) -> None:
+        self.events.close()
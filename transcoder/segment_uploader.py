@@ -0,0 +1,162 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from boto3.s3.transfer import TransferConfig
+from settings import settings
+
+# Files that reference other outputs, uploaded only after everything else:
+# manifests, the storyboard WebVTT and the thumbnail index
+MANIFEST_EXTENSIONS = (".mpd", ".m3u8", ".vtt", ".json")
+
+CONTENT_TYPES = {
+    ".mpd": "application/dash+xml",
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+    ".jpg": "image/jpeg",
+    ".webp": "image/webp",
+    ".vtt": "text/vtt",
+    ".json": "application/json",
+}
+
+
+def get_transfer_config() -> TransferConfig:
+    """Transfer settings shared by every upload; small segments go up in a single PUT."""
+    return TransferConfig(
+        multipart_threshold=settings.UPLOAD_MULTIPART_THRESHOLD,
+        multipart_chunksize=settings.UPLOAD_MULTIPART_CHUNKSIZE,
+        max_concurrency=settings.UPLOAD_PART_CONCURRENCY,
+    )
+
+
+def upload_file(s3, bucket_name: str, s3_key: str, path: Path, transfer_config: TransferConfig = None) -> None:
+    """Upload one output file with the content type players expect."""
+    extra_args = {}
+    content_type = CONTENT_TYPES.get(Path(path).suffix)
+    if content_type:
+        extra_args["ContentType"] = content_type
+    print(f"Uploading {path} to s3://{bucket_name}/{s3_key}")
+    s3.upload_file(
+        str(path),
+        bucket_name,
+        s3_key,
+        ExtraArgs=extra_args or None,
+        Config=transfer_config or get_transfer_config(),
+    )
+
+
+class SegmentUploader:
+    """
+    Uploads transcoder output to S3 while ffmpeg is still writing it.
+
+    A watcher thread scans the output directory and uploads segment files once
+    they are complete: ffmpeg writes into ``*.tmp`` and renames when done, and a
+    file must also keep the same size and mtime across two scans. Uploads run on
+    a bounded thread pool. Manifests are uploaded only in ``finish()``, after
+    every segment, so a published manifest never references a missing segment.
+    """
+
+    def __init__(self, s3, bucket_name: str, prefix: str, local_dir: str):
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.local_dir = Path(local_dir)
+        self.transfer_config = get_transfer_config()
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.UPLOAD_WORKERS,
+            thread_name_prefix="segment-upload",
+        )
+        self._futures: list[Future] = []
+        self._submitted: set[Path] = set()
+        self._last_seen: dict[Path, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self.error = None
+
+    def start(self) -> None:
+        """Start watching the output directory for finished segments."""
+        self._watcher = threading.Thread(target=self._watch, name="segment-watcher", daemon=True)
+        self._watcher.start()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(settings.UPLOAD_POLL_INTERVAL):
+            try:
+                self._scan(require_stable=True)
+            except Exception as e:
+                self.error = self.error or e
+                return
+
+    def _scan(self, require_stable: bool) -> None:
+        for root, _, files in os.walk(self.local_dir):
+            for file in files:
+                path = Path(root) / file
+                if file.endswith(".tmp") or file.endswith(MANIFEST_EXTENSIONS):
+                    continue
+                with self._lock:
+                    if path in self._submitted:
+                        continue
+                    if require_stable and not self._is_stable(path):
+                        continue
+                    self._submitted.add(path)
+                    self._futures.append(self._executor.submit(self._upload, path))
+
+    def _is_stable(self, path: Path) -> bool:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+        signature = (stat.st_size, stat.st_mtime_ns)
+        previous = self._last_seen.get(path)
+        self._last_seen[path] = signature
+        return previous == signature
+
+    def _upload(self, path: Path) -> None:
+        relative_path = path.relative_to(self.local_dir).as_posix()
+        try:
+            upload_file(self.s3, self.bucket_name, f"{self.prefix}/{relative_path}", path, self.transfer_config)
+        except Exception as e:
+            self.error = self.error or e
+            raise
+
+    def _wait_for_uploads(self) -> None:
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures)
+        for future in futures:
+            future.result()
+
+    def finish(self) -> None:
+        """
+        Upload whatever is left once ffmpeg has exited, then the manifests.
+
+        Raises:
+            Exception: The first upload failure, which should fail the job
+        """
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        try:
+            if self.error:
+                raise self.error
+            self._scan(require_stable=False)
+            self._wait_for_uploads()
+
+            manifests = [
+                Path(root) / file
+                for root, _, files in os.walk(self.local_dir)
+                for file in files
+                if file.endswith(MANIFEST_EXTENSIONS)
+            ]
+            for future in [self._executor.submit(self._upload, path) for path in manifests]:
+                future.result()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def abort(self) -> None:
+        """Stop watching and drop queued uploads after a failed encode."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        self._executor.shutdown(wait=True, cancel_futures=True)
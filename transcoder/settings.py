@@ -6,11 +6,67 @@ load_dotenv()
 class Settings(BaseSettings):
     KAFKA_BROKER: str = "" 
     KAFKA_TOPIC: str = ""
-    SERVER_URL: str = ""
+    # Topic the server consumes status, progress and stage timing events from
+    STATUS_EVENTS_TOPIC: str = "video-status"
+    # Upper bound on messages fetched per poll; jobs are started one per partition
+    KAFKA_MAX_POLL_RECORDS: int = 10
+    # How long each poll waits for messages before checking finished jobs
+    KAFKA_POLL_TIMEOUT_MS: int = 1000
+    # Attempts per message before it is skipped and its offset committed
+    JOB_MAX_ATTEMPTS: int = 3
+    # Seconds before the first retry of a failed job, doubled per attempt up to the max
+    JOB_RETRY_BACKOFF: float = 5.0
+    JOB_RETRY_BACKOFF_MAX: float = 300.0
     MINIO_URL: str = ""
     MINIO_ACCESS_KEY: str = ""
     MINIO_SECRET_KEY: str = ""
     MINIO_RAW_VIDEO_BUCKET: str = ""
     MINIO_PROCESS_VIDEO_BUCKET: str = ""
+    # Number of videos transcoded concurrently
+    TRANSCODE_WORKERS: int = 1
+    # Cores shared by all concurrent ffmpeg jobs; 0 means every core on the host
+    TRANSCODE_CPU_BUDGET: int = 0
+    # Parent directory for per-job scratch workspaces
+    WORKSPACE_ROOT: str = "/tmp/workspace"
+    # How ffmpeg reads the source: "stream" (presigned URL), "download" (local copy)
+    # or "auto" (stream fast-start MP4/MOV, download everything else)
+    INPUT_MODE: str = "auto"
+    # Lifetime of the presigned source URL; must outlast the longest encode
+    INPUT_URL_EXPIRES: int = 6 * 3600
+    # Concurrent segment uploads per job, and S3 transfer tuning
+    UPLOAD_WORKERS: int = 8
+    UPLOAD_PART_CONCURRENCY: int = 4
+    UPLOAD_MULTIPART_THRESHOLD: int = 16 * 1024 * 1024
+    UPLOAD_MULTIPART_CHUNKSIZE: int = 8 * 1024 * 1024
+    # Seconds between scans of the ffmpeg output directory
+    UPLOAD_POLL_INTERVAL: float = 0.5
+    # "single" encodes each video in one ffmpeg pass; "chunked" splits long videos
+    # on keyframes and encodes the pieces in parallel before packaging
+    TRANSCODE_MODE: str = "single"
+    # Target chunk length in seconds; only videos at least twice this long are split
+    CHUNK_DURATION: int = 60
+    # Chunks encoded at once within a single job
+    CHUNK_PARALLELISM: int = 4
+    # "fixed" uses the static ladder bitrates; "per_title" scales them by a
+    # complexity probe of sampled segments
+    BITRATE_MODE: str = "fixed"
+    # Probe samples per title, their length in seconds, and the CRF they are encoded at
+    PER_TITLE_SAMPLES: int = 5
+    PER_TITLE_SAMPLE_DURATION: float = 4
+    PER_TITLE_CRF: int = 23
+    # Bounds on the bitrate multiplier a probe can produce
+    PER_TITLE_MIN_FACTOR: float = 0.3
+    PER_TITLE_MAX_FACTOR: float = 1.5
+    # Minimum seconds between encode progress reports to the server
+    PROGRESS_INTERVAL: float = 5.0
+    # "complete" publishes once the whole ladder is encoded; "progressive" publishes
+    # the lowest rendition first and adds the others when they finish
+    PUBLISH_MODE: str = "complete"
+    # Extract poster thumbnails and a seek-preview storyboard during the encode
+    THUMBNAILS: bool = True
+    # Seconds between storyboard frames; stretched for long videos to cap the tile count
+    STORYBOARD_INTERVAL: int = 5
+    # Port for the /healthz and /readyz probes; 0 disables them
+    HEALTH_PORT: int = 8080
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from kafka import KafkaProducer
+
+
+class StageTimer:
+    """Records wall-clock seconds spent in each named stage of a job."""
+
+    def __init__(self):
+        self.timings: dict[str, float] = {}
+        self._started = time.monotonic()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            # A stage entered twice (e.g. encode + package) accumulates
+            self.timings[name] = round(self.timings.get(name, 0.0) + time.monotonic() - started, 3)
+
+    def mark(self, name: str) -> None:
+        """Record the seconds elapsed since the job started, e.g. time to first play."""
+        self.timings[name] = round(time.monotonic() - self._started, 3)
+
+    def summary(self) -> dict[str, float]:
+        return {**self.timings, "total": round(time.monotonic() - self._started, 3)}
+
+
+class StatusPublisher:
+    """
+    Publishes status events to the status topic, keyed by video ID so every
+    event of a video lands on one partition and is consumed in order.
+
+    The Kafka producer is created on first use and shared by all jobs; any
+    object with KafkaProducer's ``send`` can be passed in instead.
+    """
+
+    def __init__(self, brokers: str, topic: str, producer=None, timeout: float = 10.0):
+        self.brokers = brokers
+        self.topic = topic
+        self.timeout = timeout
+        self._producer = producer
+        self._lock = threading.Lock()
+
+    def _get_producer(self):
+        with self._lock:
+            if self._producer is None:
+                self._producer = KafkaProducer(
+                    bootstrap_servers=self.brokers,
+                    key_serializer=lambda k: k.encode("utf-8"),
+                    value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+                    acks="all",
+                    # Progress events from concurrent jobs share produce requests
+                    linger_ms=20,
+                )
+            return self._producer
+
+    def publish(self, video_id: str, event: dict, wait: bool = False) -> None:
+        """Send an event; with ``wait`` block until the broker acknowledges it, raising on failure."""
+        future = self._get_producer().send(self.topic, key=video_id, value=event)
+        if wait:
+            future.get(timeout=self.timeout)
+
+    def close(self) -> None:
+        if self._producer is not None:
+            self._producer.flush(self.timeout)
+            self._producer.close(self.timeout)
+
+
+class TelemetryReporter:
+    """
+    Publishes status, progress and stage timings for one video as status events.
+
+    Status changes wait for the broker and raise if they cannot be delivered,
+    so a job never finishes without its outcome recorded. Progress and timings
+    are best effort: failures are printed and never interrupt the job.
+    """
+
+    def __init__(self, publisher: StatusPublisher, video_id: str):
+        self.publisher = publisher
+        self.video_id = video_id
+        self._seq = 0
+
+    def _event(self, **fields) -> dict:
+        # Wall-clock nanoseconds order events across attempts and replicas; the
+        # server ignores any event not newer than the last one it applied
+        self._seq = max(time.time_ns(), self._seq + 1)
+        return {
+            "video_id": self.video_id,
+            "seq": self._seq,
+            "emitted_at": datetime.now(timezone.utc).isoformat(),
+            **fields,
+        }
+
+    def _send(self, **fields) -> None:
+        try:
+            self.publisher.publish(self.video_id, self._event(**fields))
+        except Exception as e:
+            print(f"Failed to report telemetry: {e}")
+
+    def status(self, status: str, error: str = None) -> None:
+        self.publisher.publish(self.video_id, self._event(status=status, error=error), wait=True)
+
+    def progress(self, stage: str, percent: float = None, fps: float = None, speed: float = None, eta_seconds: float = None) -> None:
+        self._send(progress={
+            "stage": stage,
+            "percent": percent if percent is not None else 0.0,
+            "fps": fps,
+            "speed": speed,
+            "eta_seconds": eta_seconds,
+        })
+
+    def stage_timings(self, timings: dict[str, float]) -> None:
+        self._send(stage_timings=timings)
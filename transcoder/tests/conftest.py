@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The transcoder runs as a flat set of modules from its own directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
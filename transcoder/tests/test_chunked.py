@@ -0,0 +1,32 @@
+from chunked import plan_chunks
+from ffmpeg_presets import SEGMENT_DURATION
+
+
+def test_boundaries_prefer_keyframes_on_segment_multiples():
+    # 61.0 is the first keyframe past the target, but not on a segment boundary
+    keyframes = [0.0, 7.3, 61.0, 62.0, 64.5, 121.0, 130.0]
+
+    chunks = plan_chunks(200.0, keyframes, 60.0)
+
+    assert chunks == [(0.0, 62.0), (62.0, 130.0), (130.0, 200.0)]
+
+
+def test_boundaries_fall_on_segment_multiples_without_aligned_keyframes():
+    # 24 fps with a 100-frame GOP: keyframes every 4.1667 s, on the 2 s grid only every 50 s
+    keyframes = [round(i * 100 / 24, 6) for i in range(60)]
+
+    chunks = plan_chunks(240.0, keyframes, 60.0)
+
+    # 60 and 120 are cut between keyframes; the keyframe at 200 is within half a chunk of 180
+    assert chunks == [(0.0, 60.0), (60.0, 120.0), (120.0, 200.0), (200.0, 240.0)]
+    assert all(start % SEGMENT_DURATION == 0 for start, _ in chunks)
+
+
+def test_short_tail_is_folded_into_previous_chunk():
+    keyframes = [float(t) for t in range(0, 150, 2)]
+
+    assert plan_chunks(145.0, keyframes, 60.0) == [(0.0, 60.0), (60.0, 145.0)]
+
+
+def test_single_keyframe_source_is_one_chunk():
+    assert plan_chunks(300.0, [0.0], 60.0) == [(0.0, 300.0)]
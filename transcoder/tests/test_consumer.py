@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import namedtuple
+
+import pytest
+
+pytest.importorskip("kafka")
+
+from kafka import TopicPartition
+
+from consumer import PartitionedConsumer
+from worker_pool import TranscodeWorkerPool
+
+Message = namedtuple("Message", "topic partition offset value")
+TP = TopicPartition("videos", 0)
+
+
+class FakeConsumer:
+    """Hands out one batch of messages, then records commits and pauses."""
+
+    def __init__(self, messages):
+        self._pending = list(messages)
+        self._paused = set()
+        self.committed = []
+
+    def subscribe(self, topics, listener=None):
+        pass
+
+    def poll(self, timeout_ms):
+        if self._pending:
+            records, self._pending = {TP: self._pending}, []
+            return records
+        time.sleep(timeout_ms / 1000)
+        return {}
+
+    def commit(self, offsets):
+        self.committed.extend(offset.offset for offset in offsets.values())
+
+    def assignment(self):
+        return {TP}
+
+    def paused(self):
+        return set(self._paused)
+
+    def pause(self, *partitions):
+        self._paused.update(partitions)
+
+    def resume(self, *partitions):
+        self._paused.difference_update(partitions)
+
+
+def run_until(consumer: PartitionedConsumer, done, timeout: float = 5.0) -> None:
+    thread = threading.Thread(target=consumer.run)
+    thread.start()
+    deadline = time.monotonic() + timeout
+    while not done() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    consumer.stop()
+    thread.join()
+
+
+def test_failed_job_is_retried_with_backoff():
+    attempts = []
+
+    def handler(message, threads):
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise RuntimeError("transient failure")
+
+    fake = FakeConsumer([Message("videos", 0, 0, b"{}")])
+    pool = TranscodeWorkerPool(workers=1, cpu_budget=1)
+    consumer = PartitionedConsumer(fake, "videos", pool, handler, max_attempts=3, poll_timeout_ms=10,
+                                   retry_backoff=0.1, retry_backoff_max=0.15)
+    run_until(consumer, lambda: fake.committed)
+    pool.shutdown()
+
+    assert len(attempts) == 3
+    assert fake.committed == [1]
+    # 0.1s before the second attempt, then doubled but capped at 0.15s
+    assert attempts[1] - attempts[0] >= 0.1
+    assert attempts[2] - attempts[1] >= 0.15
+
+
+def test_job_is_skipped_after_max_attempts():
+    attempts = []
+
+    def handler(message, threads):
+        attempts.append(message.offset)
+        raise RuntimeError("permanent failure")
+
+    fake = FakeConsumer([Message("videos", 0, 4, b"{}")])
+    pool = TranscodeWorkerPool(workers=1, cpu_budget=1)
+    consumer = PartitionedConsumer(fake, "videos", pool, handler, max_attempts=2, poll_timeout_ms=10,
+                                   retry_backoff=0.01)
+    run_until(consumer, lambda: fake.committed)
+    pool.shutdown()
+
+    assert attempts == [4, 4]
+    assert fake.committed == [5]
@@ -0,0 +1,73 @@
+import json
+
+from manifests import list_dash_segments, list_hls_segments, rebase_dash_manifest, rebase_hls_master
+from thumbnails import rebase_image_index
+
+MPD = """<?xml version="1.0" encoding="utf-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static">
+  <Period id="0">
+    <AdaptationSet id="0" contentType="video">
+      <Representation id="0" bandwidth="800000" width="640" height="360">
+        <SegmentTemplate timescale="1000" initialization="init-stream$RepresentationID$.m4s"
+                         media="chunk-stream$RepresentationID$-$Number%05d$.m4s" startNumber="1">
+          <SegmentTimeline><S t="0" d="4000" r="1" /></SegmentTimeline>
+        </SegmentTemplate>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>
+"""
+
+MASTER = """#EXTM3U
+#EXT-X-VERSION:7
+#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="group_A1",NAME="audio_0",DEFAULT=YES,URI="media_1.m3u8"
+#EXT-X-STREAM-INF:BANDWIDTH=1180800,RESOLUTION=640x360,AUDIO="group_A1"
+media_0.m3u8
+"""
+
+MEDIA = """#EXTM3U
+#EXT-X-MAP:URI="init-stream0.m4s"
+#EXTINF:4.000000,
+chunk-stream0-00001.m4s
+#EXT-X-ENDLIST
+"""
+
+
+def test_rebased_dash_manifest_points_into_the_revision(tmp_path):
+    (tmp_path / "manifest.mpd").write_text(MPD)
+    (tmp_path / "root.mpd").write_bytes(rebase_dash_manifest(tmp_path / "manifest.mpd", "r0123456789ab"))
+
+    original = list_dash_segments(tmp_path / "manifest.mpd")
+    assert list_dash_segments(tmp_path / "root.mpd") == {f"r0123456789ab/{name}" for name in original}
+
+
+def test_rebased_hls_master_points_into_the_revision(tmp_path):
+    revision = tmp_path / "r0123456789ab"
+    revision.mkdir()
+    (revision / "master.m3u8").write_text(MASTER)
+    (revision / "media_0.m3u8").write_text(MEDIA)
+    (revision / "media_1.m3u8").write_text(MEDIA)
+    (tmp_path / "master.m3u8").write_text(rebase_hls_master(revision / "master.m3u8", "r0123456789ab"))
+
+    assert 'URI="r0123456789ab/media_1.m3u8"' in (tmp_path / "master.m3u8").read_text()
+    assert list_hls_segments(tmp_path / "master.m3u8") == {
+        "r0123456789ab/init-stream0.m4s", "r0123456789ab/chunk-stream0-00001.m4s",
+    }
+
+
+def test_rebased_image_index_and_storyboard(tmp_path):
+    (tmp_path / "thumbnails").mkdir()
+    (tmp_path / "storyboard").mkdir()
+    (tmp_path / "thumbnails" / "index.json").write_text(json.dumps({"widths": [320], "formats": ["webp", "jpg"]}))
+    (tmp_path / "storyboard" / "storyboard.vtt").write_text(
+        "WEBVTT\n\n00:00:00.000 --> 00:00:05.000\nsheet-001.jpg#xywh=0,0,160,90\n"
+    )
+
+    copies = rebase_image_index(tmp_path, "r0123456789ab")
+
+    assert json.loads(copies["thumbnails/index.json"])["base"] == "r0123456789ab/"
+    assert "../r0123456789ab/storyboard/sheet-001.jpg#xywh=0,0,160,90" in copies["storyboard/storyboard.vtt"]
+
+
+def test_missing_images_are_not_rebased(tmp_path):
+    assert rebase_image_index(tmp_path, "r0123456789ab") == {}
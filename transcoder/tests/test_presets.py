@@ -0,0 +1,32 @@
+from ffmpeg_presets import VIDEO_LADDER, get_dash_and_hls_transcode_preset, get_video_encode_args, split_threads
+
+
+def test_split_threads_shares_cap_between_encoders():
+    assert split_threads(8, 3) == [2, 3, 3]
+    assert split_threads(6, 3) == [2, 2, 2]
+    assert split_threads(4, 1) == [4]
+
+
+def test_split_threads_gives_every_encoder_a_thread():
+    assert split_threads(2, 3) == [1, 1, 1]
+
+
+def test_encode_args_cap_each_rendition_encoder():
+    args = get_video_encode_args(renditions=VIDEO_LADDER, threads=6)
+
+    assert [args[args.index(f"-threads:v:{index}") + 1] for index in range(3)] == ["2", "2", "2"]
+    assert "-threads" not in args
+
+
+def test_preset_has_no_output_level_thread_cap():
+    command = get_dash_and_hls_transcode_preset("in.mp4", "out", threads=6, include_audio=False)
+
+    # The only plain -threads is the decoder cap ahead of the input
+    assert command.count("-threads") == 1
+    assert command.index("-threads") < command.index("-i")
+
+
+def test_encode_args_without_threads_leave_encoders_uncapped():
+    args = get_video_encode_args(renditions=VIDEO_LADDER)
+
+    assert not any(arg.startswith("-threads") for arg in args)
@@ -0,0 +1,48 @@
+import re
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from benchmarks.lavfi import make_source
+from ffmpeg_presets import get_dash_and_hls_transcode_preset, select_renditions
+from manifests import list_dash_segments, list_hls_segments, verify_shared_segments
+from probe import SourceInfo
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+
+SEGMENT_FILE = re.compile(r"(chunk|init)-stream.*\.m4s")
+
+
+@pytest.fixture(scope="module")
+def output_dir(tmp_path_factory) -> Path:
+    scratch = tmp_path_factory.mktemp("shared_segments")
+    source = scratch / "source.mp4"
+    make_source(source, 320, 240, 30, 4)
+    # Describe the clip directly rather than probing it, so only ffmpeg is needed
+    info = SourceInfo(width=320, height=240, fps=30, rotation=0, has_audio=True, duration=4)
+
+    output_dir = scratch / "output"
+    output_dir.mkdir()
+    command = get_dash_and_hls_transcode_preset(
+        str(source), str(output_dir), source=info, renditions=select_renditions(info)[:2],
+    )
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return output_dir
+
+
+def test_manifests_share_segments(output_dir):
+    shared = verify_shared_segments(output_dir)
+    assert shared
+
+
+def test_hls_playlists_list_dash_segment_files(output_dir):
+    dash_files = {name for name in list_dash_segments(output_dir / "manifest.mpd") if SEGMENT_FILE.fullmatch(name)}
+    hls_files = {name for name in list_hls_segments(output_dir / "master.m3u8") if SEGMENT_FILE.fullmatch(name)}
+    on_disk = {path.name for path in output_dir.iterdir() if SEGMENT_FILE.fullmatch(path.name)}
+
+    assert any(name.startswith("init-stream") for name in dash_files)
+    assert any(name.startswith("chunk-stream") for name in dash_files)
+    assert hls_files == dash_files
+    assert on_disk == dash_files
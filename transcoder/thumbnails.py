@@ -0,0 +1,169 @@
+import json
+import math
+import posixpath
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from probe import SourceInfo
+
+# Poster widths, each written as WebP and JPEG; wider than the source is skipped
+THUMBNAIL_WIDTHS = (160, 320, 640, 1280)
+THUMBNAIL_FORMATS = ("webp", "jpg")
+THUMBNAIL_DIR = "thumbnails"
+STORYBOARD_DIR = "storyboard"
+INDEX_NAME = "index.json"
+
+STORYBOARD_TILE_WIDTH = 160
+STORYBOARD_COLUMNS = 10
+STORYBOARD_ROWS = 10
+# Long videos get a wider interval so the storyboard stays a handful of sheets
+STORYBOARD_MAX_TILES = 500
+# Poster candidates per second; the thumbnail filter holds every candidate in memory
+POSTER_SAMPLE_FPS = 2
+
+
+@dataclass
+class ImagePlan:
+    """What to extract from the decoded frames: poster variants and the storyboard grid."""
+    # (width, height) of each poster variant
+    poster_sizes: list[tuple[int, int]]
+    # Start and length of the window the representative poster frame is picked from,
+    # and how many candidates are sampled from it
+    poster_start: float
+    poster_window: float
+    poster_frames: int
+    duration: float
+    interval: int
+    tile_width: int
+    tile_height: int
+    columns: int = STORYBOARD_COLUMNS
+    rows: int = STORYBOARD_ROWS
+
+    @property
+    def tile_count(self) -> int:
+        return max(1, math.ceil(self.duration / self.interval))
+
+
+def even(value: float) -> int:
+    """Nearest even size, at least 2; yuv420p needs even dimensions."""
+    return max(2, int(round(value / 2)) * 2)
+
+
+def plan_images(source: SourceInfo, interval: int) -> ImagePlan:
+    """
+    Plan the images for a probed source.
+
+    The poster comes from a window starting 10% into the video, past intros
+    and fades to black; ffmpeg's thumbnail filter picks the most representative
+    of the frames sampled from that window.
+    """
+    widths = [w for w in THUMBNAIL_WIDTHS if w <= source.display_width] or [even(source.display_width)]
+    poster_start = source.duration * 0.1
+    poster_window = max(min(10.0, source.duration - poster_start), 0.1)
+    interval = max(interval, math.ceil(source.duration / STORYBOARD_MAX_TILES))
+    return ImagePlan(
+        poster_sizes=[(w, even(w * source.display_height / source.display_width)) for w in widths],
+        poster_start=poster_start,
+        poster_window=poster_window,
+        poster_frames=max(1, round(poster_window * min(POSTER_SAMPLE_FPS, source.fps))),
+        duration=source.duration,
+        interval=interval,
+        tile_width=STORYBOARD_TILE_WIDTH,
+        tile_height=even(STORYBOARD_TILE_WIDTH * source.display_height / source.display_width),
+    )
+
+
+def thumbnail_name(width: int, fmt: str) -> str:
+    return f"{THUMBNAIL_DIR}/thumb-{width}.{fmt}"
+
+
+def sheet_name(index: int) -> str:
+    # Matches ffmpeg's image2 numbering, which starts at 1
+    return f"sheet-{index + 1:03d}.jpg"
+
+
+def _timestamp(seconds: float) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{seconds:06.3f}"
+
+
+def storyboard_vtt(plan: ImagePlan, sheets: int = None) -> str:
+    """WebVTT index mapping each interval of the video to its tile in a sprite sheet."""
+    per_sheet = plan.columns * plan.rows
+    tiles = plan.tile_count if sheets is None else min(plan.tile_count, sheets * per_sheet)
+    cues = ["WEBVTT", ""]
+    for i in range(tiles):
+        sheet, position = divmod(i, per_sheet)
+        row, column = divmod(position, plan.columns)
+        start = i * plan.interval
+        end = min((i + 1) * plan.interval, plan.duration)
+        cues.append(f"{_timestamp(start)} --> {_timestamp(max(end, start + 0.001))}")
+        cues.append(
+            f"{sheet_name(sheet)}#xywh={column * plan.tile_width},{row * plan.tile_height},"
+            f"{plan.tile_width},{plan.tile_height}"
+        )
+        cues.append("")
+    return "\n".join(cues)
+
+
+def prepare_image_dirs(output_dir: Path) -> None:
+    """ffmpeg's image muxer does not create directories."""
+    (Path(output_dir) / THUMBNAIL_DIR).mkdir(parents=True, exist_ok=True)
+    (Path(output_dir) / STORYBOARD_DIR).mkdir(parents=True, exist_ok=True)
+
+
+def write_image_index(plan: ImagePlan, output_dir: Path) -> None:
+    """
+    Write the storyboard WebVTT and the index the server picks thumbnail
+    variants from, listing only images ffmpeg actually produced. Both are
+    uploaded after the images they reference.
+    """
+    output_dir = Path(output_dir)
+    widths = [
+        width for width, _ in plan.poster_sizes
+        if all((output_dir / thumbnail_name(width, fmt)).exists() for fmt in THUMBNAIL_FORMATS)
+    ]
+    sheets = len(list((output_dir / STORYBOARD_DIR).glob("sheet-*.jpg")))
+    if not widths and not sheets:
+        print(f"No thumbnails or storyboard sheets were produced in {output_dir}")
+        return
+
+    index = {"widths": widths, "formats": list(THUMBNAIL_FORMATS), "storyboard": None}
+    if sheets:
+        (output_dir / STORYBOARD_DIR / "storyboard.vtt").write_text(storyboard_vtt(plan, sheets))
+        index["storyboard"] = {
+            "vtt": f"{STORYBOARD_DIR}/storyboard.vtt",
+            "sheets": sheets,
+            "interval": plan.interval,
+            "tile_width": plan.tile_width,
+            "tile_height": plan.tile_height,
+            "columns": plan.columns,
+            "rows": plan.rows,
+        }
+    (output_dir / THUMBNAIL_DIR / INDEX_NAME).write_text(json.dumps(index))
+
+
+def rebase_image_index(output_dir: Path, subdir: str) -> dict[str, str]:
+    """
+    Copies of the thumbnail index and storyboard for the video's root, pointing
+    at the images under ``subdir``. Keyed by path; files that were not
+    produced are left out.
+    """
+    output_dir = Path(output_dir)
+    copies = {}
+    index_path = output_dir / THUMBNAIL_DIR / INDEX_NAME
+    if index_path.exists():
+        # Paths in the index, computed or listed, are relative to its base
+        index = {**json.loads(index_path.read_text()), "base": f"{subdir}/"}
+        copies[f"{THUMBNAIL_DIR}/{INDEX_NAME}"] = json.dumps(index)
+
+    vtt_path = output_dir / STORYBOARD_DIR / "storyboard.vtt"
+    if vtt_path.exists():
+        # The root copy also lives in storyboard/, so sheets are reached via the parent
+        sheet_dir = posixpath.join("..", subdir, STORYBOARD_DIR)
+        copies[f"{STORYBOARD_DIR}/storyboard.vtt"] = re.sub(
+            r"^(sheet-\d+\.jpg#)", lambda m: f"{sheet_dir}/{m.group(1)}", vtt_path.read_text(), flags=re.M
+        )
+    return copies
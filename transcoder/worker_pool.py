@@ -0,0 +1,58 @@
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger('transcoder')
+
+
+class TranscodeWorkerPool:
+    """
+    Runs transcode jobs concurrently on a fixed number of worker threads.
+
+    Workers only supervise ffmpeg subprocesses, so threads are sufficient.
+    The CPU budget is split evenly between workers and each job's ffmpeg is
+    capped to its share, so concurrent encodes do not oversubscribe the host.
+    """
+
+    def __init__(self, workers: int, cpu_budget: int = 0):
+        self.workers = max(1, workers)
+        self.cpu_budget = cpu_budget or os.cpu_count() or 1
+        self.threads_per_job = max(1, self.cpu_budget // self.workers)
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="transcode-worker",
+        )
+        logger.info(
+            f"Transcode pool: {self.workers} workers, "
+            f"{self.threads_per_job} ffmpeg threads each (budget {self.cpu_budget})"
+        )
+
+    def try_submit(self, fn, *args, **kwargs) -> Optional[Future]:
+        """
+        Run ``fn(*args, threads=<share>, **kwargs)`` on a free worker.
+
+        Returns None instead of blocking when every worker is busy, so the
+        caller's poll loop keeps running.
+        """
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            future = self._executor.submit(fn, *args, threads=self.threads_per_job, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def has_capacity(self) -> bool:
+        """Whether a job submitted now would start immediately."""
+        if not self._slots.acquire(blocking=False):
+            return False
+        self._slots.release()
+        return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)